@@ -6,8 +6,11 @@ import type {
   MessageStartEvent,
   MessageEndEvent,
   MessageReplaceEvent,
+  MessagePatchEvent,
   ToolCallEndEvent,
   ToolExecutedEvent,
+  ToolExecutionStartEvent,
+  ToolExecutionProgressEvent,
   ToolRequireUserResponseEvent,
   ErrorEvent,
   UsageChunkEvent,
@@ -33,8 +36,11 @@ export type TaskSseCallbacks = {
   onToolCallEnd?: (data: ToolCallEndEvent) => void;
   onMessageEnd?: (data: MessageEndEvent) => void;
   onMessageReplace?: (data: MessageReplaceEvent) => void;
+  onMessagePatch?: (data: MessagePatchEvent) => void;
 
   // tool related callbacks
+  onToolExecutionStart?: (data: ToolExecutionStartEvent) => void;
+  onToolExecutionProgress?: (data: ToolExecutionProgressEvent) => void;
   onToolExecuted?: (data: ToolExecutedEvent) => void;
   onToolRequireUserResponse?: (data: ToolRequireUserResponseEvent) => void;
   onToolRequirePermission?: (data: ToolRequirePermissionEvent) => void;
@@ -45,9 +51,17 @@ export type TaskSseCallbacks = {
   onClose?: () => void;
 };
 
-function createTaskSseStream(url: URL | string, body: object, callbacks: TaskSseCallbacks): AbortController {
+type TaskSseRequest = {
+  body?: object;
+  method?: string;
+  headers?: Record<string, string>;
+};
+
+function createTaskSseStream(url: URL | string, { body, method, headers }: TaskSseRequest, callbacks: TaskSseCallbacks): AbortController {
   const abortController = createSseStream<AgentEvent>(url, {
     body,
+    method,
+    headers,
     onMessage: ({ data }) => {
       switch (data?.event_id) {
         case "TASK_START":
@@ -78,6 +92,10 @@ function createTaskSseStream(url: URL | string, body: object, callbacks: TaskSse
           callbacks.onMessageReplace?.(data);
           break;
 
+        case "MESSAGE_PATCH":
+          callbacks.onMessagePatch?.(data);
+          break;
+
         case "TOOL_CALL_END":
           callbacks.onToolCallEnd?.(data);
           break;
@@ -86,6 +104,14 @@ function createTaskSseStream(url: URL | string, body: object, callbacks: TaskSse
           callbacks.onToolExecuted?.(data);
           break;
 
+        case "TOOL_EXECUTION_START":
+          callbacks.onToolExecutionStart?.(data);
+          break;
+
+        case "TOOL_EXECUTION_PROGRESS":
+          callbacks.onToolExecutionProgress?.(data);
+          break;
+
         case "TOOL_REQUIRE_USER_RESPONSE":
           callbacks.onToolRequireUserResponse?.(data);
           break;
@@ -121,5 +147,19 @@ function createTaskSseStream(url: URL | string, body: object, callbacks: TaskSse
 }
 
 export function continueTask(taskType: TaskType, taskId: number, body: ContinueTaskBody, callbacks: TaskSseCallbacks): AbortController {
-  return createTaskSseStream(new URL(`${taskType}/${taskId}/continue`, TASK_STREAM_BASE_URL), body, callbacks);
+  return createTaskSseStream(new URL(`${taskType}/${taskId}/continue`, TASK_STREAM_BASE_URL), { body }, callbacks);
+}
+
+// watch the run in progress, e.g. after the UI is reloaded, resuming after `lastEventId`
+export function attachTask(taskType: TaskType, taskId: number, lastEventId: number, callbacks: TaskSseCallbacks): AbortController {
+  return createTaskSseStream(new URL(`${taskType}/${taskId}/events`, TASK_STREAM_BASE_URL), {
+    method: "GET",
+    // lowercase, so that the id is replaced rather than duplicated when the stream retries
+    headers: { "last-event-id": String(lastEventId) },
+  }, callbacks);
+}
+
+// the task runs are not stopped by closing their streams
+export async function stopTask(taskType: TaskType, taskId: number): Promise<void> {
+  await fetch(new URL(`${taskType}/${taskId}/stop`, TASK_STREAM_BASE_URL), { method: "POST" });
 }
@@ -49,6 +49,7 @@ export type ToolHeaderProps = {
   toolsetName?: string;
   className?: string;
   state: ToolState;
+  elapsed?: number;
   riskLevel?: number;
   riskReason?: string;
 };
@@ -174,6 +175,7 @@ export const ToolHeader = ({
   toolName,
   riskLevel,
   riskReason,
+  elapsed,
   ...props
 }: ToolHeaderProps) => (
   <CollapsibleTrigger
@@ -187,6 +189,11 @@ export const ToolHeader = ({
       <WrenchIcon className="size-4 text-muted-foreground" />
       <ToolBreadcrumb toolsetName={toolsetName} toolName={toolName} />
       {getStatusBadge(state)}
+      {state === "input-available" && elapsed !== undefined && elapsed > 0 && (
+        <span className="text-muted-foreground text-xs tabular-nums">
+          {Math.floor(elapsed)}s
+        </span>
+      )}
     </div>
     <div className="flex items-center gap-2">
       {typeof riskLevel === "number" && (
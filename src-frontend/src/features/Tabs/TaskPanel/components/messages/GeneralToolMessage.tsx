@@ -40,6 +40,9 @@ function getToolState(message: UiToolMessage): ToolState {
   if (message.result !== null) {
     return "output-available";
   }
+  if (message.execution !== undefined) {
+    return "input-available";
+  }
   switch ((message.metadata as ToolMessageMetadata).user_approval) {
     case "pending":
       return "approval-requested";
@@ -132,6 +135,7 @@ export function GeneralToolMessage({ message }: ToolMessageProps) {
         toolName={toolName}
         toolsetName={toolsetName}
         state={toolState}
+        elapsed={message.execution?.elapsed}
         riskLevel={risk.level}
         riskReason={risk.reason}
       />
@@ -9,18 +9,22 @@ import {
 import { useTranslation } from "react-i18next";
 import { produce } from "immer";
 import { toast } from "sonner";
-import { useLatest } from "ahooks";
+import { useLatest, useMount } from "ahooks";
 import { TABS_TASK_NAMESPACE } from "@/i18n/resources";
 import {
   BuiltInTools,
   type ErrorEvent,
   type MessageEndEvent,
   type MessageReplaceEvent,
+  type MessagePatchEvent,
   type MessageStartEvent,
   type TaskType,
   type TextChunkEvent,
   type ToolCallChunkEvent,
   type ToolCallEndEvent,
+  type ToolExecutedEvent,
+  type ToolExecutionStartEvent,
+  type ToolExecutionProgressEvent,
   type ToolRequirePermissionEvent,
   type ToolRequireUserResponseEvent,
   type UsageChunkEvent,
@@ -173,7 +177,7 @@ export function AgentTaskProvider({
   });
 
   const sseCallbacksRef = useRef<TaskSseCallbacks>({});
-  const { state, startStream, cancel } = useTaskStream({
+  const { state, startStream, attach, cancel } = useTaskStream({
     taskType,
     taskId,
     agentId,
@@ -210,6 +214,22 @@ export function AgentTaskProvider({
     messageLifecycle.handleMessageReplace(eventData.message);
   };
 
+  const onMessagePatch = (eventData: MessagePatchEvent) => {
+    messageLifecycle.handleMessagePatch(eventData);
+  };
+
+  const onToolExecutionStart = (eventData: ToolExecutionStartEvent) => {
+    messageLifecycle.handleToolExecution(eventData.call_id, 0);
+  };
+
+  const onToolExecutionProgress = (eventData: ToolExecutionProgressEvent) => {
+    messageLifecycle.handleToolExecution(eventData.call_id, eventData.elapsed);
+  };
+
+  const onToolExecuted = (eventData: ToolExecutedEvent) => {
+    messageLifecycle.handleToolExecuted(eventData.call_id);
+  };
+
   const onToolCallEnd = (eventData: ToolCallEndEvent) => {
     const { message } = eventData;
     messageLifecycle.handleToolCallEnd(message);
@@ -301,13 +321,24 @@ export function AgentTaskProvider({
     onUsageChunk,
     onMessageEnd,
     onMessageReplace,
+    onMessagePatch,
     onToolCallEnd,
+    onToolExecutionStart,
+    onToolExecutionProgress,
+    onToolExecuted,
     onToolRequireUserResponse,
     onToolRequirePermission,
     onError,
     onClose,
   };
 
+  // attach again to the run still in progress, e.g. after the UI is reloaded
+  useMount(() => {
+    if (data.last_event_id != null) {
+      attach(data.last_event_id);
+    }
+  });
+
   const handleTaskContinue = useCallback(
     () => startStream(continueTask, {}),
     [startStream],
@@ -1,5 +1,6 @@
 import { useCallback } from "react";
 import { current } from "immer";
+import type { MessagePatchEvent } from "@/api/generated/schemas";
 import { UiMessage, isToolMessage, toUiMessage, uiAssistantMessageFactory, uiToolMessageFactory, SdkToolMessage, SdkAssistantMessage, SdkMessage } from "@/types/message";
 import type { ToolCallBuffer } from "./use-tool-call-buffer";
 
@@ -14,6 +15,9 @@ type UseMessageLifecycleResult = {
   handleToolCallEnd: (message: SdkToolMessage) => void;
   handleMessageEnd: (message: SdkAssistantMessage) => void;
   handleMessageReplace: (updatedMessage: SdkMessage) => void;
+  handleMessagePatch: (patch: MessagePatchEvent) => void;
+  handleToolExecution: (callId: string, elapsed: number) => void;
+  handleToolExecuted: (callId: string) => void;
   handleCancel: () => void;
   handleClose: () => void;
 };
@@ -118,6 +122,54 @@ export function useMessageLifecycle({ setData }: UseMessageLifecycleOptions): Us
     [setData]
   );
 
+  const handleMessagePatch = useCallback(
+    (patch: MessagePatchEvent) => {
+      setData((draft) => {
+        for (const message of draft.reverseIter()) {
+          if (message.id === patch.message_id && isToolMessage(message)) {
+            message.result = patch.result;
+            message.error = patch.error;
+            message.metadata = patch.metadata;
+            if (patch.result !== null || patch.error !== null) {
+              delete message.execution;
+            }
+            return;
+          }
+        }
+        console.warn("Tool message not found for patch: ", patch);
+      });
+    },
+    [setData]
+  );
+
+  const handleToolExecution = useCallback(
+    (callId: string, elapsed: number) => {
+      setData((draft) => {
+        for (const message of draft.reverseIter()) {
+          if (isToolMessage(message) && message.call_id === callId) {
+            message.execution = { elapsed };
+            return;
+          }
+        }
+      });
+    },
+    [setData]
+  );
+
+  const handleToolExecuted = useCallback(
+    (callId: string) => {
+      setData((draft) => {
+        for (const message of draft.reverseIter()) {
+          if (isToolMessage(message) && message.call_id === callId) {
+            delete message.execution;
+            return;
+          }
+        }
+      });
+    },
+    [setData]
+  );
+
   const handleClose = useCallback(() => {
     setData((draft) => (
       draft.filter((message) => {
@@ -126,6 +178,10 @@ export function useMessageLifecycle({ setData }: UseMessageLifecycleOptions): Us
         if (!isDeterminedMessage) {
           console.warn("Undetermined message found and removed: ", current(message));
         }
+        // no execution progress arrives once the stream is closed
+        if (isToolMessage(message)) {
+          delete message.execution;
+        }
         return isDeterminedMessage;
       })
     ));
@@ -139,6 +195,9 @@ export function useMessageLifecycle({ setData }: UseMessageLifecycleOptions): Us
     handleToolCallEnd,
     handleMessageEnd,
     handleMessageReplace,
+    handleMessagePatch,
+    handleToolExecution,
+    handleToolExecuted,
     handleCancel,
     handleClose,
   };
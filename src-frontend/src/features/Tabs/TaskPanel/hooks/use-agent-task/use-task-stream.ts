@@ -10,7 +10,7 @@ import {
 import { toast } from "sonner";
 import { useUnmount } from "ahooks";
 import type { TaskType } from "@/api/generated/schemas";
-import type { TaskSseCallbacks } from "@/api/tasks";
+import { attachTask, stopTask, type TaskSseCallbacks } from "@/api/tasks";
 import { useWakeLock } from "@/hooks/use-wake-lock";
 import type { TaskState } from ".";
 
@@ -27,6 +27,7 @@ type TaskStreamResult = {
     streamApi: TaskStreamFn<Body & { agent_id: number }>,
     body: Body,
   ) => void;
+  attach: (lastEventId: number) => void;
   cancel: () => void;
 };
 
@@ -127,21 +128,50 @@ export function useTaskStream({
     [state, taskId, taskType, agentId, wakeLock],
   );
 
+  // watch the run that is already in progress, its start event is not replayed
+  const attach = useCallback(
+    (lastEventId: number) => {
+      if (abortController.current) {
+        console.warn("Previous stream is not finished yet.");
+        return;
+      }
+      const overrideCallbacks = createOverrideCallbacks(
+        abortController,
+        wakeLock,
+        setState,
+        sseCallbacksRef,
+      );
+      setState("running");
+      wakeLock.acquire();
+      abortController.current = attachTask(taskType, taskId, lastEventId, overrideCallbacks);
+    },
+    [taskType, taskId, wakeLock],
+  );
+
   const cancel = useCallback(() => {
+    if (abortController.current && !abortController.current.signal.aborted) {
+      stopTask(taskType, taskId).catch((error) => console.warn("Failed to stop the task:", error));
+    }
     abortController.current?.abort();
     abortController.current = null;
     wakeLock.release();
     setState("idle");
-  }, [wakeLock]);
+  }, [taskType, taskId, wakeLock]);
 
-  useUnmount(cancel);
+  // closing the view only detaches from the run, it goes on in the background
+  useUnmount(() => {
+    abortController.current?.abort();
+    abortController.current = null;
+    wakeLock.release();
+  });
 
   return useMemo(
     () => ({
       state,
       startStream,
+      attach,
       cancel,
     }),
-    [state, startStream, cancel],
+    [state, startStream, attach, cancel],
   );
 }
@@ -19,8 +19,12 @@ export type UiUserMessage = UiBaseMessage & SdkUserMessage & {
 
 export type UiAssistantMessage = UiBaseMessage & SdkAssistantMessage;
 
+// set while the tool call is executing, elapsed is in seconds
+export type ToolExecution = { elapsed: number };
+
 export type UiToolMessage = UiBaseMessage
   & Omit<SdkToolMessage, "arguments">
+  & { execution?: ToolExecution }
   & (
     | ({ isStreaming: true  } & { arguments: string })
     | ({ isStreaming: false } & { arguments: ToolMessageArguments })
@@ -1,8 +1,11 @@
 import asyncio
+import multiprocessing
 from src.main import main
 
 def entry():
     asyncio.run(main())
 
 if __name__ == "__main__":
+    # required by the document conversion process pool in the frozen build
+    multiprocessing.freeze_support()
     entry()
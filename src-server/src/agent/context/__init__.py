@@ -1,15 +1,19 @@
+import asyncio
 import platform
+import time
 import xml.etree.ElementTree as ET
 from collections import namedtuple
+from collections.abc import Callable, Hashable
 from dataclasses import asdict
-from typing import Self
+from typing import Any, Self
 
 from anyxml import AnyXml
 from dais_sdk.tool import Toolset
-from dais_sdk.types import Message, ToolDef, ToolFn
+from dais_sdk.types import ToolDef
 from loguru import logger
 
 from src.db import db_context
+from src.db.models import tasks as task_models
 from src.schemas import (
     agent as agent_schemas,
     workspace as workspace_schemas,
@@ -26,6 +30,8 @@ from src.settings import use_app_setting_manager
 from .aliases import BuiltInToolAliases
 from .models import AgentContextResource, AgentContextPersistence
 from .persistence import create_agent_context_persistence
+from .tool_index import ToolIndex
+from .tracked_messages import TrackedMessages
 from ..notes import NoteMaterializer
 from ..prompts import (
     BASE_INSTRUCTION,
@@ -39,8 +45,8 @@ from ..prompts import (
     NO_AGENT_INSTRUCTION,
 )
 from ..tool import use_mcp_toolset_manager, BuiltinToolsetManager, BuiltinToolsetContext, McpToolsetManager
-from ..tool.types import is_tool_metadata
 from ..types import ContextUsage
+from ..utils import use_agent_metrics, use_document_preconverter
 
 
 class AgentContext:
@@ -50,9 +56,10 @@ class AgentContext:
                  task_id: int,
                  task_type: task_runtime_schemas.TaskType,
                  *,
-                 messages: list[Message],
+                 messages: TrackedMessages,
                  resource: AgentContextResource,
                  usage: ContextUsage,
+                 compaction: task_models.ContextCompaction | None = None,
                  persistence: AgentContextPersistence,
                  builtin_toolset_manager: BuiltinToolsetManager,
                  mcp_toolset_manager: McpToolsetManager):
@@ -62,50 +69,74 @@ class AgentContext:
         self._messages = messages
 
         self._usage = usage
+        self.compaction = compaction
         self._persistence = persistence
+        # serializes the persist calls, so that the change sets land in the order they were collected
+        self._persist_lock = asyncio.Lock()
         self._builtin_toolset_manager = builtin_toolset_manager
         self._mcp_toolset_manager = mcp_toolset_manager
         self._builtin_tool_aliases = BuiltInToolAliases(builtin_toolset_manager)
+        self._tool_index: ToolIndex | None = None
+        self._tool_index_revision: tuple[int, ...] | None = None
+        # section name -> (key of the section inputs, rendered section)
+        self._instruction_sections: dict[str, tuple[Hashable, Any]] = {}
 
-    @classmethod
-    async def create(cls, task: task_runtime_schemas.TaskRuntimeContext) -> Self:
-        assert task.agent_id is not None
-
+    @staticmethod
+    async def load_resource(agent_id: int, workspace_id: int) -> AgentContextResource:
         async with db_context() as db_session:
-            agent = await AgentService.from_db_session(db_session).get_by_id(task.agent_id)
-            workspace = await WorkspaceService.from_db_session(db_session).get_by_id(task.workspace_id)
-            skills = workspace.usable_skills
+            agent = await AgentService.from_db_session(db_session).get_by_id(agent_id)
+            workspace = await WorkspaceService.from_db_session(db_session).get_by_id(workspace_id)
 
             assert agent.model_id is not None
             model = await LlmModelService.from_db_session(db_session).get_by_id(agent.model_id)
             provider = await ProviderService.from_db_session(db_session).get_by_id(model.provider_id)
 
+            return AgentContextResource(
+                workspace=workspace_schemas.WorkspaceRead.model_validate(workspace),
+                agent=agent_schemas.AgentRead.model_validate(agent),
+                provider=provider_schemas.ProviderRead.model_validate(provider),
+                model=provider_schemas.LlmModelRead.model_validate(model),
+                skills=[skill_schemas.SkillBrief.model_validate(skill) for skill in workspace.usable_skills],
+            )
+
+    @classmethod
+    async def create(cls,
+                     task: task_runtime_schemas.TaskRuntimeContext,
+                     resource: AgentContextResource | None = None) -> Self:
+        """
+        Pass `resource` to reuse the agent, workspace and provider loaded for
+        another task of the same agent and workspace.
+        """
+        assert task.agent_id is not None
+        if (resource is None or
+            resource.agent.id != task.agent_id or
+            resource.workspace.id != task.workspace_id):
+            resource = await cls.load_resource(task.agent_id, task.workspace_id)
+        workspace = resource.workspace
+
+        # created before the usage is adjusted, so that it reflects the stored state
+        persistence = create_agent_context_persistence(task)
+
         usage = task.usage
-        usage.max_tokens = model.context_size
+        usage.max_tokens = resource.model.context_size
         usage = ContextUsage(**asdict(usage))
-        messages = task.messages
+        messages = TrackedMessages(task.messages)
 
-        builtin_toolset_manager = await BuiltinToolsetManager.create(
-            BuiltinToolsetContext(
-                task.id,
-                workspace.id,
-                workspace.directory,
-            )
+        builtin_toolset_context = BuiltinToolsetContext(
+            task.id,
+            workspace.id,
+            workspace.directory,
         )
+        builtin_toolset_manager = await BuiltinToolsetManager.create(builtin_toolset_context)
+        use_document_preconverter().activate(workspace.id, builtin_toolset_context.cwd)
         mcp_toolset_manager = use_mcp_toolset_manager()
 
-        persistence = create_agent_context_persistence(task)
         return cls(task.id,
                    task.type,
                    messages=messages,
-                   resource=AgentContextResource(
-                       workspace=workspace_schemas.WorkspaceRead.model_validate(workspace),
-                       agent=agent_schemas.AgentRead.model_validate(agent),
-                       provider=provider_schemas.ProviderRead.model_validate(provider),
-                       model=provider_schemas.LlmModelRead.model_validate(model),
-                       skills=[skill_schemas.SkillBrief.model_validate(skill) for skill in skills],
-                   ),
+                   resource=resource,
                    usage=usage,
+                   compaction=task.compaction,
                    persistence=persistence,
                    builtin_toolset_manager=builtin_toolset_manager,
                    mcp_toolset_manager=mcp_toolset_manager)
@@ -158,10 +189,32 @@ class AgentContext:
     def skills(self) -> list[skill_schemas.SkillBrief]:
         return [skill for skill in self._resource.skills if skill.is_enabled]
 
+    @property
+    def tool_index(self) -> ToolIndex:
+        # the built-in toolsets are fixed for the lifetime of the context,
+        # so the index only needs rebuilding when the MCP toolsets change
+        revision = self._mcp_toolset_manager.revision
+        if self._tool_index is None or revision != self._tool_index_revision:
+            self._tool_index = ToolIndex([*self._builtin_toolset_manager.toolsets,
+                                          *self._mcp_toolset_manager.toolsets])
+            self._tool_index_revision = revision
+        return self._tool_index
+
     @property
     def toolsets(self) -> list[Toolset]:
-        return [*self._builtin_toolset_manager.toolsets,
-                *self._mcp_toolset_manager.toolsets]
+        return self.tool_index.toolsets
+
+    @property
+    def tools(self) -> list[ToolDef]:
+        return self.tool_index.tools
+
+    @property
+    def workspace(self) -> workspace_schemas.WorkspaceRead:
+        return self._resource.workspace
+
+    @property
+    def agent(self) -> agent_schemas.AgentRead:
+        return self._resource.agent
 
     @property
     def provider(self) -> provider_schemas.ProviderRead:
@@ -172,24 +225,11 @@ class AgentContext:
         return self._resource.model
 
     @property
-    def messages(self) -> list[Message]: return self._messages
-    @messages.setter
-    def messages(self, new_messages: list[Message]): self._messages = new_messages
+    def messages(self) -> TrackedMessages: return self._messages
 
     async def filter_usable_tool_ids(self) -> set[int] | None:
-        from ..tool import BuiltinToolset, OrchestrationToolset, UserInteractionToolset
-        def find_builtin_tool_id(toolset_cls: type[BuiltinToolset], target_tool: ToolFn) -> int | None:
-            target_toolset = None
-            for toolset in self._builtin_toolset_manager.toolsets:
-                assert isinstance(toolset, BuiltinToolset)
-                if toolset.internal_key() == toolset_cls.internal_key():
-                    target_toolset = toolset
-            if target_toolset is None: return None
-            for tool_def in target_toolset.get_tools():
-                if tool_def.executes(target_tool):
-                    assert is_tool_metadata(tool_def.metadata)
-                    return tool_def.metadata["id"]
-            return None
+        from ..tool import OrchestrationToolset, UserInteractionToolset
+        find_builtin_tool_id = self.tool_index.find_builtin_tool_id
 
         workspace_usable_tool_ids = {tool.id for tool in self._resource.workspace.usable_tools}
         agent_usable_tool_ids = {tool.id for tool in self._resource.agent.usable_tools}
@@ -202,6 +242,7 @@ class AgentContext:
             # remove orchestration tools when the current task_type is "subtask"
             for orchestration_tool in (
                 OrchestrationToolset.create_subtask,
+                OrchestrationToolset.create_subtasks,
                 OrchestrationToolset.followup_subtask,
             ):
                 orchestration_tool_id = find_builtin_tool_id(
@@ -228,46 +269,101 @@ class AgentContext:
             return workspace_usable_tool_ids
         return workspace_usable_tool_ids & agent_usable_tool_ids
 
+    def _cached_section[T](self, section: str, key: Hashable, build: Callable[[], T]) -> T:
+        cached = self._instruction_sections.get(section)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        value = build()
+        self._instruction_sections[section] = (key, value)
+        return value
+
     async def compose_system_instruction(self) -> str:
+        """
+        Each section is cached by its inputs and the instruction is only re-rendered
+        when one of them changes, which also keeps the prompt prefix byte-identical
+        across turns for the provider-side prompt caching.
+        """
         settings = use_app_setting_manager().settings
-        available_skills = AgentContext._format_skills(self.skills)
-        available_toolsets = AgentContext._format_toolsets(self.toolsets)
-        resolved_instructions = self._resolve_instructions()
-
-        resolved_agents_appendix = APPENDIX_TEMPLATE.format(
-            id="D",
-            title="Available Agents",
-            content=AgentContext._format_agents(self._resource.workspace.usable_agents)
-        ) if self.task_type != "subtask" else "" # does not inject agents info under "subtask"
-
-        notes_index = await NoteMaterializer.get_notes_index(self._resource.workspace.id)
+        workspace = self._resource.workspace
+        agent = self._resource.agent
+
+        skills = self.skills
+        available_skills = self._cached_section(
+            "skills",
+            tuple((skill.id, skill.name, skill.description) for skill in skills),
+            lambda: AgentContext._format_skills(skills))
+
+        toolsets = self.toolsets
+        available_toolsets = self._cached_section(
+            "toolsets",
+            tuple((toolset.name, toolset.description) for toolset in toolsets),
+            lambda: AgentContext._format_toolsets(toolsets))
+
+        resolved_instructions = self._cached_section(
+            "instructions",
+            (workspace.instruction, agent.instruction),
+            self._resolve_instructions)
+
+        resolved_agents_appendix = self._cached_section(
+            "agents",
+            tuple((usable_agent.id, usable_agent.name, usable_agent.description)
+                  for usable_agent in workspace.usable_agents),
+            lambda: APPENDIX_TEMPLATE.format(
+                id="D",
+                title="Available Agents",
+                content=AgentContext._format_agents(workspace.usable_agents)
+            )) if self.task_type != "subtask" else "" # does not inject agents info under "subtask"
+
+        notes_index = await NoteMaterializer.get_notes_index(workspace.id)
         resolved_notes_index = notes_index if notes_index is not None else FAILED_TO_LOAD_NOTES_INDEX
 
-        return resolved_instructions.base.format(
-            base_role=DEFAULT_BASE_ROLE,
-            os_platform=platform.system(),
-            user_language=settings.reply_language,
-            available_skills=available_skills,
-            available_toolsets=available_toolsets,
-            runtime_appendices=resolved_agents_appendix,
-            workspace_notes_index=resolved_notes_index,
-            workspace_name=self._resource.workspace.name,
-            workspace_directory=self._resource.workspace.directory,
-            workspace_instruction=resolved_instructions.workspace,
-            agent_role=self._resource.agent.name,
-            agent_instruction=resolved_instructions.agent,
-        ).strip()
+        return self._cached_section(
+            "system_instruction",
+            (settings.reply_language,
+             available_skills,
+             available_toolsets,
+             resolved_agents_appendix,
+             resolved_notes_index,
+             resolved_instructions),
+            lambda: resolved_instructions.base.format(
+                base_role=DEFAULT_BASE_ROLE,
+                os_platform=platform.system(),
+                user_language=settings.reply_language,
+                available_skills=available_skills,
+                available_toolsets=available_toolsets,
+                runtime_appendices=resolved_agents_appendix,
+                workspace_notes_index=resolved_notes_index,
+                workspace_name=workspace.name,
+                workspace_directory=workspace.directory,
+                workspace_instruction=resolved_instructions.workspace,
+                agent_role=agent.name,
+                agent_instruction=resolved_instructions.agent,
+            ).strip())
 
     def find_tool(self, tool_name: str) -> ToolDef | None:
-        for toolset in self.toolsets:
-            for tool in toolset.get_tools():
-                if tool.name == tool_name:
-                    return tool
-        return None
+        return self.tool_index.find_by_name(tool_name)
+
+    def snapshot(self) -> task_runtime_schemas.TaskRuntimeContext:
+        """
+        The current runtime state, without writing it to the database.
+        """
+        return self._persistence.snapshot(self._messages, self._usage, self.compaction)
 
     async def persist(self) -> task_runtime_schemas.TaskRuntimeContext:
-        return await self._persistence.persist(
-            self.task_id,
-            self._messages,
-            self._usage,
-        )
+        async with self._persist_lock:
+            changes = self._messages.collect_changes()
+            started_at = time.perf_counter()
+            try:
+                return await self._persistence.persist(
+                    self.task_id,
+                    self._messages,
+                    changes,
+                    self._usage,
+                    self.compaction,
+                )
+            except BaseException:
+                self._messages.restore_changes(changes)
+                raise
+            finally:
+                use_agent_metrics().persist_duration.observe(
+                    time.perf_counter() - started_at, task_type=self.task_type)
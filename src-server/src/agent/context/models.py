@@ -9,6 +9,7 @@ from src.schemas import (
     workspace as workspace_schemas,
 )
 from src.schemas.tasks import runtime as task_runtime_schemas
+from .tracked_messages import MessageChanges
 
 
 @dataclass(frozen=True)
@@ -20,8 +21,16 @@ class AgentContextResource:
     skills: list[skill_schemas.SkillBrief]
 
 class AgentContextPersistence(Protocol):
+    def snapshot(self,
+                 messages: list[Message],
+                 usage: task_models.TaskUsage,
+                 compaction: task_models.ContextCompaction | None,
+                 ) -> task_runtime_schemas.TaskRuntimeContext: ...
+
     async def persist(self,
                       runtime_id: int,
                       messages: list[Message],
-                      usage: task_models.TaskUsage
+                      changes: MessageChanges,
+                      usage: task_models.TaskUsage,
+                      compaction: task_models.ContextCompaction | None,
                       ) -> task_runtime_schemas.TaskRuntimeContext: ...
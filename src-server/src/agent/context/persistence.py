@@ -1,77 +1,110 @@
-import time
+from dataclasses import asdict
 from typing import TYPE_CHECKING
 
 from dais_sdk.types import Message
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db import db_context
 from src.db.models import tasks as task_models
 from src.schemas.tasks import runtime as task_runtime_schemas
-from src.schemas.tasks import schedule as schedule_schemas
-from src.schemas.tasks import subtask as subtask_schemas
-from src.schemas.tasks import task as task_schemas
-from src.services.tasks import RunRecordService, SubtaskService, TaskService
+from src.services.tasks import RunRecordService, SubtaskService, TaskMessageService, TaskService
+
+from .tracked_messages import MessageChanges
 
 
 if TYPE_CHECKING:
     from src.agent.context.models import AgentContextPersistence
 
 
-class TaskPersistence:
-    async def persist(
-        self,
-        runtime_id: int,
-        messages: list[Message],
-        usage: task_models.TaskUsage,
-    ) -> task_runtime_schemas.TaskRuntimeContext:
-        update = task_schemas.TaskUpdate(
-            title=None,
-            agent_id=None,
-            messages=messages,
-            usage=usage,
-            last_run_at=int(time.time()),
-        )
-        async with db_context() as db_session:
-            task = await TaskService.from_db_session(db_session).update(runtime_id, update)
-        return task_runtime_schemas.TaskRuntimeContext.from_task(task)
+class MessageLogPersistence:
+    """
+    Persists the conversation into the per-message table,
+    writing only the positions reported in the change set.
+    """
+    task_type: task_runtime_schemas.TaskType
 
-class SubaskPersistence:
-    async def persist(
-        self,
-        runtime_id: int,
-        messages: list[Message],
-        usage: task_models.TaskUsage,
-    ) -> task_runtime_schemas.TaskRuntimeContext:
-        update = subtask_schemas.SubtaskUpdate(
-            messages=messages,
-            usage=usage,
-            task_id=None,
-            agent_id=None,
-        )
-        async with db_context() as db_session:
-            subtask = await SubtaskService.from_db_session(db_session).update(runtime_id, update)
-        return task_runtime_schemas.TaskRuntimeContext.from_subtask(subtask)
+    def __init__(self, runtime: task_runtime_schemas.TaskRuntimeContext):
+        self._runtime = runtime
+        self._persisted_state = self._dump_state(runtime.usage, runtime.compaction)
+
+    async def _update_usage(self,
+                            db_session: AsyncSession,
+                            runtime_id: int,
+                            usage: task_models.TaskUsage,
+                            compaction: task_models.ContextCompaction | None): ...
+
+    @staticmethod
+    def _dump_state(usage: task_models.TaskUsage,
+                    compaction: task_models.ContextCompaction | None) -> tuple[dict, dict | None]:
+        return asdict(usage), asdict(compaction) if compaction is not None else None
+
+    def snapshot(self,
+                 messages: list[Message],
+                 usage: task_models.TaskUsage,
+                 compaction: task_models.ContextCompaction | None,
+                 ) -> task_runtime_schemas.TaskRuntimeContext:
+        return self._runtime.model_copy(update={
+            "usage": task_models.TaskUsage(**asdict(usage)),
+            "messages": list(messages),
+            "compaction": compaction,
+        })
 
-class SchedulePersistence:
     async def persist(
         self,
         runtime_id: int,
         messages: list[Message],
+        changes: MessageChanges,
         usage: task_models.TaskUsage,
+        compaction: task_models.ContextCompaction | None,
     ) -> task_runtime_schemas.TaskRuntimeContext:
-        update = schedule_schemas.RunRecordUpdate(
-            run_at=None,
-            usage=usage,
-            messages=messages,
-            schedule_id=None,
-        )
+        result = self.snapshot(messages, usage, compaction)
+        state_snapshot = self._dump_state(result.usage, compaction)
+        if changes.is_empty and state_snapshot == self._persisted_state:
+            return result
+
         async with db_context() as db_session:
-            record = await RunRecordService.from_db_session(db_session).update(runtime_id, update)
-        return task_runtime_schemas.TaskRuntimeContext.from_schedule_record(record)
+            message_service = TaskMessageService.from_db_session(db_session, self.task_type)
+            if changes.truncated:
+                await message_service.truncate(runtime_id, changes.length)
+            await message_service.upsert(runtime_id, changes.upserts)
+            await self._update_usage(db_session, runtime_id, usage, compaction)
+        self._persisted_state = state_snapshot
+        return result
+
+class TaskPersistence(MessageLogPersistence):
+    task_type = task_runtime_schemas.TaskType.TASK
+
+    async def _update_usage(self,
+                            db_session: AsyncSession,
+                            runtime_id: int,
+                            usage: task_models.TaskUsage,
+                            compaction: task_models.ContextCompaction | None):
+        await TaskService.from_db_session(db_session).update_usage(runtime_id, usage, compaction)
+
+class SubaskPersistence(MessageLogPersistence):
+    task_type = task_runtime_schemas.TaskType.SUBTASK
+
+    async def _update_usage(self,
+                            db_session: AsyncSession,
+                            runtime_id: int,
+                            usage: task_models.TaskUsage,
+                            compaction: task_models.ContextCompaction | None):
+        await SubtaskService.from_db_session(db_session).update_usage(runtime_id, usage, compaction)
+
+class SchedulePersistence(MessageLogPersistence):
+    task_type = task_runtime_schemas.TaskType.SCHEDULE
+
+    async def _update_usage(self,
+                            db_session: AsyncSession,
+                            runtime_id: int,
+                            usage: task_models.TaskUsage,
+                            compaction: task_models.ContextCompaction | None):
+        await RunRecordService.from_db_session(db_session).update_usage(runtime_id, usage, compaction)
 
 def create_agent_context_persistence(
     task: task_runtime_schemas.TaskRuntimeContext,
 ) -> AgentContextPersistence:
     match task.type:
-        case task_runtime_schemas.TaskType.TASK: return TaskPersistence()
-        case task_runtime_schemas.TaskType.SUBTASK: return SubaskPersistence()
-        case task_runtime_schemas.TaskType.SCHEDULE: return SchedulePersistence()
+        case task_runtime_schemas.TaskType.TASK: return TaskPersistence(task)
+        case task_runtime_schemas.TaskType.SUBTASK: return SubaskPersistence(task)
+        case task_runtime_schemas.TaskType.SCHEDULE: return SchedulePersistence(task)
@@ -0,0 +1,59 @@
+from collections.abc import Sequence
+from types import MethodType
+
+from dais_sdk.tool import Toolset
+from dais_sdk.types import ToolDef, ToolFn
+
+from ..tool import BuiltinToolset
+from ..tool.types import is_tool_metadata
+
+
+def _normalize_tool_fn(fn: ToolFn) -> ToolFn:
+    # mirrors ToolDef.executes, so that bound methods and wrapped functions
+    # are keyed by their underlying function
+    while hasattr(fn, "__wrapped__"):
+        fn = getattr(fn, "__wrapped__")
+    if isinstance(fn, MethodType):
+        return fn.__func__
+    return fn
+
+class ToolIndex:
+    """
+    The tools of a context indexed by name, id, underlying function and toolset key,
+    built once from the toolsets so that the lookups do not call `get_tools` again.
+    """
+
+    def __init__(self, toolsets: Sequence[Toolset]):
+        self.toolsets = list(toolsets)
+        self.tools: list[ToolDef] = []
+        self._by_name: dict[str, ToolDef] = {}
+        self._by_id: dict[int, ToolDef] = {}
+        self._by_fn: dict[ToolFn, ToolDef] = {}
+        self._builtin_toolsets: dict[str, BuiltinToolset] = {}
+
+        for toolset in self.toolsets:
+            if isinstance(toolset, BuiltinToolset):
+                self._builtin_toolsets.setdefault(toolset.internal_key(), toolset)
+            for tool in toolset.get_tools():
+                self.tools.append(tool)
+                # the first toolset wins on conflicts, the same as a sequential scan
+                self._by_name.setdefault(tool.name, tool)
+                self._by_fn.setdefault(_normalize_tool_fn(tool.execute), tool)
+                assert is_tool_metadata(tool.metadata)
+                self._by_id.setdefault(tool.metadata["id"], tool)
+
+    def find_by_name(self, tool_name: str) -> ToolDef | None:
+        return self._by_name.get(tool_name)
+
+    def find_by_id(self, tool_id: int) -> ToolDef | None:
+        return self._by_id.get(tool_id)
+
+    def find_builtin_toolset(self, toolset_cls: type[BuiltinToolset]) -> BuiltinToolset | None:
+        return self._builtin_toolsets.get(toolset_cls.internal_key())
+
+    def find_builtin_tool_id(self, toolset_cls: type[BuiltinToolset], target_tool: ToolFn) -> int | None:
+        if self.find_builtin_toolset(toolset_cls) is None: return None
+        tool = self._by_fn.get(_normalize_tool_fn(target_tool))
+        if tool is None: return None
+        assert is_tool_metadata(tool.metadata)
+        return tool.metadata["id"]
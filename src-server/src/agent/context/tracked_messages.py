@@ -0,0 +1,142 @@
+import operator
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import SupportsIndex, overload
+
+from dais_sdk.types import Message
+
+
+@dataclass(frozen=True)
+class MessageChanges:
+    # (position, message) pairs of the appended or replaced messages
+    upserts: list[tuple[int, Message]]
+    # the current length of the conversation
+    length: int
+    # the length of the conversation at the last persist
+    persisted_length: int
+
+    @property
+    def truncated(self) -> bool:
+        """
+        Whether the persisted messages beyond `length` should be dropped.
+        """
+        return self.length < self.persisted_length
+
+    @property
+    def is_empty(self) -> bool:
+        return len(self.upserts) == 0 and not self.truncated
+
+class TrackedMessages(list[Message]):
+    """
+    A message list that records which positions changed since the last persist.
+
+    Structural changes (append, replace, truncate, ...) are tracked automatically,
+    while in-place mutations of a message (e.g. attaching a tool result)
+    must be reported through `mark_changed`.
+    """
+
+    def __init__(self, messages: Iterable[Message] = ()):
+        super().__init__(messages)
+        self._changed: set[int] = set()
+        self._persisted_length = len(self)
+
+    def _mark_from(self, start: int):
+        self._changed.update(range(start, len(self)))
+
+    def append(self, message: Message):
+        super().append(message)
+        self._changed.add(len(self) - 1)
+
+    def extend(self, messages: Iterable[Message]):
+        start = len(self)
+        super().extend(messages)
+        self._mark_from(start)
+
+    def __iadd__(self, messages: Iterable[Message]):
+        self.extend(messages)
+        return self
+
+    def insert(self, index: SupportsIndex, message: Message):
+        # normalize negative / out of range indices the same way as list.insert
+        start = operator.index(index)
+        if start < 0: start += len(self)
+        start = min(max(start, 0), len(self))
+        super().insert(index, message)
+        self._mark_from(start)
+
+    @overload
+    def __setitem__(self, index: SupportsIndex, value: Message): ...
+    @overload
+    def __setitem__(self, index: slice, value: Iterable[Message]): ...
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            start, _, _ = index.indices(len(self))
+            super().__setitem__(index, value)
+            self._mark_from(start)
+            return
+        super().__setitem__(index, value)
+        self._changed.add(range(len(self))[index])
+
+    def __delitem__(self, index: SupportsIndex | slice):
+        if isinstance(index, slice):
+            start, _, _ = index.indices(len(self))
+        else:
+            start = range(len(self))[index]
+        super().__delitem__(index)
+        self._mark_from(start)
+
+    def pop(self, index: SupportsIndex = -1) -> Message:
+        start = range(len(self))[index]
+        message = super().pop(index)
+        self._mark_from(start)
+        return message
+
+    def remove(self, message: Message):
+        self.pop(self.index(message))
+
+    def clear(self):
+        self.truncate(0)
+
+    def sort(self, *args, **kwargs):
+        super().sort(*args, **kwargs)
+        self._mark_from(0)
+
+    def reverse(self):
+        super().reverse()
+        self._mark_from(0)
+
+    def truncate(self, length: int):
+        """
+        Keep only the first `length` messages.
+        """
+        super().__delitem__(slice(length, None))
+
+    def mark_changed(self, message: Message):
+        """
+        Report an in-place mutation of a message in this list.
+        The lookup is by identity and starts from the tail,
+        where mutations (tool results, approvals) usually happen.
+        """
+        for index in range(len(self) - 1, -1, -1):
+            if super().__getitem__(index) is message:
+                self._changed.add(index)
+                return
+
+    def collect_changes(self) -> MessageChanges:
+        """
+        Take the changes since the last collection.
+        If persisting them fails, they should be handed back through `restore_changes`.
+        """
+        length = len(self)
+        changes = MessageChanges(
+            upserts=[(index, self[index]) for index in sorted(self._changed) if index < length],
+            length=length,
+            persisted_length=self._persisted_length,
+        )
+        self._changed = set()
+        self._persisted_length = length
+        return changes
+
+    def restore_changes(self, changes: MessageChanges):
+        self._changed.update(index for index, _ in changes.upserts)
+        self._persisted_length = max(self._persisted_length, changes.persisted_length)
@@ -12,6 +12,8 @@ from src.schemas import workspace as workspace_schemas
 class NoteMaterializer:
     NOTES_DIR_ENVNAME = "DAIS_NOTES_DIR"
     _logger = logger.bind(name="NoteMaterializer")
+    # NOTES.md path -> ((mtime_ns, size), content) of its last read
+    _notes_index_cache: dict[str, tuple[tuple[int, int], str]] = {}
 
     @staticmethod
     async def get_notes_root_dir() -> AnyioPath:
@@ -34,12 +36,24 @@ class NoteMaterializer:
     async def get_notes_index(cls, workspace_id: int) -> str | None:
         notes_dir = await cls.get_notes_dir(workspace_id)
         index_file = notes_dir / "NOTES.md"
-        if not await index_file.exists(): return None
         try:
-            return await index_file.read_text(encoding="utf-8")
+            stat = await index_file.stat()
+        except OSError:
+            return None
+
+        # the index is read on every LLM turn, only re-read it when the file changed
+        version = (stat.st_mtime_ns, stat.st_size)
+        cached = cls._notes_index_cache.get(str(index_file))
+        if cached is not None and cached[0] == version:
+            return cached[1]
+
+        try:
+            content = await index_file.read_text(encoding="utf-8")
         except:
             cls._logger.exception(f"Failed to read root NOTES.md for workspace {workspace_id}.")
             return None
+        cls._notes_index_cache[str(index_file)] = (version, content)
+        return content
 
     @classmethod
     async def materialize(cls, workspace: workspace_schemas.WorkspaceRead) -> AnyioPath:
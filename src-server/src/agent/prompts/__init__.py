@@ -9,6 +9,19 @@ from .builtin_agents import *
 USER_IGNORED_TOOL_CALL_RESULT = "[System] User ignored this tool call."
 USER_DENIED_TOOL_CALL_RESULT = "[System] User denied this tool call."
 
+COMPACTED_CONTEXT_SUMMARY = """\
+[System] The earlier part of this conversation has been compacted to fit the context window. Summary of the compacted messages:
+<context_summary>
+{summary}
+</context_summary>"""
+OFFLOADED_TOOL_RESULT = """\
+{head}
+[System] ... {omitted} characters omitted. The full result ({length} characters, {total_lines} lines) is saved at "{path}", {read_hint} if the omitted part is needed ...
+{tail}"""
+OFFLOADED_RESULT_READ_BY_LINES = "read it with the read_file tool in chunks of about {chunk_lines} lines"
+OFFLOADED_RESULT_READ_BY_CHARS = "its lines are too long to read by lines, read it with the read_file tool by `char_offset` in chunks of {chunk_chars} characters"
+ELIDED_TOOL_RESULT = "{preview}\n[... {count} characters elided, call the tool again if the full result is needed ...]"
+
 NO_AVAILABLE_SKILLS = "[System] There are no available skills in this workspace."
 NO_AVAILABLE_AGENTS = "[System] There are no available agents in this workspace."
 NO_AVAILABLE_TOOLSETS = "[System] There are no available toolsets in this workspace."
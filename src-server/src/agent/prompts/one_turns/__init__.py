@@ -1,24 +1,32 @@
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
 from dais_sdk import LLM
 
 from src.db import db_context
 from src.services.llm_model import LlmModelService
 
+from ...utils import use_provider_pool
+
+from .context_summarization import ContextSummarization, ContextSummarizationInput
 from .file_analyze import SemanticFileAnalysis, SemanticFileAnalysisInput
 from .title_summarization import TitleSummarization
 from .tool_call_safety_audit import ToolCallSafetyAudit, ToolCallSafetyAuditInput, ToolCallSafetyAuditOutput
 
 
-async def create_one_turn_llm(model_id: int) -> LLM:
+@asynccontextmanager
+async def use_one_turn_llm(model_id: int) -> AsyncGenerator[LLM]:
     async with db_context() as db_session:
         model = await LlmModelService.from_db_session(db_session).get_by_id(model_id)
         provider = model.provider
-    provider = LLM.create_provider(provider.type,
-                                                 provider.base_url,
-                                                 api_key=provider.api_key)
-    return LLM(model.name, provider=provider)
+    async with use_provider_pool().lease(provider.type,
+                                         provider.base_url,
+                                         provider.api_key) as pooled_provider:
+        yield LLM(model.name, provider=pooled_provider)
 
 __all__ = [
-    "create_one_turn_llm",
+    "use_one_turn_llm",
+    "ContextSummarization", "ContextSummarizationInput",
     "SemanticFileAnalysis", "SemanticFileAnalysisInput",
     "TitleSummarization",
     "ToolCallSafetyAudit",
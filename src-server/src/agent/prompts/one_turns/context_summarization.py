@@ -0,0 +1,67 @@
+INSTRUCTION = """\
+You are the memory module of an AI agent. The agent's conversation has grown too long for its context window, so the older part of it will be replaced with your summary. The agent will continue working with ONLY your summary and the most recent messages, so anything you omit is lost to it.
+
+## Input format
+
+```
+<input>
+    <previous_summary>
+        {{summary of the messages before this part, may be absent}}
+    </previous_summary>
+    <conversation>
+        <message role="{{user|assistant|tool}}">
+            {{message content}}
+        </message>
+        ...
+    </conversation>
+</input>
+```
+
+- Messages are listed in chronological order (earlier messages first).
+- When `previous_summary` is present, merge it with the new messages into a single summary.
+- Large tool results may have been shortened, marked with "[... N characters elided ...]".
+
+## What to keep
+
+- The user's requests, goals, constraints and preferences, in the user's own words where precise wording matters
+- Decisions made and the reasons for them
+- Work completed so far: files created or modified (with paths), commands run and their outcomes
+- Important facts discovered from tool results (identifiers, paths, values, errors) that later steps may depend on
+- Unresolved problems, open questions and the next steps that were planned
+
+## Output rules
+
+- Write in {language}, except for code, paths and identifiers, which must be kept verbatim
+- Use concise Markdown with short sections and bullet points
+- Do not invent information that is not in the input
+- Output the summary only, no preamble such as "Here is the summary"
+"""
+
+# --- --- --- --- --- ---
+
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from typing import override
+from dais_sdk import LLM, OneTurn
+from dais_sdk.types import Message
+from .utils import format_context
+
+@dataclass
+class ContextSummarizationInput:
+    previous_summary: str | None
+    messages: list[Message]
+
+class ContextSummarization(OneTurn[ContextSummarizationInput]):
+    def __init__(self, llm: LLM, language: str):
+        super().__init__(llm,
+                         INSTRUCTION.format(language=language),
+                         output="text")
+
+    @override
+    def format_input(self, input: ContextSummarizationInput) -> str:
+        root = ET.Element("input")
+        if input.previous_summary is not None:
+            ET.SubElement(root, "previous_summary").text = input.previous_summary
+        conversation = ET.SubElement(root, "conversation")
+        conversation.extend(format_context(input.messages))
+        return ET.tostring(root, encoding="unicode")
@@ -38,6 +38,10 @@ class AgentTask:
     def id(self) -> int:
         return self._ctx.task_id
 
+    @property
+    def agent_id(self) -> int:
+        return self._ctx._resource.agent.id
+
     @property
     def messages(self) -> MessageManager:
         return self._message_manager
@@ -90,6 +94,7 @@ class AgentTask:
                                 yield error_chunk
                                 break
                             retries += 1
+                            self._llm_request_manager.record_retry()
                             continue # retry
                         case TaskInterruptedEvent() as interrupted_chunk:
                             yield interrupted_chunk
@@ -174,6 +179,9 @@ class AgentTask:
                 except KeyError: return None
         return None
 
+    def snapshot(self) -> task_runtime_schemas.TaskRuntimeContext:
+        return self._ctx.snapshot()
+
     async def persist(self) -> task_runtime_schemas.TaskRuntimeContext:
         return await self._ctx.persist()
 
@@ -181,7 +189,19 @@ class AgentTask:
         self._is_running = False
         await self._llm_request_manager.cancel()
 
+from .registry import TaskRegistry, use_task_registry
+from .run_manager import TaskRun, TaskRunManager, use_task_run_manager
+from .subtask_executor import SubtaskExecutor, SubtaskOutcome, use_subtask_executor
+
 __all__ = [
     "AgentTask",
     "MessageNotFoundError",
+    "TaskRegistry",
+    "use_task_registry",
+    "TaskRun",
+    "TaskRunManager",
+    "use_task_run_manager",
+    "SubtaskExecutor",
+    "SubtaskOutcome",
+    "use_subtask_executor",
 ]
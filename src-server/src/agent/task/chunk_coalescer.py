@@ -0,0 +1,115 @@
+import asyncio
+import time
+from collections.abc import AsyncGenerator, AsyncIterator
+from dataclasses import dataclass
+
+from ..types import TextChunkEvent, ToolCallChunkEvent
+
+
+type StreamChunk = TextChunkEvent | ToolCallChunkEvent
+
+@dataclass(frozen=True)
+class _StreamEnd:
+    error: Exception | None = None
+
+class ChunkCoalescer:
+    """
+    Merges the adjacent text chunks of a message and the adjacent argument chunks of
+    a tool call, so that a fast model does not produce one SSE frame per token.
+
+    The merged chunk is emitted once it reaches `max_bytes`, `interval` seconds after
+    its first part arrived, or when a chunk that cannot be merged into it arrives.
+    """
+    def __init__(self, max_bytes: int, interval: float):
+        self._max_bytes = max_bytes
+        self._interval = interval
+        self._pending: StreamChunk | None = None
+        self._pending_bytes = 0
+        self._pending_since = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self._max_bytes > 0 and self._interval > 0
+
+    @staticmethod
+    def _size(chunk: StreamChunk) -> int:
+        match chunk:
+            case TextChunkEvent(content=content): return len(content.encode())
+            case ToolCallChunkEvent(arguments=arguments): return len((arguments or "").encode())
+
+    @staticmethod
+    def _merge(pending: StreamChunk, chunk: StreamChunk) -> StreamChunk | None:
+        match pending, chunk:
+            case TextChunkEvent(), TextChunkEvent() if pending.message_id == chunk.message_id:
+                return TextChunkEvent(content=pending.content + chunk.content,
+                                      message_id=pending.message_id)
+            case ToolCallChunkEvent(), ToolCallChunkEvent() if pending.index == chunk.index:
+                # the same as the accumulation of the client, the latest id and name win
+                arguments = (pending.arguments or "") + (chunk.arguments or "")
+                return ToolCallChunkEvent(call_id=chunk.call_id or pending.call_id,
+                                          name=chunk.name or pending.name,
+                                          arguments=arguments or None,
+                                          index=pending.index)
+        return None
+
+    def _take(self) -> list[StreamChunk]:
+        if self._pending is None: return []
+        pending, self._pending = self._pending, None
+        return [pending]
+
+    def _push[T](self, chunk: T) -> list[T | StreamChunk]:
+        if not isinstance(chunk, (TextChunkEvent, ToolCallChunkEvent)):
+            return [*self._take(), chunk]
+
+        if self._pending is not None and (merged := self._merge(self._pending, chunk)) is not None:
+            self._pending = merged
+            self._pending_bytes += self._size(chunk)
+            ready = []
+        else:
+            ready = self._take()
+            self._pending = chunk
+            self._pending_bytes = self._size(chunk)
+            self._pending_since = time.monotonic()
+
+        if self._pending_bytes >= self._max_bytes:
+            ready.extend(self._take())
+        return ready
+
+    def _timeout(self) -> float | None:
+        if self._pending is None: return None
+        return max(self._pending_since + self._interval - time.monotonic(), 0)
+
+    async def coalesce[T](self, stream: AsyncIterator[T]) -> AsyncGenerator[T | StreamChunk, None]:
+        if not self.enabled:
+            async for chunk in stream:
+                yield chunk
+            return
+
+        # the stream is consumed by its own task, so that the interval can pass while
+        # a chunk is awaited without cancelling the iteration of the stream
+        queue: asyncio.Queue[T | _StreamEnd] = asyncio.Queue()
+        async def produce():
+            try:
+                async for chunk in stream:
+                    queue.put_nowait(chunk)
+                queue.put_nowait(_StreamEnd())
+            except Exception as e:
+                queue.put_nowait(_StreamEnd(e))
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), self._timeout())
+                except TimeoutError:
+                    for ready in self._take(): yield ready
+                    continue
+                if isinstance(item, _StreamEnd):
+                    # the partial content is still delivered before the error
+                    for ready in self._take(): yield ready
+                    if item.error is not None: raise item.error
+                    return
+                for ready in self._push(item): yield ready
+        finally:
+            producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
@@ -0,0 +1,134 @@
+from dais_sdk.types import Message, ToolMessage, UserMessage
+from loguru import logger
+
+from src.db.models import tasks as task_models
+from src.settings import use_app_setting_manager
+
+from ..context import AgentContext
+from ..prompts import (
+    COMPACTED_CONTEXT_SUMMARY,
+    ELIDED_TOOL_RESULT,
+    ContextSummarization,
+    ContextSummarizationInput,
+    use_one_turn_llm,
+)
+
+
+class ContextCompactor:
+    """
+    Keeps the requests of long-running tasks within the context window of the model.
+
+    Once the last request used more than the configured share of the context size,
+    the older messages are summarized with the flash model and the requests only carry
+    the summary and the recent messages. The compaction never rewrites the history,
+    it only records how many leading messages the summary covers.
+    """
+    _logger = logger.bind(name="ContextCompactor")
+
+    # the most recent messages are always sent as they are
+    KEEP_RECENT_MESSAGES = 8
+    # stale tool results longer than this are shortened to a preview
+    ELIDE_RESULT_LENGTH = 4000
+    ELIDED_PREVIEW_LENGTH = 500
+
+    def __init__(self, ctx: AgentContext):
+        self._ctx = ctx
+        # the conversation length at the last failed attempt, to avoid retrying on every request
+        self._failed_at_length: int | None = None
+
+    @classmethod
+    def _elide(cls, message: Message) -> Message:
+        if (not isinstance(message, ToolMessage) or
+            not isinstance(message.result, str) or
+            len(message.result) <= cls.ELIDE_RESULT_LENGTH):
+            return message
+        result = ELIDED_TOOL_RESULT.format(
+            preview=message.result[:cls.ELIDED_PREVIEW_LENGTH],
+            count=len(message.result) - cls.ELIDED_PREVIEW_LENGTH)
+        return message.model_copy(update={"result": result})
+
+    def _current_compaction(self) -> task_models.ContextCompaction | None:
+        compaction = self._ctx.compaction
+        if compaction is None: return None
+        messages = self._ctx.messages
+        if (compaction.boundary > len(messages) or
+            messages[compaction.boundary - 1].id != compaction.last_message_id):
+            # the covered messages were edited or truncated, the summary no longer applies
+            self._ctx.compaction = None
+            return None
+        return compaction
+
+    def _find_boundary(self, start: int) -> int | None:
+        """
+        The latest position that keeps the recent messages and does not start the kept
+        messages with a tool result, which would separate it from its tool call.
+        """
+        messages = self._ctx.messages
+        for position in range(len(messages) - self.KEEP_RECENT_MESSAGES, start, -1):
+            if not isinstance(messages[position], ToolMessage):
+                return position
+        return None
+
+    def should_compact(self) -> bool:
+        settings = use_app_setting_manager().settings
+        usage = self._ctx.usage
+        if not settings.context_compaction or settings.flash_model is None: return False
+        if usage.max_tokens <= 0: return False
+        if self._failed_at_length == len(self._ctx.messages): return False
+        return usage.total_tokens * 100 >= usage.max_tokens * settings.context_compaction_threshold
+
+    async def compact(self) -> bool:
+        """
+        Summarize the messages between the current boundary and the recent messages.
+        Returns False if there is nothing to compact.
+        """
+        settings = use_app_setting_manager().settings
+        assert settings.flash_model is not None
+
+        compaction = self._current_compaction()
+        start = compaction.boundary if compaction is not None else 0
+        boundary = self._find_boundary(start)
+        if boundary is None: return False
+
+        messages = self._ctx.messages
+        length = len(messages)
+        last_message = messages[boundary - 1]
+        summary_input = ContextSummarizationInput(
+            previous_summary=compaction.summary if compaction is not None else None,
+            messages=[self._elide(message) for message in messages[start:boundary]])
+        async with use_one_turn_llm(settings.flash_model) as llm:
+            summary = await ContextSummarization(llm, settings.reply_language)(summary_input)
+
+        self._ctx.compaction = task_models.ContextCompaction(
+            boundary=boundary,
+            last_message_id=last_message.id,
+            summary=summary.strip(),
+            elide_before=length - self.KEEP_RECENT_MESSAGES)
+        self._logger.info(f"Compacted {boundary - start} messages of task {self._ctx.task_id}")
+        return True
+
+    async def compact_if_needed(self):
+        if not self.should_compact(): return
+        try:
+            await self.compact()
+            self._failed_at_length = None
+        except Exception:
+            self._failed_at_length = len(self._ctx.messages)
+            self._logger.exception("Failed to compact the context, the full history is sent instead.")
+
+    def build_messages(self) -> list[Message]:
+        """
+        The messages to send in the next request.
+        """
+        compaction = self._current_compaction()
+        messages = self._ctx.messages
+        if compaction is None: return messages
+
+        tail = [self._elide(message) if position < compaction.elide_before else message
+                for position, message in enumerate(messages[compaction.boundary:], compaction.boundary)]
+        summary = COMPACTED_CONTEXT_SUMMARY.format(summary=compaction.summary)
+        if len(tail) > 0 and isinstance(head := tail[0], UserMessage):
+            tail[0] = head.model_copy(update={"content": f"{summary}\n\n{head.content}"})
+            return tail
+        # a stable id keeps the request prefix identical between compactions
+        return [UserMessage(id=f"compaction-{compaction.last_message_id}", content=summary), *tail]
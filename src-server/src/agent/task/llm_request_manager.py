@@ -1,6 +1,9 @@
 import asyncio
+import time
 import uuid
 from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
 from typing import override
 
 from anyio import Path
@@ -16,13 +19,18 @@ from dais_sdk.types import (
     ToolCallChunkEvent as SdkToolCallChunkEvent,
 )
 from loguru import logger
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.db import db_context
 from src.schemas.tasks import runtime as task_runtime_schemas
+from src.services.markdown_cache import MarkdownContentService
 from src.services.tasks import TaskResourceService
+from src.settings import use_app_setting_manager
 from src.utils import MarkdownConverter, to_base64_str
 
 from ..context import AgentContext
+from .chunk_coalescer import ChunkCoalescer
+from .context_compactor import ContextCompactor
 from ..types import (
     is_task_resource_metadata, FileResourceMetadata,
     MessageStartEvent, MessageEndEvent,
@@ -30,7 +38,7 @@ from ..types import (
     ToolCallEndEvent,
     TaskInterruptedEvent, ErrorEvent
 )
-from ..utils import get_magika, normalize_content_type
+from ..utils import get_magika, normalize_content_type, use_agent_metrics, use_provider_pool
 
 
 class TaskResourceRetriever(ContentBlockResolver):
@@ -49,22 +57,38 @@ class TaskResourceRetriever(ContentBlockResolver):
         result = await asyncio.to_thread(self._magika.identify_path, path)
         return MarkdownConverter.is_convertable_binary(result.output.label)
 
-    async def _convert_to_markdown_cached(self, path: Path) -> str:
-        markdowned_path = path.with_name(path.name + ".md")
-        if await markdowned_path.exists():
-            return await markdowned_path.read_text("utf-8")
-        result = await self._markdown_converter.convert(path)
-        await markdowned_path.write_text(result, "utf-8")
+    async def _convert_to_markdown_cached(self,
+                                          db_session: AsyncSession,
+                                          path: Path,
+                                          checksum: str) -> str:
+        # the resource checksum is the SHA-256 of its bytes, the same key as the workspace file conversions
+        content_service = MarkdownContentService.from_db_session(db_session)
+        cached = await content_service.lookup(checksum)
+        if cached is not None:
+            content, touch_due = cached
+            if touch_due:
+                await content_service.touch(checksum)
+            return content
+        result = await self._markdown_converter.convert(path, checksum)
+        await content_service.set(checksum, result)
         return result
 
     async def _resolve_file_resource(self, metadata: FileResourceMetadata) -> ContentBlock | None:
         async with db_context() as db_session:
-            resource_path = await TaskResourceService.from_db_session(db_session, self._task_type).load_task_resource(self._task_id, metadata["resource_id"])
-            if resource_path is None: return None
+            resource_service = TaskResourceService.from_db_session(db_session, self._task_type)
+            resource = await resource_service.get_task_resource(self._task_id, metadata["resource_id"])
+            if resource is None: return None
+            resource_path = await resource_service.get_task_resource_path(self._task_id, resource)
+            if not await resource_path.exists(): return None
 
             normalized_resource_type = normalize_content_type(metadata["mimetype"])
             if normalized_resource_type == "text": return TextBlock(text=await resource_path.read_text("utf-8"))
 
+            if (normalized_resource_type == "document" and
+                await self._is_resource_convertable(resource_path)):
+                markdowned = await self._convert_to_markdown_cached(db_session, resource_path, resource.checksum)
+                return TextBlock(text=markdowned)
+
             resource_bytes = await resource_path.read_bytes()
             resource_base64 = await asyncio.to_thread(to_base64_str, resource_bytes)
             source = Base64Source(mime_type=metadata["mimetype"], data=resource_base64)
@@ -72,11 +96,7 @@ class TaskResourceRetriever(ContentBlockResolver):
                 case "image": return ImageBlock(source=source)
                 case "audio": return AudioBlock(source=source)
                 case "video": return VideoBlock(source=source)
-                case "document":
-                    if await self._is_resource_convertable(resource_path):
-                        markdowned = await self._convert_to_markdown_cached(resource_path)
-                        return TextBlock(text=markdowned)
-                    return DocumentBlock(source=source)
+                case "document": return DocumentBlock(source=source)
 
     @override
     async def resolve(self, metadata: ContentBlockMetadata) -> list[ContentBlock] | ContentBlock | None:
@@ -99,6 +119,16 @@ class TaskResourceRetriever(ContentBlockResolver):
         attachment_end_block = TextBlock(text="</attachment>")
         return [attachment_start_block, file_block, attachment_end_block]
 
+@dataclass
+class _RequestStats:
+    started_at: float = field(default_factory=time.perf_counter)
+    first_chunk_at: float | None = None
+    output_tokens: int = 0
+
+    def mark_first_chunk(self):
+        if self.first_chunk_at is None:
+            self.first_chunk_at = time.perf_counter()
+
 class LlmRequestManager:
     _logger = logger.bind(name="LlmRequestManager")
     FINISHING_CHUNK_TYPE = MessageEndEvent, TaskInterruptedEvent, ErrorEvent
@@ -106,19 +136,52 @@ class LlmRequestManager:
     def __init__(self, ctx: AgentContext):
         self._ctx = ctx
         self._current_stream: AsyncGenerator | None = None
+        self._resource_retriever = TaskResourceRetriever(ctx.task_id, ctx.task_type)
+        self._compactor = ContextCompactor(ctx)
+
+    @asynccontextmanager
+    async def _use_llm(self) -> AsyncGenerator[LLM]:
+        # the provider client is owned by the pool, so the LLM must not be closed here
+        async with use_provider_pool().lease(self._ctx.provider.type,
+                                             self._ctx.provider.base_url,
+                                             self._ctx.provider.api_key) as provider:
+            yield LLM(self._ctx.model.name, provider, self._resource_retriever)
+
+    def _metric_labels(self) -> dict[str, str]:
+        return {
+            "provider": self._ctx.provider.name,
+            "model": self._ctx.model.name,
+            "agent": self._ctx.agent.name,
+        }
 
-    def _llm_factory(self) -> LLM:
-        provider = LLM.create_provider(self._ctx.provider.type,
-                                                     self._ctx.provider.base_url,
-                                                     api_key=self._ctx.provider.api_key)
-        model_name = self._ctx.model.name
-        resource_retriever = TaskResourceRetriever(self._ctx.task_id, self._ctx.task_type)
-        return LLM(model_name, provider, resource_retriever)
+    def _record_usage(self, usage: SdkUsageChunkEvent, stats: _RequestStats):
+        labels = {**self._metric_labels(), "task": f"{self._ctx.task_type}:{self._ctx.task_id}"}
+        metrics = use_agent_metrics()
+        metrics.llm_tokens.inc(usage.input_tokens, direction="input", **labels)
+        metrics.llm_tokens.inc(usage.output_tokens, direction="output", **labels)
+        stats.output_tokens = usage.output_tokens
+
+    def _record_request(self, stats: _RequestStats):
+        labels = self._metric_labels()
+        metrics = use_agent_metrics()
+        finished_at = time.perf_counter()
+        metrics.llm_request_duration.observe(finished_at - stats.started_at, **labels)
+        if stats.first_chunk_at is None: return
+        metrics.llm_time_to_first_token.observe(stats.first_chunk_at - stats.started_at, **labels)
+        streaming_time = finished_at - stats.first_chunk_at
+        if stats.output_tokens > 0 and streaming_time > 0:
+            metrics.llm_output_tokens_per_second.observe(stats.output_tokens / streaming_time,
+                                                         provider=labels["provider"],
+                                                         model=labels["model"])
+
+    def record_retry(self):
+        use_agent_metrics().llm_retries.inc(**self._metric_labels())
 
     async def _create_request_param(self) -> LlmRequestParams:
+        await self._compactor.compact_if_needed()
         params = LlmRequestParams(
             instructions=await self._ctx.compose_system_instruction(),
-            messages=self._ctx.messages)
+            messages=self._compactor.build_messages())
         if self._ctx.model.capability.reasoning_effort is not None:
             params.reasoning = self._ctx.model.capability.reasoning_effort
         usable_tool_ids = await self._ctx.filter_usable_tool_ids()
@@ -130,13 +193,41 @@ class LlmRequestManager:
             params.tool_choice = "none"
         else:
             params.tools = [tool
-                            for toolset in self._ctx.toolsets
-                            for tool in toolset.get_tools()
+                            for tool in self._ctx.tools
                             if tool.metadata["id"] in usable_tool_ids]
             params.tool_choice = "auto"
 
         return params
 
+    async def _convert_chunks(self,
+                              stream: AsyncGenerator,
+                              assistant_message_id: str,
+                              stats: _RequestStats,
+                              ) -> AsyncGenerator[TextChunkEvent
+                                                  | ToolCallChunkEvent
+                                                  | UsageChunkEvent
+                                                  | MessageEndEvent, None]:
+        async for chunk in stream:
+            stats.mark_first_chunk()
+            match chunk:
+                case SdkTextChunkEvent() as chunk:
+                    yield TextChunkEvent.from_sdk(chunk, assistant_message_id)
+                case SdkToolCallChunkEvent() as chunk:
+                    yield ToolCallChunkEvent.from_sdk(chunk)
+                case SdkUsageChunkEvent() as chunk:
+                    self._ctx.usage.accumulate(chunk)
+                    self._record_usage(chunk, stats)
+                    yield UsageChunkEvent.from_task_usage(self._ctx.usage)
+                case AssistantMessageEvent(message):
+                    message.id = assistant_message_id
+                    yield MessageEndEvent.from_sdk(message)
+
+    @staticmethod
+    def _create_coalescer() -> ChunkCoalescer:
+        settings = use_app_setting_manager().settings
+        return ChunkCoalescer(max_bytes=settings.stream_coalesce_bytes,
+                              interval=settings.stream_coalesce_interval / 1000)
+
     async def create_llm_call(self) -> AsyncGenerator[MessageStartEvent
                                                     | TextChunkEvent
                                                     | ToolCallChunkEvent
@@ -150,32 +241,24 @@ class LlmRequestManager:
         """
         assistant_message_id = str(uuid.uuid4())
         request_params = await self._create_request_param()
-        llm = self._llm_factory()
-        try:
-            self._current_stream = llm.stream_text(request_params)
-            yield MessageStartEvent(message_id=assistant_message_id)
-            async for chunk in self._current_stream:
-                match chunk:
-                    case SdkTextChunkEvent() as chunk:
-                        yield TextChunkEvent.from_sdk(chunk, assistant_message_id)
-                    case SdkToolCallChunkEvent() as chunk:
-                        yield ToolCallChunkEvent.from_sdk(chunk)
-                    case SdkUsageChunkEvent() as chunk:
-                        self._ctx.usage.accumulate(chunk)
-                        yield UsageChunkEvent.from_task_usage(self._ctx.usage)
-                    case AssistantMessageEvent(message):
-                        message.id = assistant_message_id
-                        yield MessageEndEvent.from_sdk(message)
-        except asyncio.CancelledError:
-            yield TaskInterruptedEvent()
-            raise
-        except Exception as e:
-            self._logger.exception("Failed to create llm call.")
-            retryable = isinstance(e, (ProviderRateLimitError, ProviderServerError, ProviderTimeoutError, ProviderNetworkError))
-            yield ErrorEvent(error=str(e), retryable=retryable)
-        finally:
-            self._current_stream = None
-            await asyncio.shield(llm.close())
+        stats = _RequestStats()
+        async with self._use_llm() as llm:
+            try:
+                self._current_stream = llm.stream_text(request_params)
+                yield MessageStartEvent(message_id=assistant_message_id)
+                chunks = self._convert_chunks(self._current_stream, assistant_message_id, stats)
+                async for chunk in self._create_coalescer().coalesce(chunks):
+                    yield chunk
+            except asyncio.CancelledError:
+                yield TaskInterruptedEvent()
+                raise
+            except Exception as e:
+                self._logger.exception("Failed to create llm call.")
+                retryable = isinstance(e, (ProviderRateLimitError, ProviderServerError, ProviderTimeoutError, ProviderNetworkError))
+                yield ErrorEvent(error=str(e), retryable=retryable)
+            finally:
+                self._current_stream = None
+                self._record_request(stats)
 
     async def cancel(self):
         if self._current_stream is not None:
@@ -42,4 +42,5 @@ class MessageManager:
         assert target_index is not None
         assert target_message.role == "user"
         target_message.content = new_content
-        self._ctx.messages = self._ctx.messages[: target_index + 1]
+        self._ctx.messages.mark_changed(target_message)
+        self._ctx.messages.truncate(target_index + 1)
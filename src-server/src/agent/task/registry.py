@@ -0,0 +1,216 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from src.schemas.tasks import runtime as task_runtime_schemas
+
+
+if TYPE_CHECKING:
+    from . import AgentTask
+
+
+type TaskKey = tuple[task_runtime_schemas.TaskType, int]
+type AgentTaskFactory = Callable[[], Awaitable[AgentTask]]
+
+@dataclass
+class _RegistryEntry:
+    task: AgentTask
+    last_used_at: float = field(default_factory=time.monotonic)
+    # number of callers currently holding the task, leased entries are never evicted
+    leases: int = 0
+    # set while no caller holds the task
+    idle: asyncio.Event = field(default_factory=asyncio.Event)
+    pending_persist: asyncio.Task | None = None
+
+class TaskRegistry:
+    """
+    Keeps the recently used AgentTasks alive, so that the task control operations
+    work on the in-memory context instead of rebuilding it from the database per request.
+
+    Entries are evicted in LRU order when the capacity is exceeded or when they
+    stay idle longer than `idle_timeout`; pending writes are flushed on eviction.
+
+    No lock is held while a task is built or flushed, so that the tasks are created
+    in parallel; the concurrent leases of the same key share one build, and a key
+    is only rebuilt after the flush of its evicted task has finished.
+    A lease with another agent waits until the current holders release the task,
+    so that only one live task of a key has changes to persist.
+    """
+    _logger = logger.bind(name="TaskRegistry")
+
+    def __init__(self,
+                 capacity: int = 32,
+                 idle_timeout: float = 600,
+                 persist_delay: float = 1):
+        self._capacity = capacity
+        self._idle_timeout = idle_timeout
+        self._persist_delay = persist_delay
+        self._entries: OrderedDict[TaskKey, _RegistryEntry] = OrderedDict()
+        # set when the in-flight build of the key has finished, successfully or not
+        self._building: dict[TaskKey, asyncio.Event] = {}
+        self._flushing: dict[TaskKey, asyncio.Task] = {}
+
+    def get(self, task_type: task_runtime_schemas.TaskType, task_id: int) -> AgentTask | None:
+        entry = self._entries.get((task_type, task_id))
+        return entry.task if entry is not None else None
+
+    async def _acquire(self,
+                       key: TaskKey,
+                       agent_id: int,
+                       factory: AgentTaskFactory,
+                       ) -> _RegistryEntry:
+        while True:
+            entry = self._entries.get(key)
+            if entry is not None and entry.task.agent_id != agent_id:
+                if entry.leases > 0:
+                    await entry.idle.wait()
+                    continue
+                # the task is rebuilt for the new agent once its changes are flushed
+                self._evict(key)
+                entry = None
+            if entry is not None:
+                self._entries.move_to_end(key)
+                entry.leases += 1
+                entry.idle.clear()
+                entry.last_used_at = time.monotonic()
+                return entry
+
+            building = self._building.get(key)
+            if building is not None:
+                await building.wait()
+                continue
+            flushing = self._flushing.get(key)
+            if flushing is not None:
+                await asyncio.wait([flushing])
+                continue
+
+            building = self._building[key] = asyncio.Event()
+            try:
+                self._entries[key] = _RegistryEntry(await factory())
+            finally:
+                self._building.pop(key)
+                building.set()
+
+    async def _release(self, entry: _RegistryEntry):
+        entry.leases -= 1
+        entry.last_used_at = time.monotonic()
+        if entry.leases == 0:
+            entry.idle.set()
+        await self._wait_flushed(self._sweep())
+
+    @asynccontextmanager
+    async def lease(self,
+                    task_type: task_runtime_schemas.TaskType,
+                    task_id: int,
+                    agent_id: int,
+                    factory: AgentTaskFactory,
+                    ) -> AsyncGenerator[AgentTask]:
+        """
+        Get the live task for the given key, creating it through `factory` when absent,
+        and keep it from being evicted until the context exits.
+        """
+        entry = await self._acquire((task_type, task_id), agent_id, factory)
+        try:
+            yield entry.task
+        finally:
+            await asyncio.shield(self._release(entry))
+
+    def schedule_persist(self, task_type: task_runtime_schemas.TaskType, task_id: int):
+        """
+        Persist the task after a short delay, so that successive
+        control operations are written to the database together.
+        """
+        entry = self._entries.get((task_type, task_id))
+        if entry is None or entry.pending_persist is not None: return
+
+        async def delayed_persist():
+            await asyncio.sleep(self._persist_delay)
+            entry.pending_persist = None
+            try:
+                await entry.task.persist()
+            except Exception:
+                self._logger.exception(f"Failed to persist task {(task_type, task_id)}")
+        entry.pending_persist = asyncio.create_task(delayed_persist())
+
+    async def _flush_entry(self, entry: _RegistryEntry):
+        pending_persist, entry.pending_persist = entry.pending_persist, None
+        if pending_persist is not None:
+            pending_persist.cancel()
+            await asyncio.gather(pending_persist, return_exceptions=True)
+        # a no-op when nothing changed since the last persist
+        await entry.task.persist()
+
+    async def flush(self, task_type: task_runtime_schemas.TaskType, task_id: int):
+        """
+        Write the pending changes of the task immediately.
+        """
+        entry = self._entries.get((task_type, task_id))
+        if entry is not None:
+            await self._flush_entry(entry)
+
+    async def _flush_evicted(self, key: TaskKey, entry: _RegistryEntry):
+        try:
+            await self._flush_entry(entry)
+        except Exception:
+            self._logger.exception(f"Failed to persist evicted task {key}")
+        finally:
+            if self._flushing.get(key) is asyncio.current_task():
+                self._flushing.pop(key)
+
+    def _evict(self, key: TaskKey) -> asyncio.Task:
+        """Drop the entry and start flushing it, the key is not rebuilt until the flush finishes."""
+        entry = self._entries.pop(key)
+        flushing = self._flushing[key] = asyncio.create_task(self._flush_evicted(key, entry))
+        return flushing
+
+    @staticmethod
+    async def _wait_flushed(flushings: list[asyncio.Task]):
+        if len(flushings) > 0:
+            await asyncio.wait(flushings)
+
+    def _sweep(self) -> list[asyncio.Task]:
+        now = time.monotonic()
+        expired = [key for key, entry in self._entries.items()
+                   if entry.leases == 0 and now - entry.last_used_at > self._idle_timeout]
+        flushings = [self._evict(key) for key in expired]
+
+        # the entries are kept in LRU order, the least recently used ones come first
+        overflow = len(self._entries) - self._capacity
+        for key in [key for key, entry in self._entries.items() if entry.leases == 0][:max(overflow, 0)]:
+            flushings.append(self._evict(key))
+        return flushings
+
+    def discard(self, task_type: task_runtime_schemas.TaskType, task_id: int):
+        """
+        Drop the task without persisting it, e.g. when it has been deleted.
+        """
+        entry = self._entries.pop((task_type, task_id), None)
+        if entry is not None and entry.pending_persist is not None:
+            entry.pending_persist.cancel()
+
+    async def evict_all(self):
+        """
+        Flush and drop all the idle tasks, so that they are rebuilt with
+        the up-to-date agent, workspace and provider configurations.
+        """
+        await self._wait_flushed([self._evict(key)
+                                  for key, entry in list(self._entries.items()) if entry.leases == 0])
+
+    async def shutdown(self):
+        for key in list(self._entries.keys()):
+            self._evict(key)
+        await self._wait_flushed(list(self._flushing.values()))
+
+__instance: TaskRegistry | None = None
+
+def use_task_registry() -> TaskRegistry:
+    global __instance
+    if __instance is None:
+        __instance = TaskRegistry()
+    return __instance
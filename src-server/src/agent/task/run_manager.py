@@ -0,0 +1,175 @@
+import asyncio
+from collections.abc import AsyncGenerator, Callable
+from contextlib import AbstractAsyncContextManager
+from typing import TYPE_CHECKING
+
+from loguru import logger
+
+from src.schemas.tasks import runtime as task_runtime_schemas
+from src.utils.event_hub import EventHub, HubEvent
+
+from ..types import AgentEvent, ErrorEvent, MessageEndEvent, MessageStartEvent, TaskDoneEvent, TaskInterruptedEvent
+
+if TYPE_CHECKING:
+    from . import AgentTask
+
+
+_logger = logger.bind(name="TaskRunManager")
+
+type TaskKey = tuple[task_runtime_schemas.TaskType, int]
+type AgentTaskLease = Callable[[], AbstractAsyncContextManager[AgentTask]]
+
+class TaskRun:
+    """One run of an agent task, its events are kept for the viewers that attach later."""
+    def __init__(self, key: TaskKey, history_size: int):
+        self.key = key
+        self.hub = EventHub[AgentEvent](subscriber_capacity=history_size, history_size=history_size)
+        self.job: asyncio.Task | None = None
+        # the id of the start event of the assistant message being streamed
+        self._message_start_id: int | None = None
+
+    @property
+    def is_running(self) -> bool:
+        return self.job is not None and not self.job.done()
+
+    @property
+    def resume_event_id(self) -> int:
+        """
+        The id to attach after for a client holding a snapshot of the task taken now.
+        The assistant message being streamed is not in the snapshot yet,
+        so its events are replayed from its start.
+        """
+        if self._message_start_id is not None:
+            return self._message_start_id - 1
+        return self.hub.last_event_id
+
+    def publish(self, event: AgentEvent):
+        hub_event = self.hub.publish(event)
+        match event:
+            case MessageStartEvent():
+                self._message_start_id = hub_event.id
+            case MessageEndEvent() | ErrorEvent():
+                self._message_start_id = None
+
+    def _events_lost(self, last_event_id: int) -> HubEvent[AgentEvent]:
+        _logger.warning(f"Events of task {self.key} after {last_event_id} are no longer kept")
+        # keeps the id of the viewer, it resumes from the same position
+        return HubEvent(last_event_id, ErrorEvent(
+            error="Some events of the task run are no longer available, reload the task to see the full messages."))
+
+    async def events(self, last_event_id: int | None = None) -> AsyncGenerator[HubEvent[AgentEvent], None]:
+        """
+        The events published from now on, preceded by the kept events after `last_event_id`.
+        When some of the missed events are no longer kept, an error event comes first,
+        so that the viewer knows its messages are incomplete and reloads the task.
+        A viewer too slow to keep up gets the same error event once its buffer drops events,
+        and the generator ends there, the following events would only be applied partially.
+        The generator ends after the terminal event of the run.
+        """
+        with self.hub.subscribe(last_event_id=last_event_id) as subscription:
+            if last_event_id is not None and not self.hub.can_replay(last_event_id):
+                yield self._events_lost(last_event_id)
+            delivered_id = last_event_id or 0
+            async for event in subscription:
+                if subscription.dropped > 0:
+                    yield self._events_lost(delivered_id)
+                    return
+                delivered_id = event.id
+                yield event
+
+class TaskRunManager:
+    """
+    Runs the agent tasks as background jobs, detached from the requests that start them,
+    so that a dropped connection or a reloaded UI does not end an agent run.
+
+    The events of a run are published to a hub that keeps the last `history_size` of them.
+    Several clients can watch the same run, and a reconnecting client resumes after the id
+    of the last event it received. Finished runs are kept for `retention` seconds.
+    """
+    def __init__(self, history_size: int = 4096, retention: float = 300):
+        self._history_size = history_size
+        self._retention = retention
+        self._runs: dict[TaskKey, TaskRun] = {}
+
+    def get(self, task_type: task_runtime_schemas.TaskType, task_id: int) -> TaskRun | None:
+        return self._runs.get((task_type, task_id))
+
+    def start(self,
+              task_type: task_runtime_schemas.TaskType,
+              task_id: int,
+              lease: AgentTaskLease,
+              last_event_id: int | None = None,
+              ) -> tuple[TaskRun, bool]:
+        """
+        Start a run of the task unless one is in progress.
+        A client resuming with `last_event_id` attaches to the kept run even if it has finished,
+        instead of starting the task again.
+        Returns the run and whether it was created by this call.
+        """
+        key = (task_type, task_id)
+        run = self._runs.get(key)
+        if run is not None and (run.is_running or last_event_id is not None):
+            return run, False
+
+        run = self._runs[key] = TaskRun(key, self._history_size)
+        run.job = asyncio.create_task(self._execute(run, lease))
+        run.job.add_done_callback(lambda _: self._schedule_removal(run))
+        return run, True
+
+    def _schedule_removal(self, run: TaskRun):
+        def remove():
+            if self._runs.get(run.key) is run:
+                self._runs.pop(run.key)
+        asyncio.get_running_loop().call_later(self._retention, remove)
+
+    async def _execute(self, run: TaskRun, lease: AgentTaskLease):
+        terminal_event: TaskDoneEvent | TaskInterruptedEvent | None = None
+        try:
+            async with lease() as task:
+                try:
+                    async for event in task.run():
+                        if isinstance(event, (TaskDoneEvent, TaskInterruptedEvent)):
+                            terminal_event = event
+                            continue
+                        run.publish(event)
+                except asyncio.CancelledError:
+                    await task.stop()
+                    terminal_event = TaskInterruptedEvent()
+                    raise
+                finally:
+                    try:
+                        # ensure task is persisted before publishing terminal event
+                        await asyncio.shield(task.persist())
+                    except Exception:
+                        _logger.exception("Failed to persist task state in run finalization")
+        except Exception as e:
+            _logger.exception(f"Error in the run of task {run.key}")
+            run.publish(ErrorEvent(error=str(e)))
+        finally:
+            if terminal_event is None:
+                terminal_event = TaskDoneEvent()
+            run.publish(terminal_event)
+            run.hub.close()
+
+    async def stop(self, task_type: task_runtime_schemas.TaskType, task_id: int) -> bool:
+        """Stop the run of the task, returns False if it is not running."""
+        run = self._runs.get((task_type, task_id))
+        if run is None or run.job is None or run.job.done():
+            return False
+        run.job.cancel()
+        await asyncio.gather(run.job, return_exceptions=True)
+        return True
+
+    async def shutdown(self):
+        jobs = [run.job for run in self._runs.values() if run.job is not None]
+        for job in jobs:
+            job.cancel()
+        await asyncio.gather(*jobs, return_exceptions=True)
+
+__instance: TaskRunManager | None = None
+
+def use_task_run_manager() -> TaskRunManager:
+    global __instance
+    if __instance is None:
+        __instance = TaskRunManager()
+    return __instance
@@ -0,0 +1,85 @@
+import asyncio
+from collections.abc import AsyncGenerator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+
+from loguru import logger
+
+from src.settings import use_app_setting_manager
+
+
+@dataclass
+class _TaskSlots:
+    semaphore: asyncio.Semaphore
+    # number of the subtasks of the task that are running or waiting for a slot
+    users: int = 0
+
+@dataclass
+class SubtaskOutcome[T]:
+    index: int
+    result: T | None = None
+    error: Exception | None = None
+
+class SubtaskExecutor:
+    """
+    Runs the subtasks with at most `global_limit` of them at once, and at most
+    `per_task_limit` for the same parent task, so that a fan-out of one task
+    neither exceeds the provider rate limits nor starves the other tasks.
+    """
+    _logger = logger.bind(name="SubtaskExecutor")
+
+    def __init__(self, global_limit: int = 4, per_task_limit: int = 3):
+        self._global = asyncio.Semaphore(max(1, global_limit))
+        self._per_task_limit = max(1, per_task_limit)
+        self._task_slots: dict[int, _TaskSlots] = {}
+
+    @asynccontextmanager
+    async def slot(self, parent_task_id: int) -> AsyncGenerator[None]:
+        slots = self._task_slots.get(parent_task_id)
+        if slots is None:
+            slots = self._task_slots[parent_task_id] = _TaskSlots(asyncio.Semaphore(self._per_task_limit))
+        slots.users += 1
+        try:
+            # the slot of the parent task is taken first, so that the waiting subtasks
+            # of a large fan-out do not hold the global slots the other tasks need
+            async with slots.semaphore, self._global:
+                yield
+        finally:
+            slots.users -= 1
+            if slots.users == 0:
+                self._task_slots.pop(parent_task_id, None)
+
+    async def run_many[T](self,
+                          parent_task_id: int,
+                          jobs: list[Callable[[], Awaitable[T]]],
+                          ) -> AsyncGenerator[SubtaskOutcome[T]]:
+        """
+        Run the jobs under the concurrency limits and yield their outcomes in completion order.
+        A failing job does not stop the others.
+        """
+        async def run_job(index: int, job: Callable[[], Awaitable[T]]) -> SubtaskOutcome[T]:
+            try:
+                async with self.slot(parent_task_id):
+                    return SubtaskOutcome(index, result=await job())
+            except Exception as e:
+                self._logger.exception(f"Subtask {index} of task {parent_task_id} failed")
+                return SubtaskOutcome(index, error=e)
+
+        pendings = [asyncio.create_task(run_job(index, job)) for index, job in enumerate(jobs)]
+        try:
+            for completed in asyncio.as_completed(pendings):
+                yield await completed
+        finally:
+            for pending in pendings:
+                pending.cancel()
+            await asyncio.gather(*pendings, return_exceptions=True)
+
+__instance: SubtaskExecutor | None = None
+
+def use_subtask_executor() -> SubtaskExecutor:
+    global __instance
+    if __instance is None:
+        settings = use_app_setting_manager().settings
+        __instance = SubtaskExecutor(settings.subtask_concurrency_limit,
+                                     settings.subtask_concurrency_per_task)
+    return __instance
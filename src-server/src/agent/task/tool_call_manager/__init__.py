@@ -7,7 +7,7 @@ from ...context import AgentContext
 from ...prompts import USER_IGNORED_TOOL_CALL_RESULT, USER_DENIED_TOOL_CALL_RESULT
 from ...types import (
     UserApprovalStatus, is_agent_tool_metadata,
-    ToolEvent, MessageReplaceEvent, ErrorEvent
+    ToolEvent, MessageReplaceEvent, MessagePatchEvent, ErrorEvent
 )
 
 
@@ -28,6 +28,7 @@ class ToolCallManager:
             raise ValueError(f"Tool {target_message.name} is not a tool that needs user interaction.")
 
         target_message.result = response
+        self._ctx.messages.mark_changed(target_message)
         return MessageReplaceEvent(message=target_message)
 
     def approve(self, call_id: str, approved: bool) -> MessageReplaceEvent | None:
@@ -43,6 +44,7 @@ class ToolCallManager:
             return None
         if "user_approval" in metadata and metadata["user_approval"] == UserApprovalStatus.DENIED:
             target_message.result = USER_DENIED_TOOL_CALL_RESULT
+        self._ctx.messages.mark_changed(target_message)
         return MessageReplaceEvent(message=target_message.model_copy())
 
     def collect_pendings(self) -> list[ToolMessage]:
@@ -59,10 +61,11 @@ class ToolCallManager:
             if not message.is_complete:
                 message.result = USER_IGNORED_TOOL_CALL_RESULT
                 message.metadata.clear()
+                self._ctx.messages.mark_changed(message)
 
     def dispatch(self,
                  tool_calls: list[ToolMessage]
                  ) -> tuple[
-                    AsyncGenerator[ToolEvent | MessageReplaceEvent | ErrorEvent, None],
+                    AsyncGenerator[ToolEvent | MessagePatchEvent | ErrorEvent, None],
                     ToolCallDispatchResult]:
         return self._tool_call_dispatcher.dispatch(tool_calls)
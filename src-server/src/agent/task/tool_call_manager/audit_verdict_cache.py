@@ -0,0 +1,104 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any
+
+from loguru import logger
+
+from src.db import db_context
+from src.services.tool_call_verdict import ToolCallVerdictService
+
+
+@dataclass(frozen=True)
+class AuditVerdict:
+    risk_level: int
+    reason: str
+    created_at: int = field(default_factory=lambda: int(time.time()))
+
+def _normalize(value: Any) -> Any:
+    match value:
+        case str():
+            return value.strip()
+        case dict():
+            return {key: _normalize(item) for key, item in value.items()}
+        case list() | tuple():
+            return [_normalize(item) for item in value]
+        case _:
+            return value
+
+def tool_call_fingerprint(workspace_id: int, tool_name: str, arguments: dict[str, Any]) -> str:
+    """
+    Identifies a tool call by its workspace, tool name and arguments, regardless of
+    the key order of the arguments and the surrounding whitespace of the strings.
+    The same relative path or command means a different thing in another workspace,
+    so its verdict is never shared across workspaces.
+    """
+    normalized = json.dumps(_normalize(arguments), sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(f"{workspace_id}\0{tool_name}\0{normalized}".encode()).hexdigest()
+
+class AuditVerdictCache:
+    """
+    The safety audit verdicts keyed by the workspace and the tool call fingerprint, persisted by the
+    ToolCallVerdictService with an in-memory LRU in front of it.
+    """
+    _logger = logger.bind(name="AuditVerdictCache")
+
+    def __init__(self, capacity: int = 1024, ttl: int = ToolCallVerdictService.TTL):
+        self._capacity = capacity
+        self._ttl = ttl
+        self._verdicts: OrderedDict[str, AuditVerdict] = OrderedDict()
+
+    def _remember(self, fingerprint: str, verdict: AuditVerdict):
+        self._verdicts[fingerprint] = verdict
+        self._verdicts.move_to_end(fingerprint)
+        while len(self._verdicts) > self._capacity:
+            self._verdicts.popitem(last=False)
+
+    async def _load(self, workspace_id: int, fingerprint: str) -> AuditVerdict | None:
+        async with db_context() as db_session:
+            verdict = await ToolCallVerdictService.from_db_session(db_session).get(workspace_id, fingerprint)
+            if verdict is None: return None
+            return AuditVerdict(risk_level=verdict.risk_level, reason=verdict.reason, created_at=verdict.created_at)
+
+    async def _store(self, workspace_id: int, fingerprint: str, tool_name: str, verdict: AuditVerdict):
+        async with db_context() as db_session:
+            await ToolCallVerdictService.from_db_session(db_session).set(
+                workspace_id,
+                fingerprint,
+                tool_name=tool_name,
+                risk_level=verdict.risk_level,
+                reason=verdict.reason,
+                created_at=verdict.created_at)
+
+    async def get(self, workspace_id: int, fingerprint: str) -> AuditVerdict | None:
+        verdict = self._verdicts.get(fingerprint)
+        if verdict is None:
+            try:
+                verdict = await self._load(workspace_id, fingerprint)
+            except Exception:
+                self._logger.exception("Failed to load the audit verdict")
+        if verdict is None or verdict.created_at < time.time() - self._ttl:
+            self._verdicts.pop(fingerprint, None)
+            return None
+        self._remember(fingerprint, verdict)
+        return verdict
+
+    async def set(self, workspace_id: int, fingerprint: str, tool_name: str, verdict: AuditVerdict):
+        self._remember(fingerprint, verdict)
+        try:
+            await self._store(workspace_id, fingerprint, tool_name, verdict)
+        except Exception:
+            self._logger.exception("Failed to persist the audit verdict")
+
+    def clear(self):
+        self._verdicts.clear()
+
+__instance: AuditVerdictCache | None = None
+
+def use_audit_verdict_cache() -> AuditVerdictCache:
+    global __instance
+    if __instance is None:
+        __instance = AuditVerdictCache()
+    return __instance
@@ -1,9 +1,11 @@
 import asyncio
 import base64
 import mimetypes
+import time
 import uuid
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Coroutine
 from dataclasses import dataclass
+from typing import Any
 
 from dais_sdk.tool import ToolCallExecutor
 from dais_sdk.types import (
@@ -17,6 +19,7 @@ from loguru import logger
 from src.db import db_context
 from src.schemas.tasks import runtime as task_runtime_schemas
 from src.services.tasks import TaskResourceService
+from src.settings import use_app_setting_manager
 
 from .exception_handlers import (
     handle_tool_does_not_exist_error,
@@ -25,14 +28,17 @@ from .exception_handlers import (
     handle_tool_result_serialization_error,
 )
 from .tool_call_reviewer import ToolCallReviewer, ToolCallBlocked, ToolCallApproved
+from .tool_result_offloader import ToolResultOffloader
 from ...context import AgentContext
 from ...tool import ExecutionControlToolset
 from ...types import (
-    ToolEvent, ToolExecutedEvent, MessageReplaceEvent, ErrorEvent,
+    ToolEvent, ToolExecutedEvent, MessagePatchEvent, ErrorEvent,
+    ToolExecutionStartEvent, ToolExecutionProgressEvent,
     ToolRequirePermissionEvent,
     TaskResourceMetadata, TextResourceMetadata, UrlResourceMetadata, FileResourceMetadata,
 )
 from ...types.metadata import UserApprovalStatus, is_agent_tool_metadata
+from ...utils import use_agent_metrics
 
 
 class TaskResourcePersister(ContentBlockPersister):
@@ -79,14 +85,57 @@ class ToolCallDispatch:
     message: ToolMessage
     tool: ToolDef
 
+class _DispatchScope:
+    """Runs the concurrent steps of a dispatch and merges their events in the order they are produced."""
+    _logger = logger.bind(name="ToolCallDispatcher")
+
+    def __init__(self, concurrency_limit: int):
+        self.semaphore = asyncio.Semaphore(concurrency_limit)
+        # None marks the end of a step
+        self._queue: asyncio.Queue[ToolEvent | MessagePatchEvent | None] = asyncio.Queue()
+        self._tasks: list[asyncio.Task] = []
+        self._finished = 0
+
+    def put(self, event: ToolEvent | MessagePatchEvent):
+        self._queue.put_nowait(event)
+
+    def spawn(self, coroutine: Coroutine[Any, Any, None]):
+        async def run():
+            try:
+                await coroutine
+            except Exception:
+                self._logger.exception("Tool call dispatch step failed")
+            finally:
+                self._queue.put_nowait(None)
+        self._tasks.append(asyncio.create_task(run()))
+
+    async def events(self) -> AsyncGenerator[ToolEvent | MessagePatchEvent, None]:
+        try:
+            # a step spawns its following steps before it ends
+            while self._finished < len(self._tasks):
+                event = await self._queue.get()
+                if event is None:
+                    self._finished += 1
+                    continue
+                yield event
+        finally:
+            # the stream was closed before all the steps finished
+            for task in self._tasks:
+                task.cancel()
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
 class ToolCallDispatcher:
     _logger = logger.bind(name="ToolCallDispatcher")
 
+    # seconds between the progress events of a running tool call
+    PROGRESS_INTERVAL = 5.0
+
     def __init__(self, ctx: AgentContext, tool_call_reviewer: ToolCallReviewer):
         self._ctx = ctx
         self._tool_call_reviewer = tool_call_reviewer
         content_block_persister = TaskResourcePersister(self._ctx.task_id, self._ctx.task_type)
         self._tool_call_executor = ToolCallExecutor(content_block_persister)
+        self._tool_result_offloader = ToolResultOffloader(self._ctx.task_id, self._ctx.task_type)
         self._tool_call_executor.exception_handler.set_handler(ToolDoesNotExistError, handle_tool_does_not_exist_error)
         self._tool_call_executor.exception_handler.set_handler(ToolArgumentParsingError, handle_tool_argument_parsing_error)
         self._tool_call_executor.exception_handler.set_handler(ToolResultSerializationError, handle_tool_result_serialization_error)
@@ -97,23 +146,39 @@ class ToolCallDispatcher:
         Execute tool call and attach the result to the corresponding message.
         This method should not throw any exceptions.
         """
+        started_at = time.perf_counter()
         result, error, raw_result = await self._tool_call_executor.execute(tool, message.arguments)
+        use_agent_metrics().tool_execution_duration.observe(
+            time.perf_counter() - started_at,
+            tool=tool.name,
+            status="ok" if error is None else "error")
         message.result = result
         message.error = error
 
         assert is_agent_tool_metadata(message.metadata)
+        if error is None:
+            try:
+                await self._tool_result_offloader.offload(message)
+            except Exception:
+                self._logger.exception(f"Failed to offload the result of {message.name}, keeping it inline.")
 
         return ToolExecutedEvent(
             call_id=message.call_id,
-            result=result if error is None else None)
-
-    async def _classify(self,
-                        dispatches: list[ToolCallDispatch]
-                        ) -> tuple[
-                            list[tuple[ToolCallApproved, ToolCallDispatch]],
-                            list[tuple[ToolCallBlocked, ToolCallDispatch]]
-                        ]:
-        approved: list[tuple[ToolCallApproved, ToolCallDispatch]] = []
+            result=message.result if error is None else None)
+
+    async def _check_permissions(self,
+                                 dispatches: list[ToolCallDispatch]
+                                 ) -> tuple[
+                                     list[ToolCallDispatch],
+                                     list[ToolCallDispatch],
+                                     list[tuple[ToolCallBlocked, ToolCallDispatch]]
+                                 ]:
+        """
+        Returns:
+            - Tuple of (approved, waiting_audit, blocked)
+        """
+        approved: list[ToolCallDispatch] = []
+        waiting_audit: list[ToolCallDispatch] = []
         blocked: list[tuple[ToolCallBlocked, ToolCallDispatch]] = []
 
         for dispatch in dispatches:
@@ -121,43 +186,23 @@ class ToolCallDispatcher:
             permission_check_result =\
                 await self._tool_call_reviewer.check_permission(tool, message)
             match permission_check_result:
-                case ToolCallApproved() as approved_event:
-                    approved.append((approved_event, dispatch))
+                case ToolCallApproved():
+                    approved.append(dispatch)
+                case ToolCallBlocked(event=ToolRequirePermissionEvent()):
+                    waiting_audit.append(dispatch)
                 case ToolCallBlocked() as blocked_event:
                     blocked.append((blocked_event, dispatch))
+        return approved, waiting_audit, blocked
 
-        if len(blocked) == 0:
-            return approved, blocked
-
-        waiting_audit: list[ToolCallDispatch] = []
-        remaining_blocked: list[tuple[ToolCallBlocked, ToolCallDispatch]] = []
-        for blocked_event, dispatch in blocked:
-            if isinstance(blocked_event.event, ToolRequirePermissionEvent):
-                waiting_audit.append(dispatch)
-            else:
-                remaining_blocked.append((blocked_event, dispatch))
-
-        audit_result =\
-            await self._tool_call_reviewer.audit_tool_calls(waiting_audit)
-        if audit_result is None:
-            return approved, blocked
-
-        high_risk, low_risk = audit_result
-        approved.extend((ToolCallApproved(), dispatch) for dispatch in low_risk)
-        blocked = remaining_blocked + [
-            (ToolCallBlocked(ToolRequirePermissionEvent(
-                call_id=dispatch.message.call_id,
-                tool_name=dispatch.tool.name,
-            )), dispatch)
-            for dispatch in high_risk
-        ]
-        return approved, blocked
+    def _patch_message(self, message: ToolMessage) -> MessagePatchEvent:
+        self._ctx.messages.mark_changed(message)
+        return MessagePatchEvent.from_message(message)
 
     async def _dispatch_stream(self,
                                tool_call_messages: list[ToolMessage],
                                result: ToolCallDispatchResult,
                                ) -> AsyncGenerator[ToolEvent
-                                                 | MessageReplaceEvent
+                                                 | MessagePatchEvent
                                                  | ErrorEvent, None]:
         dispatches: list[ToolCallDispatch] = []
         for message in tool_call_messages:
@@ -165,40 +210,100 @@ class ToolCallDispatcher:
             tool = self._ctx.find_tool(message.name)
             if tool is None:
                 message.error = handle_tool_does_not_exist_error(ToolDoesNotExistError(message.name))
-                yield MessageReplaceEvent(message=message)
+                yield self._patch_message(message)
                 continue
             if tool.executes(ExecutionControlToolset.finish_task):
                 result.has_finished_task = True
             dispatches.append(ToolCallDispatch(message=message, tool=tool))
 
-        approved, blocked = await self._classify(dispatches)
+        approved, waiting_audit, blocked = await self._check_permissions(dispatches)
 
         result.has_blocked_tool_calls = len(blocked) > 0
         for blocked_event, dispatch in blocked:
             yield blocked_event.event
-            yield MessageReplaceEvent(message=dispatch.message)
-
-        for _, dispatch in approved:
-            assert is_agent_tool_metadata(dispatch.message.metadata)
-            dispatch.message.metadata["user_approval"] = UserApprovalStatus.APPROVED
-            yield MessageReplaceEvent(message=dispatch.message)
-
-        async def execute_wrapper(dispatch: ToolCallDispatch):
-            executed_event = await self.execute(dispatch.tool, dispatch.message)
-            return executed_event, MessageReplaceEvent(message=dispatch.message)
-        execute_tasks = [execute_wrapper(dispatch) for _, dispatch in approved]
-        for item in await asyncio.gather(*execute_tasks, return_exceptions=True):
-            if isinstance(item, BaseException):
-                self._logger.exception(f"Tool call execution error: ", exc_info=item)
-                continue
-            executed_event, replace_event = item
-            yield executed_event
-            yield replace_event
+            yield self._patch_message(dispatch.message)
+
+        async for event in self._execute_stream(approved, waiting_audit, result):
+            yield event
+
+    def _approve(self, dispatch: ToolCallDispatch) -> MessagePatchEvent:
+        assert is_agent_tool_metadata(dispatch.message.metadata)
+        dispatch.message.metadata["user_approval"] = UserApprovalStatus.APPROVED
+        return self._patch_message(dispatch.message)
+
+    async def _audit_dispatches(self,
+                                dispatches: list[ToolCallDispatch],
+                                scope: _DispatchScope,
+                                result: ToolCallDispatchResult):
+        """Audit the tool calls and start the ones of low risk, the others stay blocked."""
+        try:
+            audit_result =\
+                await self._tool_call_reviewer.audit_tool_calls(dispatches)
+        except Exception:
+            # a failed audit must not leave the calls unanswered, they wait for the user instead
+            self._logger.exception("Failed to audit the tool calls, treating them as high risk")
+            audit_result = None
+        high_risk, low_risk = (dispatches, []) if audit_result is None else audit_result
+
+        for dispatch in low_risk:
+            scope.put(self._approve(dispatch))
+            scope.spawn(self._execute_dispatch(dispatch, scope))
+        if len(high_risk) > 0:
+            result.has_blocked_tool_calls = True
+        for dispatch in high_risk:
+            scope.put(ToolRequirePermissionEvent(
+                call_id=dispatch.message.call_id,
+                tool_name=dispatch.tool.name))
+            scope.put(self._patch_message(dispatch.message))
+
+    async def _execute_dispatch(self, dispatch: ToolCallDispatch, scope: _DispatchScope):
+        message = dispatch.message
+        async with scope.semaphore:
+            scope.put(ToolExecutionStartEvent(call_id=message.call_id))
+            started_at = time.perf_counter()
+            execution = asyncio.create_task(self.execute(dispatch.tool, message))
+            try:
+                while True:
+                    done, _ = await asyncio.wait({execution}, timeout=self.PROGRESS_INTERVAL)
+                    if len(done) > 0: break
+                    scope.put(ToolExecutionProgressEvent(
+                        call_id=message.call_id,
+                        elapsed=time.perf_counter() - started_at))
+            finally:
+                execution.cancel()
+            try:
+                executed_event = execution.result()
+            except Exception as e:
+                self._logger.exception(f"Tool call execution error: ")
+                message.error = f"[System] Failed to execute tool: {e}"
+                executed_event = ToolExecutedEvent(call_id=message.call_id, result=None)
+        scope.put(executed_event)
+        scope.put(self._patch_message(message))
+
+    async def _execute_stream(self,
+                              approved: list[ToolCallDispatch],
+                              waiting_audit: list[ToolCallDispatch],
+                              result: ToolCallDispatchResult,
+                              ) -> AsyncGenerator[ToolEvent | MessagePatchEvent, None]:
+        """
+        Execute the approved tool calls while the others are being audited, at most
+        `tool_concurrency_limit` at once, and yield their events in completion order.
+        """
+        concurrency_limit = max(1, use_app_setting_manager().settings.tool_concurrency_limit)
+        scope = _DispatchScope(concurrency_limit)
+        for dispatch in approved:
+            yield self._approve(dispatch)
+            scope.spawn(self._execute_dispatch(dispatch, scope))
+        if len(waiting_audit) > 0:
+            scope.spawn(self._audit_dispatches(waiting_audit, scope, result))
+
+        async for event in scope.events():
+            yield event
 
     def dispatch(self,
                  tool_call_messages: list[ToolMessage]
                  ) -> tuple[
-                    AsyncGenerator[ToolEvent | MessageReplaceEvent | ErrorEvent, None],
+                    AsyncGenerator[ToolEvent | MessagePatchEvent | ErrorEvent, None],
                     ToolCallDispatchResult]:
         result = ToolCallDispatchResult(
             has_finished_task=False,
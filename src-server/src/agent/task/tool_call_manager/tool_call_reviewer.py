@@ -6,9 +6,11 @@ from dais_sdk.types import ToolDef, ToolMessage
 from dais_sdk.tool.prepare import prepare_tools
 from pydantic import ValidationError
 from src.settings import use_app_setting_manager
+from .audit_verdict_cache import AuditVerdict, tool_call_fingerprint, use_audit_verdict_cache
+from .tool_call_rules import ToolCallRuleEngine
 from ...tool.types import is_tool_metadata
 from ...prompts import (
-    create_one_turn_llm,
+    use_one_turn_llm,
     USER_DENIED_TOOL_CALL_RESULT,
     ToolCallSafetyAudit, ToolCallSafetyAuditInput, ToolCallSafetyAuditOutput,
 )
@@ -49,6 +51,36 @@ class ToolCallReviewer:
                 if i == 2: raise
         raise ValueError("Unreachable")
 
+    async def _audit(self, dispatches: list[ToolCallDispatch]) -> ToolCallSafetyAuditOutput | None:
+        settings = use_app_setting_manager().settings
+        assert settings.flash_model is not None
+        audit_context_size = 5
+        context = self._ctx.messages[-audit_context_size:]
+
+        try:
+            async with use_one_turn_llm(settings.flash_model) as llm:
+                safety_audit = ToolCallSafetyAudit(llm, settings.reply_language)
+                tools = [dispatch.tool for dispatch in dispatches]
+                messages = [dispatch.message for dispatch in dispatches]
+                input = ToolCallSafetyAuditInput(
+                    tool_definitions=prepare_tools(tools),
+                    context=context,
+                    pending_tool_calls=messages
+                )
+                return await self._request(safety_audit, input)
+        except asyncio.TimeoutError:
+            self._logger.warning("Tool call audit timeout")
+            return None
+        except Exception:
+            self._logger.exception("Failed to audit tool calls")
+            return None
+
+    @staticmethod
+    def _attach_verdict(message: ToolMessage, verdict: AuditVerdict):
+        assert is_agent_tool_metadata(message.metadata)
+        message.metadata["risk_level"] = verdict.risk_level
+        message.metadata["risk_reason"] = verdict.reason
+
     async def audit_tool_calls(self,
                                dispatches: list[ToolCallDispatch]
                                ) -> tuple[
@@ -56,11 +88,14 @@ class ToolCallReviewer:
                                    list[ToolCallDispatch]
                                ] | None:
         """
+        The calls are settled by the tool call rules first, then by the cached verdicts of
+        identical calls, and only the remaining ones are audited by the flash model.
         Side effect: The risk level will be attached to the metadata of each message.
 
         Returns:
-            - Tuple of (high_risk, low_risk)
-            - None if smart approve is disabled or no flash model is configured or audit execution failed.
+            - Tuple of (high_risk, low_risk), the calls without a verdict are of high risk
+              (no flash model is configured, the audit failed or missed the call).
+            - None if smart approve is disabled.
         """
         if len(dispatches) == 0:
             return [], []
@@ -69,42 +104,34 @@ class ToolCallReviewer:
         if not settings.smart_approve:
             self._logger.info("Smart approve is disabled, skipping smart approve")
             return None
-        if settings.flash_model is None:
-            self._logger.warning("No flash model configured, skipping smart approve")
-            return None
 
-        audit_context_size = 5
-        context = self._ctx.messages[-audit_context_size:]
-
-        try:
-            llm = await create_one_turn_llm(settings.flash_model)
-            safety_audit = ToolCallSafetyAudit(llm, settings.reply_language)
-            tools = [dispatch.tool for dispatch in dispatches]
-            messages = [dispatch.message for dispatch in dispatches]
-            input = ToolCallSafetyAuditInput(
-                tool_definitions=prepare_tools(tools),
-                context=context,
-                pending_tool_calls=messages
-            )
-            output = await self._request(safety_audit, input)
-        except asyncio.TimeoutError:
-            self._logger.warning("Tool call audit timeout")
-            return None
-        except Exception:
-            self._logger.exception("Failed to audit tool calls")
-            return None
-
-        # attach risk level and reason to each message
-        for item in output.results:
-            for dispatch in dispatches:
-                if dispatch.message.call_id == item.call_id:
-                    assert is_agent_tool_metadata(dispatch.message.metadata)
-                    dispatch.message.metadata["risk_level"] = item.risk_level
-                    dispatch.message.metadata["risk_reason"] = item.reason
-                    break
-            else:
-                self._logger.warning(f"Tool call {item.call_id} not found")
+        rule_engine = ToolCallRuleEngine(self._ctx.workspace.tool_call_rules)
+        verdict_cache = use_audit_verdict_cache()
+        workspace_id = self._ctx.workspace.id
+        fingerprints = {dispatch.message.call_id: tool_call_fingerprint(workspace_id, dispatch.tool.name, dispatch.message.arguments)
+                        for dispatch in dispatches}
+        unresolved: list[ToolCallDispatch] = []
+        for dispatch in dispatches:
+            verdict = (rule_engine.evaluate(dispatch.tool.name, dispatch.message.arguments)
+                       or await verdict_cache.get(workspace_id, fingerprints[dispatch.message.call_id]))
+            if verdict is None:
+                unresolved.append(dispatch)
                 continue
+            self._attach_verdict(dispatch.message, verdict)
+
+        if len(unresolved) > 0 and settings.flash_model is None:
+            self._logger.warning("No flash model configured, skipping smart approve")
+        elif len(unresolved) > 0 and (output := await self._audit(unresolved)) is not None:
+            for item in output.results:
+                for dispatch in unresolved:
+                    if dispatch.message.call_id == item.call_id:
+                        verdict = AuditVerdict(risk_level=item.risk_level, reason=item.reason)
+                        self._attach_verdict(dispatch.message, verdict)
+                        await verdict_cache.set(workspace_id, fingerprints[item.call_id], dispatch.tool.name, verdict)
+                        break
+                else:
+                    self._logger.warning(f"Tool call {item.call_id} not found")
+                    continue
 
         # split messages into two groups: high risk and low risk
         high_risk: list[ToolCallDispatch] = []
@@ -112,8 +139,7 @@ class ToolCallReviewer:
         for dispatch in dispatches:
             assert is_agent_tool_metadata(dispatch.message.metadata)
             if "risk_level" not in dispatch.message.metadata:
-                self._logger.warning(f"Tool call {dispatch.message.call_id} has no risk level")
-                # the model did not return the right call_id,
+                # no verdict, e.g. the model did not return the right call_id,
                 # consider it as high_risk to fallback to manual review
                 high_risk.append(dispatch)
                 continue
@@ -0,0 +1,40 @@
+from typing import Any
+
+from src.schemas.workspace import ToolCallRule
+
+from .audit_verdict_cache import AuditVerdict
+
+
+# single command lines of the shell tool that only read the state of the workspace,
+# without any line break or operator that could chain, redirect or substitute another command
+_READ_ONLY_SHELL_SCRIPT = (
+    r"\A(?![^\r\n]*[\r\n])(?!.*--output)[ \t]*"
+    r"(git[ \t]+(status|diff|log|show)|ls|pwd|dir|Get-ChildItem|Get-Location)"
+    r"([ \t]+[^;&|<>`$()\r\n]*)?[ \t]*\Z"
+)
+
+DEFAULT_TOOL_CALL_RULES: list[ToolCallRule] = [
+    ToolCallRule(tool="shell", action="deny", arguments={"script": r"\bsudo\b"}),
+    ToolCallRule(tool="shell", action="deny", arguments={"script": r"\brm\s+(-\S+\s+)*(/|~|\$HOME)/?(\s|$)"}),
+    ToolCallRule(tool="shell", action="deny", arguments={"script": r"\b(mkfs|fdisk|diskpart|Format-Volume|shutdown|reboot)\b"}),
+    ToolCallRule(tool="shell", action="deny", arguments={"script": r"\bdd\b.*\bof=/dev/"}),
+    ToolCallRule(tool="shell", action="deny", arguments={"script": r"\b(curl|wget|iwr|Invoke-WebRequest)\b[^|]*\|\s*(sh|bash|zsh|iex|Invoke-Expression)\b"}),
+    ToolCallRule(tool="shell", action="deny", arguments={"script": r"\bgit\s+push\b.*\s(--force|-f)\b"}),
+    ToolCallRule(tool="shell", action="allow", arguments={"script": _READ_ONLY_SHELL_SCRIPT}),
+]
+
+class ToolCallRuleEngine:
+    """
+    Settles the obvious tool calls without the safety audit.
+    The rules of the workspace are checked before the default ones, the first matching rule wins.
+    """
+    def __init__(self, workspace_rules: list[ToolCallRule]):
+        self._rules = [*workspace_rules, *DEFAULT_TOOL_CALL_RULES]
+
+    def evaluate(self, tool_name: str, arguments: dict[str, Any]) -> AuditVerdict | None:
+        for rule in self._rules:
+            if not rule.matches(tool_name, arguments): continue
+            if rule.action == "allow":
+                return AuditVerdict(risk_level=0, reason=f"Allowed by the tool call rule of '{rule.tool}'")
+            return AuditVerdict(risk_level=100, reason=f"Denied by the tool call rule of '{rule.tool}'")
+        return None
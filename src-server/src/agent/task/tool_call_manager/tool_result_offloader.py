@@ -0,0 +1,88 @@
+from dais_sdk.types import ToolMessage
+from loguru import logger
+
+from src.db import db_context
+from src.schemas.tasks import runtime as task_runtime_schemas
+from src.services.tasks import TaskResourceService
+
+from ...prompts import OFFLOADED_TOOL_RESULT, OFFLOADED_RESULT_READ_BY_CHARS, OFFLOADED_RESULT_READ_BY_LINES
+from ...types import FileResourceMetadata
+from ...types.metadata import is_agent_tool_metadata
+
+
+# text results longer than this (in characters) are moved into a task resource
+OFFLOAD_THRESHOLD = 20000
+PREVIEW_HEAD_LENGTH = 4000
+PREVIEW_TAIL_LENGTH = 2000
+
+class ToolResultOffloader:
+    """
+    Stores large text tool results as task resources and keeps only a head/tail preview
+    in the tool message, so that they are neither persisted inline nor re-sent in full
+    on every later request. The preview tells the model where to read the full result.
+    """
+    _logger = logger.bind(name="ToolResultOffloader")
+
+    def __init__(self, task_id: int, task_type: task_runtime_schemas.TaskType):
+        self._task_id = task_id
+        self._task_type = task_type
+
+    @staticmethod
+    def _cut_head(text: str, length: int) -> str:
+        head = text[:length]
+        # prefer ending the preview at a line boundary
+        newline = head.rfind("\n")
+        return head[:newline] if newline > length // 2 else head
+
+    @staticmethod
+    def _cut_tail(text: str, length: int) -> str:
+        tail = text[-length:]
+        newline = tail.find("\n")
+        return tail[newline + 1:] if -1 < newline < length // 2 else tail
+
+    @classmethod
+    def format_preview(cls, result: str, path: str) -> str:
+        head = cls._cut_head(result, PREVIEW_HEAD_LENGTH)
+        tail = cls._cut_tail(result, PREVIEW_TAIL_LENGTH)
+        lines = result.split("\n")
+        # chunks of about half the threshold are returned inline when read back
+        chunk_size = OFFLOAD_THRESHOLD // 2
+        if max(len(line) for line in lines) > chunk_size:
+            # a chunk of whole lines would be offloaded again, e.g. for a minified result
+            read_hint = OFFLOADED_RESULT_READ_BY_CHARS.format(chunk_chars=chunk_size)
+        else:
+            chunk_lines = max(1, len(lines) * chunk_size // len(result))
+            read_hint = OFFLOADED_RESULT_READ_BY_LINES.format(chunk_lines=chunk_lines)
+        return OFFLOADED_TOOL_RESULT.format(
+            head=head,
+            tail=tail,
+            omitted=len(result) - len(head) - len(tail),
+            length=len(result),
+            total_lines=len(lines),
+            path=path,
+            read_hint=read_hint)
+
+    async def offload(self, message: ToolMessage) -> bool:
+        """
+        Replace the result of the message with a preview if it is too large.
+        Returns False if the result is kept inline.
+        """
+        result = message.result
+        if not isinstance(result, str) or len(result) <= OFFLOAD_THRESHOLD:
+            return False
+        assert is_agent_tool_metadata(message.metadata)
+
+        async with db_context() as db_session:
+            resource_service = TaskResourceService.from_db_session(db_session, self._task_type)
+            resource = await resource_service.save_task_resource(
+                self._task_id,
+                f"tool-result_{message.name}.txt",
+                result.encode("utf-8"))
+            resource_path = await resource_service.get_task_resource_path(self._task_id, resource)
+
+        message.result = self.format_preview(result, str(resource_path))
+        message.metadata["offloaded_result"] = FileResourceMetadata(
+            resource_id=resource.id,
+            filename=resource.filename,
+            mimetype="text/plain")
+        return True
@@ -21,13 +21,15 @@ from src.binaries import RIPGREP_PATH
 from src.db import db_context
 from src.db.models import toolset as toolset_models
 from src.services.markdown_cache import MarkdownCacheService
-from src.utils import MarkdownConverter
+from src.utils import FileIndex, MarkdownConverter, read_line_window, use_file_index_manager
 
 from ..toolset_wrapper import builtin_tool, BuiltinToolset, BuiltinToolsetContext, BuiltinToolDefaults
 from ...utils import magika_identify_path
 
 
 MAX_MEDIA_CONTENT_BLOCK_BYTES = 50 * 1024 * 1024
+# the binary detection only needs the beginning of the file
+BINARY_SNIFF_BYTES = 8 * 1024
 
 
 # Since `is_binary` from binaryornot sometimes misdetects some files as binary,
@@ -38,9 +40,17 @@ def is_binary(path: StdPath) -> bool:
     if has_binary_extension(path):
         return True
     with open(path, "rb") as f:
-        bytes = f.read()
+        bytes = f.read(BINARY_SNIFF_BYTES)
         return is_binary_string(bytes)
 
+def resolve_indexed_directory(index: FileIndex | None, directory: StdPath) -> str | None:
+    """
+    The index key of `directory`, None if there is no index or the directory is not indexed
+    (outside of the indexed root, hidden or gitignored).
+    """
+    if index is None: return None
+    return index.resolve_directory(directory.resolve())
+
 class PathExpander:
     def __init__(self, path_envs: dict[str, str]):
         self._path_envs = path_envs
@@ -118,6 +128,9 @@ class FileSystemToolset(BuiltinToolset):
                           "The path of the file to read (relative to the current working directory)."],
                         offset: Annotated[int, "The line number to start reading from (1-based)."] = 1,
                         max_lines: Annotated[int, "The maximum number of lines to read."] = 2000,
+                        char_offset: Annotated[int | None,
+                          "The character to start reading from (0-based), reads by characters instead of lines when given."] = None,
+                        max_chars: Annotated[int, "The maximum number of characters to read when `char_offset` is given."] = 10000,
                         ) -> str | list[ContentBlock]:
         """
         Read the contents of a file at the specified path.
@@ -138,16 +151,28 @@ class FileSystemToolset(BuiltinToolset):
                 </file_content>
 
         To read the next chunk, pass end_line + 1 as the offset in the next call.
+
+        For text files with very long lines (e.g. minified or single-line content), pass `char_offset`
+        to read by characters instead; the attributes are then start_char, end_char (exclusive) and total_chars.
+        To read the next chunk, pass end_char as the char_offset in the next call.
         """
         async def convert_to_markdown_with_cache(path: AnyioPath) -> str:
             async with db_context() as db_session:
                 markdown_cache_service = MarkdownCacheService.from_db_session(db_session, self._ctx.workspace_id, self._ctx.cwd)
-                cached = await markdown_cache_service.get(path)
-                if cached is not None: return cached
-
-                converted = await self._markdown_converter.convert(path)
+                lookup = await markdown_cache_service.lookup(path)
+            if lookup is not None and lookup.content is not None:
+                if lookup.needs_record:
+                    async with db_context() as db_session:
+                        markdown_cache_service = MarkdownCacheService.from_db_session(db_session, self._ctx.workspace_id, self._ctx.cwd)
+                        await markdown_cache_service.record(lookup)
+                return lookup.content
+
+            # converted outside of the session, so that no transaction is open during the conversion
+            converted = await self._markdown_converter.convert(path)
+            async with db_context() as db_session:
+                markdown_cache_service = MarkdownCacheService.from_db_session(db_session, self._ctx.workspace_id, self._ctx.cwd)
                 await markdown_cache_service.set(path, converted)
-                return converted
+            return converted
 
         def format_result(content: str,
                           total_lines: int,
@@ -163,6 +188,17 @@ class FileSystemToolset(BuiltinToolset):
             root.text = AnyXml.RawText(content)
             return AnyXml.tostring(root)
 
+        def format_char_range(text: str, char_offset: int) -> str:
+            start = min(max(char_offset, 0), len(text))
+            content = text[start:start + max(max_chars, 0)]
+            root = ET.Element("file_content", attrib={
+                "start_char": str(start),
+                "end_char": str(start + len(content)),
+                "total_chars": str(len(text)),
+            })
+            root.text = AnyXml.RawText(content)
+            return AnyXml.tostring(root)
+
         async def read_media_content_blocks(path: AnyioPath,
                                             media_type: Literal["image", "audio", "video"],
                                             mime_type: str) -> list[ContentBlock]:
@@ -188,21 +224,26 @@ class FileSystemToolset(BuiltinToolset):
 
         if self._markdown_converter.is_convertable_binary(abs_path):
             result = await convert_to_markdown_with_cache(abs_path)
+            if char_offset is not None:
+                return format_char_range(result, char_offset)
             lines = result.splitlines()
+            result_lines, total_lines = lines[(offset - 1):(offset + max_lines - 1)], len(lines)
         elif (output := await magika_identify_path(abs_path)) and output.group in {"image", "audio", "video"}:
             media_type, mime_type = output.group, output.mime_type
             return await read_media_content_blocks(abs_path, cast(Literal["image", "audio", "video"], media_type), mime_type)
-        elif is_binary(StdPath(abs_path)):
+        elif await asyncio.to_thread(is_binary, StdPath(abs_path)):
             raise ValueError(f"File {path} is a binary file, and is not supported to read.")
+        elif char_offset is not None:
+            return format_char_range(await abs_path.read_text(encoding="utf-8", errors="replace"), char_offset)
         else:
-            lines = (await abs_path.read_text("utf-8")).splitlines()
+            # only the requested window is read, using a cached index of the line offsets
+            result_lines, total_lines = await asyncio.to_thread(read_line_window, StdPath(abs_path), offset, max_lines)
 
-        result_lines = lines[(offset - 1):(offset + max_lines - 1)]
         return format_result(
             "\n".join(result_lines),
             start_line=offset,
             end_line=offset + len(result_lines) - 1,
-            total_lines=len(lines))
+            total_lines=total_lines)
 
     @builtin_tool(validate=True)
     async def write_file(self,
@@ -305,6 +346,7 @@ class FileSystemToolset(BuiltinToolset):
                              path: str,
                              max_depth: int | None,
                              show_all: bool,
+                             index: FileIndex | None = None,
                              ) -> str:
         """
         Since the scan logic will be slower after refactored to async version,
@@ -363,6 +405,12 @@ class FileSystemToolset(BuiltinToolset):
                 max_depth: Maximum depth limit
             """
             lines = []
+            directory_key = resolve_indexed_directory(index, directory)
+            if index is not None and directory_key is not None:
+                for indexed_entry, depth in index.walk(directory_key, max_depth):
+                    indent = "  " * (depth - 1)
+                    lines.append(f"{indent}{format_item(index.root / indexed_entry.path)}")
+                return lines
             for entry, depth in scantree_dfs(directory, MAX_SCAN_LIMIT, max_depth, include_hidden, include_gitignored):
                 indent = "  " * (depth - 1)
                 entry_path = StdPath(entry)
@@ -381,6 +429,8 @@ class FileSystemToolset(BuiltinToolset):
             raise FileNotFoundError(f"Directory not found at {path}")
         if not abs_path.is_dir():
             raise NotADirectoryError(f"Path {path} is not a directory")
+        if show_all:
+            index = None
 
         result_lines = [f"Directory: {abs_path}"]
         if max_depth == 1:
@@ -465,6 +515,7 @@ class FileSystemToolset(BuiltinToolset):
             path,
             max_depth,
             show_all,
+            use_file_index_manager().peek(self._ctx.cwd),
         )
 
     class FindFilesResult(TypedDict):
@@ -477,9 +528,23 @@ class FileSystemToolset(BuiltinToolset):
                          path: str,
                          limit: int,
                          show_all: bool,
+                         index: FileIndex | None = None,
                          ) -> FindFilesResult:
+        WC_FLAGS = wc_glob.GLOBSTAR | wc_glob.BRACE
+
+        def index_collect(index: FileIndex, directory_key: str) -> list[str]:
+            matcher = wc_glob.compile(pattern, flags=WC_FLAGS)
+            prefix_length = len(directory_key) + 1 if directory_key else 0
+            matches = []
+            for entry in index.subtree(directory_key):
+                if len(matches) >= limit: break
+                if entry.is_symlink: continue
+                relative = entry.path[prefix_length:]
+                if matcher.match(relative):
+                    matches.append(relative)
+            return matches
+
         def scan_collect(directory: StdPath) -> list[str]:
-            WC_FLAGS = wc_glob.GLOBSTAR | wc_glob.BRACE
             matches = []
             for entry in scantree_bfs(directory, MAX_SCAN_LIMIT, include_hidden, include_gitignored):
                 if len(matches) >= limit: break
@@ -498,8 +563,14 @@ class FileSystemToolset(BuiltinToolset):
             raise FileNotFoundError(f"Directory not found at {path}")
         if not abs_path.is_dir():
             raise NotADirectoryError(f"Path {path} is not a directory")
+        if show_all:
+            index = None
 
-        results = scan_collect(abs_path)
+        directory_key = resolve_indexed_directory(index, abs_path)
+        if index is not None and directory_key is not None:
+            results = index_collect(index, directory_key)
+        else:
+            results = scan_collect(abs_path)
         return {
             "search_root": abs_path.as_posix(),
             "total": len(results),
@@ -570,6 +641,7 @@ class FileSystemToolset(BuiltinToolset):
             path,
             limit,
             show_all,
+            use_file_index_manager().peek(self._ctx.cwd),
         )
 
     @builtin_tool(validate=True, defaults=BuiltinToolDefaults(auto_approve=True))
@@ -25,9 +25,19 @@ from ...types import (
 
 
 if TYPE_CHECKING:
+    from ...context.models import AgentContextResource
     from ...task import AgentTask
 
 
+# the most subtasks a single `create_subtasks` call may run
+MAX_PARALLEL_SUBTASKS = 5
+
+class SubtaskSpec(BaseModel):
+    agent_id: Annotated[int,
+                        "The ID of the target agent to execute the subtask."]
+    instruction: Annotated[str,
+                           "The initial instruction used to create the new subtask."]
+
 class SubtaskToolRespond(BaseModel):
     answer: Annotated[str,
                       "The answer to provide for a response-pending tool call."]
@@ -40,12 +50,13 @@ class SubtaskToolApprove(BaseModel):
     call_id: Annotated[str,
                        "The call_id of the pending tool call, as returned in the subtask result."]
 
-async def create_agent_task_from_subtask(subtask: tasks_models.Subtask) -> AgentTask:
+async def create_agent_task_from_subtask(subtask: tasks_models.Subtask,
+                                         resource: AgentContextResource | None = None) -> AgentTask:
     from ...context import AgentContext
     from ...task import AgentTask
 
     task_runtime = task_runtime_schemas.TaskRuntimeContext.from_subtask(subtask)
-    ctx = await AgentContext.create(task_runtime)
+    ctx = await AgentContext.create(task_runtime, resource)
     return AgentTask(ctx)
 
 def compose_subtask_result(subtask: AgentTask, task_result: TaskStopResult) -> str:
@@ -95,6 +106,11 @@ def compose_subtask_result(subtask: AgentTask, task_result: TaskStopResult) -> s
 
     return AnyXml.tostring(root)
 
+def compose_subtask_error(subtask_id: int, error: Exception) -> str:
+    root = ET.Element("subtask_result", {"subtask_id": str(subtask_id), "status": "error"})
+    root.text = AnyXml.RawText(str(error))
+    return AnyXml.tostring(root)
+
 async def run_subtask(task: AgentTask) -> str:
     try:
         await task.persist()
@@ -150,9 +166,79 @@ class OrchestrationToolset(BuiltinToolset):
                     agent_id=agent_id,
                 )
             )
-            task = await create_agent_task_from_subtask(subtask)
 
-        return await run_subtask(task)
+        from ...task import use_subtask_executor
+        async with use_subtask_executor().slot(self._ctx.task_id):
+            return await self._run_new_subtask(subtask, agent_id)
+
+    async def _run_new_subtask(self,
+                               subtask: tasks_models.Subtask,
+                               agent_id: int,
+                               resource: AgentContextResource | None = None) -> str:
+        from ...task import use_task_registry
+        async with use_task_registry().lease(
+            task_runtime_schemas.TaskType.SUBTASK, subtask.id, agent_id,
+            lambda: create_agent_task_from_subtask(subtask, resource),
+        ) as task:
+            return await run_subtask(task)
+
+    @builtin_tool(validate=True)
+    async def create_subtasks(
+        self,
+        subtasks: Annotated[list[SubtaskSpec],
+                            "The independent subtasks to create and run in parallel."],
+    ) -> str:
+        """
+        Create and run several independent subtasks in parallel.
+
+        When to use:
+            - To fan out independent units of work in one call, instead of calling `create_subtask` several times
+            - The same rules as `create_subtask` apply: use 5 subtasks maximum and prefer the minimum number necessary
+
+        Returns:
+            An XML string with a `<subtask_results>` root element, containing one `<subtask_result>`
+            element per subtask in the order of `subtasks`, in the same format as the result of `create_subtask`.
+        """
+        if len(subtasks) > MAX_PARALLEL_SUBTASKS:
+            raise ValueError(
+                f"At most {MAX_PARALLEL_SUBTASKS} subtasks can be created at once, got {len(subtasks)}. "
+                "Keep the most important ones and create the others after they finish."
+            )
+
+        from ...context import AgentContext
+        from ...task import use_subtask_executor
+        # the agents, the workspace and the providers are loaded once for all the subtasks,
+        # before any subtask is created, so that an invalid agent_id leaves no orphan subtask behind
+        resources: dict[int, AgentContextResource] = {}
+        for spec in subtasks:
+            if spec.agent_id not in resources:
+                resources[spec.agent_id] = await AgentContext.load_resource(spec.agent_id, self._ctx.workspace_id)
+
+        async with db_context() as db_session:
+            subtask_service = SubtaskService.from_db_session(db_session)
+            created = [
+                await subtask_service.create(
+                    subtask_schemas.SubtaskCreate(
+                        instruction=spec.instruction,
+                        task_id=self._ctx.task_id,
+                        agent_id=spec.agent_id,
+                    )
+                )
+                for spec in subtasks
+            ]
+
+        jobs = [
+            lambda subtask=subtask, spec=spec: self._run_new_subtask(subtask, spec.agent_id, resources[spec.agent_id])
+            for subtask, spec in zip(created, subtasks)
+        ]
+        results: list[str] = [""] * len(jobs)
+        async for outcome in use_subtask_executor().run_many(self._ctx.task_id, jobs):
+            if outcome.error is not None:
+                results[outcome.index] = compose_subtask_error(created[outcome.index].id, outcome.error)
+            else:
+                assert outcome.result is not None
+                results[outcome.index] = outcome.result
+        return "\n".join(["<subtask_results>", *results, "</subtask_results>"])
 
     @builtin_tool(validate=True)
     async def followup_subtask(
@@ -203,17 +289,22 @@ class OrchestrationToolset(BuiltinToolset):
                     "The agent_id of this subtask is null, please pass a new agent_id "
                     "when following up on this subtask."
                 )
-            task = await create_agent_task_from_subtask(subtask)
-
-        if isinstance(message, str):
-            task.tool_calls.discard_pendings()
-            task.messages.append(UserMessage(content=message))
-        else:
-            for response in message:
-                match response:
-                    case SubtaskToolRespond(call_id=call_id, answer=answer):
-                        task.tool_calls.apply_user_response(call_id, answer)
-                    case SubtaskToolApprove(call_id=call_id, decision=decision):
-                        task.tool_calls.approve(call_id, decision == "approved")
-
-        return await run_subtask(task)
+
+        from ...task import use_subtask_executor, use_task_registry
+        async with use_subtask_executor().slot(self._ctx.task_id),\
+                   use_task_registry().lease(
+                       task_runtime_schemas.TaskType.SUBTASK, subtask.id, subtask.agent_id,
+                       lambda: create_agent_task_from_subtask(subtask),
+                   ) as task:
+            if isinstance(message, str):
+                task.tool_calls.discard_pendings()
+                task.messages.append(UserMessage(content=message))
+            else:
+                for response in message:
+                    match response:
+                        case SubtaskToolRespond(call_id=call_id, answer=answer):
+                            task.tool_calls.apply_user_response(call_id, answer)
+                        case SubtaskToolApprove(call_id=call_id, decision=decision):
+                            task.tool_calls.approve(call_id, decision == "approved")
+
+            return await run_subtask(task)
@@ -1,4 +1,4 @@
-from typing import Self, Sequence, override
+from typing import ClassVar, Self, Sequence, override
 
 from dais_sdk.tool import Toolset
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -12,6 +12,11 @@ from ..toolset_wrapper import BuiltinToolset, BuiltinToolsetContext
 
 
 class BuiltinToolsetManager(ToolsetManager):
+    # the built-in toolset entities shared by all the managers, keyed by internal key
+    _toolset_map_snapshot: ClassVar[dict[str, toolset_models.Toolset] | None] = None
+    # bumped on invalidation, so that a load racing with it does not store stale entities
+    _snapshot_version: ClassVar[int] = 0
+
     def __init__(self, ctx: BuiltinToolsetContext):
         self._ctx = ctx
         self._toolset_map: dict[str, toolset_models.Toolset] | None = None
@@ -21,6 +26,31 @@ class BuiltinToolsetManager(ToolsetManager):
     async def sync_toolsets(db_session: AsyncSession):
         for toolset_t in BUILT_IN_TOOLSETS:
             await toolset_t.sync(db_session)
+        BuiltinToolsetManager.invalidate()
+
+    @classmethod
+    def invalidate(cls):
+        """
+        Drop the shared toolset entities snapshot,
+        should be called after the built-in toolsets are updated.
+        """
+        cls._toolset_map_snapshot = None
+        cls._snapshot_version += 1
+
+    @classmethod
+    async def _load_toolset_map(cls) -> dict[str, toolset_models.Toolset]:
+        from src.services.toolset import ToolsetService
+
+        if (snapshot := cls._toolset_map_snapshot) is not None:
+            return snapshot
+
+        version = cls._snapshot_version
+        async with db_context() as db_session:
+            toolset_ents = await ToolsetService.from_db_session(db_session).get_all_builtin()
+        snapshot = {toolset.internal_key: toolset for toolset in toolset_ents}
+        if version == cls._snapshot_version:
+            cls._toolset_map_snapshot = snapshot
+        return snapshot
 
     @property
     @override
@@ -36,11 +66,7 @@ class BuiltinToolsetManager(ToolsetManager):
         return result
 
     async def initialize(self):
-        from src.services.toolset import ToolsetService
-
-        async with db_context() as db_session:
-            toolset_ents = await ToolsetService.from_db_session(db_session).get_all_builtin()
-        self._toolset_map = {toolset.internal_key: toolset for toolset in toolset_ents}
+        self._toolset_map = await self._load_toolset_map()
 
         self._toolsets = []
         for toolset_t in BUILT_IN_TOOLSETS:
@@ -28,6 +28,7 @@ class McpToolsetManager(ToolsetManager):
     def __init__(self):
         self._state = McpToolsetManagerState.DISCONNECTED
         self._toolset_map: dict[int, McpToolset] | None = None
+        self._revision = 0
 
     @property
     @override
@@ -36,11 +37,22 @@ class McpToolsetManager(ToolsetManager):
             raise McpToolsetManagerNotInitializedError()
         return [toolset for toolset in self._toolset_map.values()]
 
+    @property
+    def revision(self) -> tuple[int, ...]:
+        """
+        Changes whenever the toolsets or the tools they provide may have changed,
+        so that the consumers can tell when to rebuild their derived state.
+        """
+        if self._toolset_map is None:
+            return (self._revision,)
+        return (self._revision, *(toolset.revision for toolset in self._toolset_map.values()))
+
     async def initialize(self, db_session: AsyncSession):
         from src.services.toolset import ToolsetService
 
         toolset_ents = await ToolsetService.from_db_session(db_session).get_all_mcp()
         self._toolset_map = {toolset.id: McpToolset(toolset) for toolset in toolset_ents}
+        self._revision += 1
 
     async def append(self, inner_toolset: SdkMcpToolset, toolset_ent: toolset_models.Toolset):
         """
@@ -52,6 +64,7 @@ class McpToolsetManager(ToolsetManager):
         new_toolset = McpToolset(toolset_ent, inner_toolset)
         await new_toolset.sync()
         self._toolset_map[toolset_ent.id] = new_toolset
+        self._revision += 1
 
     async def remove(self, toolset_id: int):
         if self._toolset_map is None:
@@ -61,6 +74,7 @@ class McpToolsetManager(ToolsetManager):
         if toolset is None:
             self._logger.warning(f"Toolset {toolset_id} not found, skip disconnecting")
             return
+        self._revision += 1
 
         try:
             await toolset.disconnect()
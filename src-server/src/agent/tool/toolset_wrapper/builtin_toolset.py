@@ -1,8 +1,11 @@
+import inspect
 from dataclasses import InitVar, dataclass, field, replace
+from functools import cache
 from pathlib import Path
 from typing import Self, cast, override, TYPE_CHECKING, TypedDict
 
 from dais_sdk.tool import PythonToolset, python_tool
+from dais_sdk.tool.toolset.python_toolset import is_tool, get_tool_defaults
 from dais_sdk.types import ToolDef
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -45,18 +48,41 @@ class BuiltinToolsetContext:
         """
         return cls(1, 1, Path.cwd())
 
+@cache
+def _introspect_tools(toolset_cls: type[BuiltinToolset]) -> list[tuple[str, ToolDef]]:
+    """
+    Collect the (attribute name, unbound ToolDef) pairs of a toolset class.
+    The tool signatures and docstrings are identical for all the instances,
+    so the introspection runs only once per class.
+    """
+    result = []
+    for attr_name, member in inspect.getmembers(toolset_cls, predicate=inspect.isfunction):
+        if not is_tool(member): continue
+        tool_def = ToolDef.from_tool_fn(member)
+        tool_def.defaults = get_tool_defaults(member)
+        result.append((attr_name, tool_def))
+    return result
+
 class BuiltinToolset(PythonToolset):
     def __init__(self,
                  ctx: BuiltinToolsetContext,
                  toolset_ent: toolset_models.Toolset | None = None):
         self._ctx = ctx
-        self._namespaced_tools_cache = super().get_tools(namespaced_tool_name=True)
-        self._non_namespaced_tools_cache = super().get_tools(namespaced_tool_name=False)
+        self._namespaced_tools_cache = self._bind_tools(namespaced_tool_name=True)
+        self._non_namespaced_tools_cache = self._bind_tools(namespaced_tool_name=False)
+        # the tool definitions with metadata, built on first use
+        self._tools_cache: dict[bool, list[ToolDef]] = {}
         if toolset_ent:
             self._tool_ent_map = {tool.internal_key: tool for tool in toolset_ent.tools}
         else:
             self._tool_ent_map = None
 
+    def _bind_tools(self, namespaced_tool_name: bool) -> list[ToolDef]:
+        return [replace(tool_def,
+                        name=self.format_tool_name(tool_def.name) if namespaced_tool_name else tool_def.name,
+                        execute=getattr(self, attr_name))
+                for attr_name, tool_def in _introspect_tools(type(self))]
+
     @classmethod
     def internal_key(cls) -> str:
         return cls.__name__
@@ -64,7 +90,7 @@ class BuiltinToolset(PythonToolset):
     @classmethod
     async def sync(cls, db_session: AsyncSession):
         temp_instance = cls(BuiltinToolsetContext.default())
-        raw_tools = super().get_tools(temp_instance, namespaced_tool_name=False)
+        raw_tools = temp_instance.get_original_tools(namespaced_tool_name=False)
         toolset_service = ToolsetService.from_db_session(db_session)
         toolset_ent = await toolset_service.get_by_internal_key(cls.internal_key())
         await toolset_service.sync(toolset_ent.id,
@@ -76,13 +102,19 @@ class BuiltinToolset(PythonToolset):
                                             for tool in raw_tools])
 
     def get_original_tools(self, namespaced_tool_name: bool=True) -> list[ToolDef]:
-        return super().get_tools(namespaced_tool_name=namespaced_tool_name)
+        return list(self._namespaced_tools_cache
+                    if namespaced_tool_name
+                    else self._non_namespaced_tools_cache)
 
     @override
     def get_tools(self, namespaced_tool_name: bool=True) -> list[ToolDef]:
         if self._tool_ent_map is None:
             raise ValueError("Toolset not initialized")
 
+        # the tool entities are fixed for the lifetime of this instance
+        if namespaced_tool_name in self._tools_cache:
+            return list(self._tools_cache[namespaced_tool_name])
+
         result = []
         for namespaced, non_namespaced in zip(self._namespaced_tools_cache, self._non_namespaced_tools_cache):
             # namespaced name of tooldef is the internal_key of the tool entity
@@ -97,4 +129,5 @@ class BuiltinToolset(PythonToolset):
                                             auto_approve=tool_ent.auto_approve,
                                             needs_user_interaction=tool_defaults.get("needs_user_interaction", False)))
             result.append(tool_with_metadata)
-        return result
+        self._tools_cache[namespaced_tool_name] = result
+        return list(result)
@@ -78,6 +78,8 @@ class McpToolset(Toolset):
         self._status = McpToolsetStatus.DISCONNECTED
         self._error: McpConnectionErrorCode | None = None
         self._tool_map = {tool.internal_key: tool for tool in toolset_ent.tools}
+        # bumped whenever the result of get_tools may change
+        self._revision = 0
 
         if self._inner_toolset.connected:
             self._status = McpToolsetStatus.CONNECTED
@@ -99,6 +101,10 @@ class McpToolset(Toolset):
     def error(self) -> McpConnectionErrorCode | None:
         return self._error
 
+    @property
+    def revision(self) -> int:
+        return self._revision
+
     async def _merge_tools(self, latest_tool_list: list[ToolDef]) -> list[toolset_models.Tool]:
         async with db_context() as db_session:
             toolset_service = ToolsetService.from_db_session(db_session)
@@ -136,14 +142,17 @@ class McpToolset(Toolset):
         latest_tool_list = self._inner_toolset.get_tools(namespaced_tool_name=False)
         merged_tool_list = await self._merge_tools(latest_tool_list)
         self._tool_map = {tool.internal_key: tool for tool in merged_tool_list}
+        self._revision += 1
 
     async def connect(self):
         self._status = McpToolsetStatus.CONNECTING
+        self._revision += 1
         try:
             await self._inner_toolset.connect()
         except McpConnectionError as e:
             self._status = McpToolsetStatus.ERROR
             self._error = e.error_code
+            self._revision += 1
             raise
         self._status = McpToolsetStatus.CONNECTED
         await self.sync()
@@ -153,3 +162,4 @@ class McpToolset(Toolset):
         await inner_toolset.disconnect()
         self._error = None
         self._status = McpToolsetStatus.DISCONNECTED
+        self._revision += 1
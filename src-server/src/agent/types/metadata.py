@@ -15,6 +15,9 @@ class ToolMessageMetadata(TypedDict, total=False):
     # this field is used to identify if a pending tool message needs respond or approve
     pending_action: Literal["respond", "approve"]
 
+    # the task resource holding the full result when only a preview is kept in the message
+    offloaded_result: FileResourceMetadata
+
 def is_agent_tool_metadata(_: dict) -> TypeGuard[ToolMessageMetadata]:
     return True
 
@@ -1,5 +1,5 @@
 from collections.abc import AsyncGenerator
-from typing import Annotated, Literal, Self
+from typing import Annotated, Any, Literal, Self
 from dais_sdk.types import (
     Message,
     ToolMessage, AssistantMessage,
@@ -7,7 +7,7 @@ from dais_sdk.types import (
     TextChunkEvent as SdkTextChunkEvent,
     ToolCallChunkEvent as SdkToolCallChunkEvent
 )
-from pydantic import BaseModel, Discriminator
+from pydantic import BaseModel, Discriminator, TypeAdapter
 from src.db.models import tasks as task_models
 
 
@@ -79,6 +79,26 @@ class MessageReplaceEvent(BaseModel):
     message: Message
     event_id: Literal["MESSAGE_REPLACE"] = "MESSAGE_REPLACE"
 
+class MessagePatchEvent(BaseModel):
+    """
+    The delta form of MessageReplaceEvent for a tool message, only carries the fields
+    that change after the tool call is created, instead of its arguments and name.
+    """
+    message_id: str
+    result: str | list[ContentBlockMetadata] | None
+    error: str | None
+    metadata: dict[str, Any]
+    event_id: Literal["MESSAGE_PATCH"] = "MESSAGE_PATCH"
+
+    @classmethod
+    def from_message(cls, message: ToolMessage) -> Self:
+        return cls(
+            message_id=message.id,
+            result=message.result,
+            error=message.error,
+            metadata=dict(message.metadata),
+        )
+
 class ToolCallEndEvent(BaseModel):
     message: ToolMessage
     event_id: Literal["TOOL_CALL_END"] = "TOOL_CALL_END"
@@ -94,6 +114,15 @@ class ErrorEvent(BaseModel):
     retryable: bool = False
     event_id: Literal["ERROR"] = "ERROR"
 
+class ToolExecutionStartEvent(BaseModel):
+    call_id: str
+    event_id: Literal["TOOL_EXECUTION_START"] = "TOOL_EXECUTION_START"
+
+class ToolExecutionProgressEvent(BaseModel):
+    call_id: str
+    elapsed: float # seconds since the execution started
+    event_id: Literal["TOOL_EXECUTION_PROGRESS"] = "TOOL_EXECUTION_PROGRESS"
+
 class ToolExecutedEvent(BaseModel):
     call_id: str
     result: str | list[ContentBlockMetadata] | None
@@ -114,6 +143,8 @@ class ToolRequirePermissionEvent(BaseModel):
 
 
 type ToolEvent = (
+    ToolExecutionStartEvent |
+    ToolExecutionProgressEvent |
     ToolExecutedEvent |
     ToolDeniedEvent |
     ToolRequireUserResponseEvent |
@@ -128,6 +159,7 @@ type AgentEvent = Annotated[(
     UsageChunkEvent |
     MessageEndEvent |
     MessageReplaceEvent |
+    MessagePatchEvent |
     ToolCallEndEvent |
     TaskDoneEvent |
     TaskInterruptedEvent |
@@ -136,3 +168,9 @@ type AgentEvent = Annotated[(
 ), Discriminator("event_id")]
 
 type AgentGenerator = AsyncGenerator[AgentEvent, None]
+
+agent_event_adapter = TypeAdapter(AgentEvent)
+
+def encode_agent_event(event: AgentEvent) -> bytes:
+    """Serialize the event with the serializer compiled once for the whole event union."""
+    return agent_event_adapter.dump_json(event)
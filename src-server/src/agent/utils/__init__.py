@@ -3,3 +3,6 @@ from .magika_instance import (
     get_magika, MagikaGroups,
     identify_path as magika_identify_path,
 )
+from .provider_pool import ProviderPool, use_provider_pool
+from .metrics import AgentMetrics, use_agent_metrics
+from .document_preconverter import DocumentPreconverter, use_document_preconverter
@@ -0,0 +1,187 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from anyio import Path as AnyioPath
+from dais_scantree import bfs as scantree_bfs
+from loguru import logger
+from watchfiles import Change as ChangeType
+
+from src.db import db_context
+from src.services.markdown_cache import MarkdownCacheService
+from src.settings import use_app_setting_manager
+from src.utils import DirectoryWatcher, FileChange, MarkdownConverter, use_conversion_executor
+
+
+@dataclass
+class _ActiveWorkspace:
+    workspace_id: int
+    root: Path
+    watcher: DirectoryWatcher | None = None
+    last_used_at: float = field(default_factory=time.monotonic)
+
+class DocumentPreconverter:
+    """
+    Converts the documents of the active workspaces into the markdown cache in the
+    background, so that the first `read_file` of a document is a cache lookup.
+
+    A workspace becomes active when a task starts in it: its tree is scanned once and
+    then watched for document changes. The conversions run one at a time and only while
+    no other conversion is waiting, so that they never delay the ones a task waits for.
+    """
+    _logger = logger.bind(name="DocumentPreconverter")
+
+    MAX_SCANNED_ENTRIES = 50_000
+    # seconds to wait before checking again whether the conversion executor is idle
+    IDLE_POLL_INTERVAL = 1.0
+
+    def __init__(self, capacity: int = 4, idle_timeout: float = 1800):
+        self._capacity = capacity
+        self._idle_timeout = idle_timeout
+        self._workspaces: OrderedDict[int, _ActiveWorkspace] = OrderedDict()
+        # (workspace id, absolute path), kept in insertion order without duplicates
+        self._pending: dict[tuple[int, Path], None] = {}
+        self._pending_event = asyncio.Event()
+        self._tasks: set[asyncio.Task] = set()
+        self._worker: asyncio.Task | None = None
+        self._started = False
+        self._markdown_converter = MarkdownConverter()
+
+    def start(self):
+        self._started = True
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _enqueue(self, workspace_id: int, paths: list[Path]):
+        for path in paths:
+            self._pending[(workspace_id, path)] = None
+        if len(paths) > 0:
+            self._pending_event.set()
+
+    @staticmethod
+    def _is_document(path: Path) -> bool:
+        return MarkdownConverter.is_convertable_binary(path)
+
+    def _scan_documents(self, root: Path) -> list[Path]:
+        return [Path(entry.path)
+                for entry in scantree_bfs(root, self.MAX_SCANNED_ENTRIES)
+                if entry.is_file(follow_symlinks=False) and self._is_document(Path(entry.name))]
+
+    async def _prepare(self, workspace: _ActiveWorkspace):
+        async def on_changes(changes: list[FileChange]):
+            self._enqueue(workspace.workspace_id, [
+                Path(path) for change_type, path in changes
+                if change_type != ChangeType.deleted and self._is_document(Path(path))
+            ])
+
+        try:
+            workspace.watcher = DirectoryWatcher(AnyioPath(workspace.root), on_changes)
+            await workspace.watcher.start()
+            documents = await asyncio.to_thread(self._scan_documents, workspace.root)
+            self._enqueue(workspace.workspace_id, documents)
+        except Exception:
+            self._logger.exception(f"Failed to prepare the document pre-conversion of {workspace.root}")
+            await self._deactivate(workspace)
+
+    async def _deactivate(self, workspace: _ActiveWorkspace):
+        if self._workspaces.get(workspace.workspace_id) is workspace:
+            self._workspaces.pop(workspace.workspace_id)
+        for key in [key for key in self._pending if key[0] == workspace.workspace_id]:
+            self._pending.pop(key)
+        if workspace.watcher is not None:
+            await workspace.watcher.stop()
+            workspace.watcher = None
+
+    def _sweep(self):
+        now = time.monotonic()
+        expired = [workspace for workspace in self._workspaces.values()
+                   if now - workspace.last_used_at > self._idle_timeout]
+        remaining = [workspace for workspace in self._workspaces.values() if workspace not in expired]
+        # the workspaces are kept in LRU order, the least recently used ones come first
+        overflowed = remaining[:max(len(remaining) - self._capacity, 0)]
+        for workspace in expired + overflowed:
+            self._spawn(self._deactivate(workspace))
+
+    def activate(self, workspace_id: int, root: Path):
+        if not self._started: return
+        if not use_app_setting_manager().settings.document_preconversion: return
+
+        workspace = self._workspaces.get(workspace_id)
+        if workspace is not None and workspace.root == root:
+            self._workspaces.move_to_end(workspace_id)
+            workspace.last_used_at = time.monotonic()
+            return
+        if workspace is not None:
+            # the workspace directory was changed
+            self._spawn(self._deactivate(workspace))
+
+        workspace = self._workspaces[workspace_id] = _ActiveWorkspace(workspace_id, root)
+        self._spawn(self._prepare(workspace))
+        self._sweep()
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._work())
+
+    async def _wait_until_idle(self):
+        while len(use_conversion_executor().jobs()) > 0:
+            await asyncio.sleep(self.IDLE_POLL_INTERVAL)
+
+    async def _convert(self, workspace: _ActiveWorkspace, path: Path):
+        if not await AnyioPath(path).is_file(): return
+        async with db_context() as db_session:
+            markdown_cache_service = MarkdownCacheService.from_db_session(db_session, workspace.workspace_id, workspace.root)
+            lookup = await markdown_cache_service.lookup(path)
+        if lookup is not None and lookup.content is not None:
+            if lookup.needs_record:
+                async with db_context() as db_session:
+                    markdown_cache_service = MarkdownCacheService.from_db_session(db_session, workspace.workspace_id, workspace.root)
+                    await markdown_cache_service.record(lookup)
+            return
+
+        converted = await self._markdown_converter.convert(path)
+        async with db_context() as db_session:
+            markdown_cache_service = MarkdownCacheService.from_db_session(db_session, workspace.workspace_id, workspace.root)
+            await markdown_cache_service.set(path, converted)
+        self._logger.debug(f"Pre-converted {path}")
+
+    async def _work(self):
+        while True:
+            await self._pending_event.wait()
+            if len(self._pending) == 0:
+                self._pending_event.clear()
+                continue
+            await self._wait_until_idle()
+            workspace_id, path = next(iter(self._pending))
+            self._pending.pop((workspace_id, path))
+
+            workspace = self._workspaces.get(workspace_id)
+            if workspace is None: continue
+            try:
+                await self._convert(workspace, path)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._logger.warning(f"Failed to pre-convert {path}: {e}")
+
+    async def close(self):
+        self._started = False
+        tasks = list(self._tasks)
+        if self._worker is not None:
+            tasks.append(self._worker)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        for workspace in list(self._workspaces.values()):
+            await self._deactivate(workspace)
+
+__instance: DocumentPreconverter | None = None
+
+def use_document_preconverter() -> DocumentPreconverter:
+    global __instance
+    if __instance is None:
+        __instance = DocumentPreconverter()
+    return __instance
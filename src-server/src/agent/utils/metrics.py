@@ -0,0 +1,49 @@
+from src.utils.metrics import MetricsRegistry, use_metrics_registry
+
+
+TOKENS_PER_SECOND_BUCKETS = (1, 5, 10, 20, 40, 60, 80, 100, 150, 200, 300, 500)
+
+class AgentMetrics:
+    """
+    The metrics recorded by the agent runtime, labelled per task, agent and provider/model.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.llm_time_to_first_token = registry.histogram(
+            "dais_llm_time_to_first_token_seconds",
+            "Time from sending an LLM request to receiving the first streamed chunk.",
+            ("provider", "model", "agent"))
+        self.llm_request_duration = registry.histogram(
+            "dais_llm_request_duration_seconds",
+            "Wall-clock duration of an LLM request.",
+            ("provider", "model", "agent"))
+        self.llm_output_tokens_per_second = registry.histogram(
+            "dais_llm_output_tokens_per_second",
+            "Output tokens per second after the first streamed chunk.",
+            ("provider", "model"),
+            buckets=TOKENS_PER_SECOND_BUCKETS)
+        self.llm_tokens = registry.counter(
+            "dais_llm_tokens_total",
+            "Tokens used by the LLM requests.",
+            ("task", "agent", "provider", "model", "direction"))
+        self.llm_retries = registry.counter(
+            "dais_llm_retries_total",
+            "LLM requests retried after a retryable provider error.",
+            ("provider", "model", "agent"))
+        self.tool_execution_duration = registry.histogram(
+            "dais_tool_execution_duration_seconds",
+            "Duration of the tool executions.",
+            ("tool", "status"))
+        self.persist_duration = registry.histogram(
+            "dais_task_persist_duration_seconds",
+            "Duration of writing the task state to the database.",
+            ("task_type",))
+
+__instance: AgentMetrics | None = None
+
+def use_agent_metrics() -> AgentMetrics:
+    global __instance
+    if __instance is None:
+        __instance = AgentMetrics(use_metrics_registry())
+    return __instance
@@ -0,0 +1,90 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+
+from dais_sdk import LLM
+from dais_sdk.providers import BaseProvider, LlmProviders
+from loguru import logger
+
+
+type ProviderKey = tuple[LlmProviders, str, str]
+
+@dataclass
+class _PoolEntry:
+    provider: BaseProvider
+    last_used_at: float = field(default_factory=time.monotonic)
+    # number of requests currently using the provider, leased providers are never closed
+    leases: int = 0
+
+class ProviderPool:
+    """
+    Keeps the provider clients alive across requests, so that their HTTP connections
+    are reused instead of being set up again for every agent step.
+
+    The clients are keyed by (provider type, base_url, api_key), evicted in LRU order
+    when the capacity is exceeded or when they stay idle longer than `idle_timeout`.
+    """
+    _logger = logger.bind(name="ProviderPool")
+
+    def __init__(self, capacity: int = 16, idle_timeout: float = 600):
+        self._capacity = capacity
+        self._idle_timeout = idle_timeout
+        self._entries: OrderedDict[ProviderKey, _PoolEntry] = OrderedDict()
+
+    def _acquire(self, key: ProviderKey) -> _PoolEntry:
+        entry = self._entries.get(key)
+        if entry is None:
+            provider_type, base_url, api_key = key
+            entry = _PoolEntry(LLM.create_provider(provider_type, base_url, api_key=api_key))
+            self._entries[key] = entry
+        self._entries.move_to_end(key)
+        entry.leases += 1
+        entry.last_used_at = time.monotonic()
+        return entry
+
+    def _collect_evictable(self) -> list[_PoolEntry]:
+        now = time.monotonic()
+        idle_keys = [key for key, entry in self._entries.items() if entry.leases == 0]
+        expired = [key for key in idle_keys
+                   if now - self._entries[key].last_used_at > self._idle_timeout]
+        # the entries are kept in LRU order, the least recently used ones come first
+        overflow = len(self._entries) - len(expired) - self._capacity
+        overflowed = [key for key in idle_keys if key not in expired][:max(overflow, 0)]
+        return [self._entries.pop(key) for key in expired + overflowed]
+
+    async def _close(self, entries: list[_PoolEntry]):
+        results = await asyncio.gather(*(entry.provider.close() for entry in entries),
+                                       return_exceptions=True)
+        for result in results:
+            if isinstance(result, BaseException):
+                self._logger.opt(exception=result).warning("Failed to close provider client")
+
+    @asynccontextmanager
+    async def lease(self,
+                    provider_type: LlmProviders,
+                    base_url: str,
+                    api_key: str,
+                    ) -> AsyncGenerator[BaseProvider]:
+        entry = self._acquire((provider_type, base_url, api_key))
+        try:
+            yield entry.provider
+        finally:
+            entry.leases -= 1
+            entry.last_used_at = time.monotonic()
+            await asyncio.shield(self._close(self._collect_evictable()))
+
+    async def close(self):
+        entries = list(self._entries.values())
+        self._entries.clear()
+        await self._close(entries)
+
+__instance: ProviderPool | None = None
+
+def use_provider_pool() -> ProviderPool:
+    global __instance
+    if __instance is None:
+        __instance = ProviderPool()
+    return __instance
@@ -25,6 +25,7 @@ from .routes import (
     context_file_router,
     schedule_manage_router,
     health_router,
+    metrics_router,
 )
 from .exception_handlers import (
     ErrorResponseSchema,
@@ -86,6 +87,7 @@ app.include_router(schedule_manage_router, prefix="/api/schedules")
 
 app.include_router(sse_router, prefix="/api/events")
 app.include_router(health_router, prefix="/api/health")
+app.include_router(metrics_router, prefix="/api/metrics")
 app.include_router(filesystem_router, prefix="/api/filesystem")
 
 app.include_router(static_router)
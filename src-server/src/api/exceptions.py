@@ -11,6 +11,8 @@ class ApiErrorCode(StrEnum):
     PATH_ACCESS_DENIED = "PATH_ACCESS_DENIED"
 
     TASK_MESSAGE_NOT_FOUND = "TASK_MESSAGE_NOT_FOUND"
+    TASK_NOT_RUNNING = "TASK_NOT_RUNNING"
+    TASK_IS_RUNNING = "TASK_IS_RUNNING"
     TASK_RESOURCE_NOT_FOUND = "TASK_RESOURCE_NOT_FOUND"
     TASK_RESOURCE_SHOULD_HAVE_FILENAME_AND_CONTENTTYPE = "TASK_RESOURCE_SHOULD_HAVE_FILENAME_AND_CONTENTTYPE"
 
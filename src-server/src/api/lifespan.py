@@ -8,13 +8,17 @@ from fastapi import FastAPI
 
 from src.agent.notes import NoteMaterializer
 from src.agent.skills import SkillMaterializer
+from src.agent.task import use_task_registry, use_task_run_manager
 from src.agent.task.schedule_runner import init_schedule_runner
+from src.agent.utils import use_document_preconverter, use_provider_pool
 from src.agent.tool import BuiltinToolsetManager, McpToolsetManager, use_mcp_toolset_manager
 from src.db import engine as database_engine, db_context
 from src.services.markdown_cache import MarkdownCacheService
+from src.services.tool_call_verdict import ToolCallVerdictService
 from src.services.tasks import RunRecordService, TaskService
 from src.services.workspace import WorkspaceService
 from src.settings import AppSettings, use_app_setting_manager
+from src.utils import use_conversion_executor, use_file_index_manager
 
 from .cleanup import CleanupManager
 from .sse_dispatcher import SseDispatcher
@@ -51,6 +55,7 @@ class LifespanManager:
         self.app_setting_manager = use_app_setting_manager()
         self.mcp_toolset_manager = use_mcp_toolset_manager()
         self.background_task_manager = BackgroundTaskManager()
+        self.task_registry = use_task_registry()
 
     @asynccontextmanager
     async def __call__(self, app: FastAPI) -> AsyncGenerator[AppState]:
@@ -77,8 +82,17 @@ class LifespanManager:
         # schedule runner loads after materialize calls,
         # prevent the scheduled task runs without skills and notes
         self.background_task_manager.add_task(self.schedule_runner.load_schedules())
-
+        use_file_index_manager().start()
+        use_document_preconverter().start()
+
+        # cleanups run in reverse order, the provider clients are closed after the tasks are stopped
+        CleanupManager.add_cleanup(use_provider_pool().close)
+        CleanupManager.add_cleanup(use_file_index_manager().close)
+        CleanupManager.add_cleanup(use_conversion_executor().close)
+        CleanupManager.add_cleanup(use_document_preconverter().close)
         CleanupManager.add_cleanup(self.schedule_runner.shutdown)
+        CleanupManager.add_cleanup(self.task_registry.shutdown)
+        CleanupManager.add_cleanup(use_task_run_manager().shutdown)
         CleanupManager.add_cleanup(self.background_task_manager.shutdown)
         CleanupManager.add_cleanup(self.mcp_toolset_manager.disconnect_mcp_servers)
         CleanupManager.add_cleanup(self.app_setting_manager.persist)
@@ -103,3 +117,4 @@ class LifespanManager:
             workspaces = await WorkspaceService.from_db_session(db_session).get_all()
             for workspace in workspaces:
                 await MarkdownCacheService.from_db_session(db_session, workspace.id, Path(workspace.directory)).clear_unused()
+            await ToolCallVerdictService.from_db_session(db_session).cleanup_expired()
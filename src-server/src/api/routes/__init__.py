@@ -12,6 +12,7 @@ from .settings import settings_router
 # functional routes
 from .sse import sse_router
 from .health import health_router
+from .metrics import metrics_router
 from .static import static_router
 
 # utility routes
@@ -3,6 +3,7 @@ from fastapi import Query
 from fastapi import status
 from fastapi_pagination import Page
 
+from src.agent.task import use_task_registry
 from src.schemas import agent as agent_schemas
 
 from ..dependencies import AgentServiceDep
@@ -31,8 +32,11 @@ async def create_agent(service: AgentServiceDep, body: agent_schemas.AgentCreate
 async def update_agent(service: AgentServiceDep,
                        agent_id: int,
                        body: agent_schemas.AgentUpdate):
-    return await service.update(agent_id, body)
+    updated = await service.update(agent_id, body)
+    await use_task_registry().evict_all()
+    return updated
 
 @agents_router.delete("/{agent_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_agent(service: AgentServiceDep, agent_id: int):
     await service.delete(agent_id)
+    await use_task_registry().evict_all()
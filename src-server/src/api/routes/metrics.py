@@ -0,0 +1,38 @@
+from typing import Any, Literal
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel
+
+from src.agent.utils import use_agent_metrics
+
+
+class MetricSeries(BaseModel):
+    labels: dict[str, str]
+    # counters
+    value: float | None = None
+    # histograms, the bucket counts are keyed by their upper bounds and not cumulative
+    count: int | None = None
+    sum: float | None = None
+    min: float | None = None
+    max: float | None = None
+    buckets: dict[str, int] | None = None
+
+class MetricRead(BaseModel):
+    name: str
+    help: str
+    type: Literal["counter", "histogram"]
+    series: list[MetricSeries]
+
+metrics_router = APIRouter(tags=["metrics"])
+
+@metrics_router.get("/", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    """
+    The metrics in the Prometheus text exposition format.
+    """
+    return PlainTextResponse(use_agent_metrics().registry.render_prometheus(),
+                             media_type="text/plain; version=0.0.4")
+
+@metrics_router.get("/json", response_model=list[MetricRead])
+async def get_metrics_json() -> list[dict[str, Any]]:
+    return use_agent_metrics().registry.to_json()
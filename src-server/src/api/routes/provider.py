@@ -2,6 +2,7 @@ from fastapi import APIRouter
 from fastapi import status
 from fastapi_pagination import Page
 
+from src.agent.task import use_task_registry
 from src.schemas import provider as provider_schemas
 
 from ..dependencies import ProviderServiceDep
@@ -34,8 +35,11 @@ async def create_provider(service: ProviderServiceDep, body: provider_schemas.Pr
 async def update_provider(service: ProviderServiceDep,
                           provider_id: int,
                           body: provider_schemas.ProviderUpdate):
-    return await service.update(provider_id, body)
+    updated = await service.update(provider_id, body)
+    await use_task_registry().evict_all()
+    return updated
 
 @providers_router.delete("/{provider_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_provider(service: ProviderServiceDep, provider_id: int):
     await service.delete(provider_id)
+    await use_task_registry().evict_all()
@@ -22,6 +22,7 @@ from dais_skills.scanner.exceptions import (
 from fastapi import APIRouter, File, Query, UploadFile, status
 from fastapi_pagination import Page
 
+from src.agent.task import use_task_registry
 from src.schemas import skill as skill_schemas
 
 from ..dependencies import SkillServiceDep
@@ -159,8 +160,11 @@ async def upload_archive(service: SkillServiceDep, file: UploadFile = File(...))
 async def update_skill(service: SkillServiceDep,
                        skill_id: int,
                        body: skill_schemas.SkillUpdate):
-    return await service.update(skill_id, body)
+    updated = await service.update(skill_id, body)
+    await use_task_registry().evict_all()
+    return updated
 
 @skills_router.delete("/{skill_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_skill(service: SkillServiceDep, skill_id: int):
     await service.delete(skill_id)
+    await use_task_registry().evict_all()
@@ -1,6 +1,7 @@
 from collections.abc import AsyncIterable
-from fastapi import APIRouter
-from fastapi.sse import EventSourceResponse
+from typing import Annotated
+from fastapi import APIRouter, Query
+from fastapi.sse import EventSourceResponse, ServerSentEvent
 from ..sse_dispatcher import SseDispatcherDep
 from ..sse_dispatcher.types import DispatcherEventData
 
@@ -12,6 +13,12 @@ sse_router = APIRouter(tags=["stream"])
     responses={ 200: {"model": DispatcherEventData} },
     response_class=EventSourceResponse,
 )
-async def sse_endpoint(sse_dispatcher: SseDispatcherDep) -> AsyncIterable[DispatcherEventData]:
-    async for data in sse_dispatcher.listen():
-        yield data
+async def sse_endpoint(sse_dispatcher: SseDispatcherDep,
+                       workspace_id: Annotated[list[int] | None, Query()] = None,
+                       event_type: Annotated[list[str] | None, Query()] = None,
+                       ) -> AsyncIterable[ServerSentEvent]:
+    async for event in sse_dispatcher.listen(
+        workspace_ids=set(workspace_id) if workspace_id is not None else None,
+        event_types=set(event_type) if event_type is not None else None,
+    ):
+        yield ServerSentEvent(data=event.data, id=str(event.id))
@@ -1,13 +1,17 @@
 import asyncio
+import heapq
+import threading
 import time
+from collections import OrderedDict
 from functools import lru_cache
 from pathlib import Path
 from typing import Literal
 from dais_scantree import bfs as scantree_bfs
 from fastapi import APIRouter, Query, status
 from pydantic import BaseModel
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
 from src.schemas.tasks import context_file as context_file_schemas
+from src.utils import FileIndex, use_file_index_manager
 from ...dependencies import WorkspaceServiceDep
 from ...exceptions import ApiError, ApiErrorCode
 
@@ -69,22 +73,84 @@ def _scan_cached_ttl(root: Path, scan_limit: int) -> list[SearchCandidate]:
     slot = int(time.monotonic() // TTL)
     return _scan_cached(root, scan_limit, slot)
 
-def _search_file(query: str, workspace_root: Path, match_limit: int) -> list[context_file_schemas.ContextFileItem]:
+class _SearchIndex:
+    """
+    The candidates split into columns for the bulk scorers of rapidfuzz, with an inverted
+    character index as prefilter: a candidate sharing no character with the query always
+    scores 0, so it is skipped before scoring.
+    """
+    def __init__(self, candidates: list[SearchCandidate]):
+        self.candidates = candidates
+        self.names = [name for name, _, _ in candidates]
+        self.paths = [path for _, path, _ in candidates]
+        postings: dict[str, list[int]] = {}
+        for position, path in enumerate(self.paths):
+            # the name is the last part of the path, so the path covers its characters
+            for char in set(path):
+                postings.setdefault(char, []).append(position)
+        self._postings = postings
+
+    def prefilter(self, query: str) -> list[int]:
+        """
+        The positions of the candidates sharing at least one character with the query, in scan order.
+        """
+        matched: set[int] = set()
+        for char in set(query):
+            matched.update(self._postings.get(char, ()))
+        return sorted(matched)
+
+# candidate list id -> (candidate list, index), the list is kept so that its id is not reused
+_search_indexes: OrderedDict[int, tuple[list[SearchCandidate], _SearchIndex]] = OrderedDict()
+_search_indexes_lock = threading.Lock()
+
+def _get_search_index(candidates: list[SearchCandidate]) -> _SearchIndex:
+    MAX_CACHED_INDEXES = 8
+    key = id(candidates)
+    with _search_indexes_lock:
+        cached = _search_indexes.get(key)
+        if cached is not None:
+            _search_indexes.move_to_end(key)
+            return cached[1]
+    index = _SearchIndex(candidates)
+    with _search_indexes_lock:
+        _search_indexes[key] = (candidates, index)
+        while len(_search_indexes) > MAX_CACHED_INDEXES:
+            _search_indexes.popitem(last=False)
+    return index
+
+def _search_file(query: str,
+                 workspace_root: Path,
+                 match_limit: int,
+                 index: FileIndex | None = None,
+                 ) -> list[context_file_schemas.ContextFileItem]:
     MAX_SCAN_LIMIT = 10_000
     SCORE_CUTOFF = 60
-    candidates = _scan_cached_ttl(workspace_root, MAX_SCAN_LIMIT)
-
-    results: list[tuple[float, context_file_schemas.ContextFileItem]] = []
-    for basename, rel_path, node_type in candidates:
-        name_score = fuzz.WRatio(query, basename)
-        path_score = fuzz.WRatio(query, rel_path)
-        score = max(name_score, path_score)
-        if score >= SCORE_CUTOFF:
-            if node_type == "folder": rel_path += "/"
-            results.append((score, context_file_schemas.ContextFileItem(path=rel_path, name=basename, type=node_type)))
-
-    results.sort(key=lambda r: r[0], reverse=True)
-    return [item for _, item in results[:match_limit]]
+    if index is not None:
+        # the bulk scoring is fast enough to search the whole index
+        candidates = index.search_candidates()
+    else:
+        candidates = _scan_cached_ttl(workspace_root, MAX_SCAN_LIMIT)
+    search_index = _get_search_index(candidates)
+
+    positions = search_index.prefilter(query)
+    if len(positions) == 0: return []
+
+    names = [search_index.names[position] for position in positions]
+    paths = [search_index.paths[position] for position in positions]
+    # the scores below the cutoff are reported as 0
+    name_scores = process.cdist([query], names, scorer=fuzz.WRatio, score_cutoff=SCORE_CUTOFF, workers=-1)[0]
+    path_scores = process.cdist([query], paths, scorer=fuzz.WRatio, score_cutoff=SCORE_CUTOFF, workers=-1)[0]
+    scores = [max(name_score, path_score) for name_score, path_score in zip(name_scores.tolist(), path_scores.tolist())]
+    matched = [matched_index for matched_index, score in enumerate(scores) if score >= SCORE_CUTOFF]
+
+    # `nlargest` keeps the scan order for equal scores, like a stable sort
+    top = heapq.nlargest(match_limit, matched, key=lambda matched_index: scores[matched_index])
+    results: list[context_file_schemas.ContextFileItem] = []
+    for matched_index in top:
+        basename, rel_path, node_type = search_index.candidates[positions[matched_index]]
+        if node_type == "folder": rel_path += "/"
+        results.append(context_file_schemas.ContextFileItem(path=rel_path, name=basename, type=node_type))
+    return results
 
 class ListDirectoryResult(BaseModel):
     items: list[context_file_schemas.ContextFileItem]
@@ -113,5 +179,7 @@ async def search_file(
 ) -> SearchFileResult:
     workspace = await workspace_service.get_by_id(workspace_id)
     workspace_root = Path(workspace.directory).expanduser().resolve()
-    search_file_result = await asyncio.to_thread(_search_file, query, workspace_root, match_limit)
+    # the watched index is used once it is built, scanning the workspace until then
+    index = use_file_index_manager().peek(workspace_root)
+    search_file_result = await asyncio.to_thread(_search_file, query, workspace_root, match_limit, index)
     return SearchFileResult(items=search_file_result, total=len(search_file_result))
@@ -6,13 +6,13 @@ from fastapi import APIRouter, Depends, File, Form, UploadFile, status
 from loguru import logger
 from pydantic import BaseModel
 
-from src.agent.task import MessageNotFoundError
+from src.agent.task import MessageNotFoundError, use_task_registry, use_task_run_manager
 from src.agent.types import MessageReplaceEvent, FileResourceMetadata
 from src.db import db_context
 from src.schemas.tasks import runtime as task_runtime_schemas
 from src.services.tasks import TaskResourceService
 
-from .runtime import create_agent_task
+from .runtime import use_agent_task
 from ...exceptions import ApiError, ApiErrorCode
 
 
@@ -39,6 +39,15 @@ class ToolReviewBody(TaskControlBody):
 def parse_append_message_body(body: str = Form(default=...)) -> TaskAppendMessageBody:
     return TaskAppendMessageBody.model_validate_json(body)
 
+def ensure_not_running(task_type: task_runtime_schemas.TaskType, task_id: int):
+    """
+    The live task is driven by its run while it is running,
+    its messages and tool calls are not changed from outside until the run stops.
+    """
+    run = use_task_run_manager().get(task_type, task_id)
+    if run is not None and run.is_running:
+        raise ApiError(status.HTTP_409_CONFLICT, ApiErrorCode.TASK_IS_RUNNING)
+
 task_control_router = APIRouter(tags=["task"])
 _logger = logger.bind(name="TaskControlRoute")
 
@@ -66,16 +75,19 @@ async def append_task_message(
                 ))
         return metadatas
 
-    task = await create_agent_task(task_type, task_id, body.agent_id)
-    task.tool_calls.discard_pendings()
+    async with use_agent_task(task_type, task_id, body.agent_id) as task:
+        ensure_not_running(task_type, task_id)
+        user_message = body.message
+        if len(uploaded_files) > 0:
+            resource_metadatas = await asyncio.shield(persist_attachments())
+            user_message.attachments = cast(list[ContentBlockMetadata], resource_metadatas)
+            # the run could have started while the attachments were saved
+            ensure_not_running(task_type, task_id)
 
-    user_message = body.message
-    if len(uploaded_files) > 0:
-        resource_metadatas = await asyncio.shield(persist_attachments())
-        user_message.attachments = cast(list[ContentBlockMetadata], resource_metadatas)
-
-    task.messages.append(user_message)
-    return await asyncio.shield(task.persist())
+        task.tool_calls.discard_pendings()
+        task.messages.append(user_message)
+        use_task_registry().schedule_persist(task_type, task_id)
+        return task.snapshot()
 
 @task_control_router.patch("/{task_type}/{task_id}/messages", response_model=task_runtime_schemas.TaskRuntimeContext)
 async def edit_task_message(
@@ -83,12 +95,14 @@ async def edit_task_message(
     task_id: int,
     body: TaskMessageEditBody,
 ):
-    task = await create_agent_task(task_type, task_id, body.agent_id)
-    try:
-        task.messages.edit(body.message_id, body.content)
-    except MessageNotFoundError:
-        raise ApiError(status.HTTP_404_NOT_FOUND, ApiErrorCode.TASK_MESSAGE_NOT_FOUND, f"Task message '{body.message_id}' not found")
-    return await asyncio.shield(task.persist())
+    async with use_agent_task(task_type, task_id, body.agent_id) as task:
+        ensure_not_running(task_type, task_id)
+        try:
+            task.messages.edit(body.message_id, body.content)
+        except MessageNotFoundError:
+            raise ApiError(status.HTTP_404_NOT_FOUND, ApiErrorCode.TASK_MESSAGE_NOT_FOUND, f"Task message '{body.message_id}' not found")
+        use_task_registry().schedule_persist(task_type, task_id)
+        return task.snapshot()
 
 @task_control_router.post("/{task_type}/{task_id}/answer", response_model=MessageReplaceEvent)
 async def tool_answer(
@@ -99,15 +113,16 @@ async def tool_answer(
     """
     This endpoint is used for the HumanInTheLoop tool calls.
     """
-    task = await create_agent_task(task_type, task_id, body.agent_id)
-    try:
-        event = task.tool_calls.apply_user_response(body.call_id, body.answer)
-        return event
-    except MessageNotFoundError:
-        raise ApiError(status.HTTP_404_NOT_FOUND,
-                       ApiErrorCode.TOOL_CALL_NOT_FOUND)
-    finally:
-        await asyncio.shield(task.persist())
+    async with use_agent_task(task_type, task_id, body.agent_id) as task:
+        ensure_not_running(task_type, task_id)
+        try:
+            event = task.tool_calls.apply_user_response(body.call_id, body.answer)
+            return event
+        except MessageNotFoundError:
+            raise ApiError(status.HTTP_404_NOT_FOUND,
+                           ApiErrorCode.TOOL_CALL_NOT_FOUND)
+        finally:
+            use_task_registry().schedule_persist(task_type, task_id)
 
 @task_control_router.post("/{task_type}/{task_id}/review", response_model=MessageReplaceEvent | None)
 async def tool_reviews(
@@ -118,13 +133,14 @@ async def tool_reviews(
     """
     This endpoint is used to submit the tool call permissions.
     """
-    task = await create_agent_task(task_type, task_id, body.agent_id)
-    try:
-        return task.tool_calls.approve(body.call_id, body.status == "approved")
-    except MessageNotFoundError:
-        raise ApiError(status.HTTP_404_NOT_FOUND, ApiErrorCode.TOOL_CALL_NOT_FOUND)
-    finally:
-        await asyncio.shield(task.persist())
+    async with use_agent_task(task_type, task_id, body.agent_id) as task:
+        ensure_not_running(task_type, task_id)
+        try:
+            return task.tool_calls.approve(body.call_id, body.status == "approved")
+        except MessageNotFoundError:
+            raise ApiError(status.HTTP_404_NOT_FOUND, ApiErrorCode.TOOL_CALL_NOT_FOUND)
+        finally:
+            use_task_registry().schedule_persist(task_type, task_id)
 
 @task_control_router.post("/{task_type}/{task_id}/approve_pendings", response_model=list[MessageReplaceEvent] | None)
 async def approve_pendings(
@@ -132,15 +148,27 @@ async def approve_pendings(
     task_id: int,
     body: TaskControlBody,
 ):
-    task = await create_agent_task(task_type, task_id, body.agent_id)
-    replace_events = []
-    try:
-        for message in task.tool_calls.collect_pendings():
-            event = task.tool_calls.approve(message.call_id, True)
-            if event is not None:
-                replace_events.append(event)
-        return replace_events
-    except MessageNotFoundError:
-        raise ApiError(status.HTTP_404_NOT_FOUND, ApiErrorCode.TOOL_CALL_NOT_FOUND)
-    finally:
-        await asyncio.shield(task.persist())
+    async with use_agent_task(task_type, task_id, body.agent_id) as task:
+        ensure_not_running(task_type, task_id)
+        replace_events = []
+        try:
+            for message in task.tool_calls.collect_pendings():
+                event = task.tool_calls.approve(message.call_id, True)
+                if event is not None:
+                    replace_events.append(event)
+            return replace_events
+        except MessageNotFoundError:
+            raise ApiError(status.HTTP_404_NOT_FOUND, ApiErrorCode.TOOL_CALL_NOT_FOUND)
+        finally:
+            use_task_registry().schedule_persist(task_type, task_id)
+
+@task_control_router.post("/{task_type}/{task_id}/stop", status_code=status.HTTP_204_NO_CONTENT)
+async def stop_task(
+    task_type: task_runtime_schemas.TaskType,
+    task_id: int,
+):
+    """
+    Stop the run of the task, the runs are not stopped by the disconnection of their viewers.
+    """
+    if not await use_task_run_manager().stop(task_type, task_id):
+        raise ApiError(status.HTTP_404_NOT_FOUND, ApiErrorCode.TASK_NOT_RUNNING)
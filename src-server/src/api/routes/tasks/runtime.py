@@ -1,9 +1,12 @@
+from collections.abc import AsyncGenerator
+from contextlib import asynccontextmanager
+
 from fastapi import APIRouter
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.agent.context import AgentContext
-from src.agent.task import AgentTask
+from src.agent.task import AgentTask, use_task_registry, use_task_run_manager
 from src.db import db_context
 from src.schemas.tasks import runtime as task_runtime_schemas
 from src.services.tasks import TaskService, SubtaskService, RunRecordService
@@ -62,6 +65,21 @@ async def create_agent_task(
     ctx = await AgentContext.create(runtime_context)
     return AgentTask(ctx)
 
+@asynccontextmanager
+async def use_agent_task(
+    task_type: task_runtime_schemas.TaskType,
+    task_id: int,
+    agent_id: int,
+) -> AsyncGenerator[AgentTask]:
+    """
+    Lease the live task from the task registry, creating it when it is not loaded yet.
+    """
+    async with use_task_registry().lease(
+        task_type, task_id, agent_id,
+        lambda: create_agent_task(task_type, task_id, agent_id),
+    ) as task:
+        yield task
+
 task_runtime_router = APIRouter(tags=["task"])
 _logger = logger.bind(name="TaskRuntimeRoute")
 
@@ -71,4 +89,11 @@ async def get_task_runtime_context(
     task_id: int,
     db_session: DbSessionDep,
 ):
+    live_task = use_task_registry().get(task_type, task_id)
+    if live_task is not None:
+        snapshot = live_task.snapshot()
+        run = use_task_run_manager().get(task_type, task_id)
+        if run is not None and run.is_running:
+            snapshot.last_event_id = run.resume_event_id
+        return snapshot
     return await load_task_runtime_context(db_session, task_type, task_id)
@@ -3,7 +3,9 @@ from fastapi import Query
 from fastapi import status
 from fastapi_pagination import Page
 
+from src.agent.task import use_task_registry
 from src.agent.task.schedule_runner import use_schedule_runner
+from src.schemas.tasks import runtime as task_runtime_schemas
 from src.schemas.tasks import schedule as schedule_schemas
 
 from ...dependencies import RunRecordServiceDep
@@ -63,8 +65,10 @@ async def cancel_schedule_execution(job_id: int):
 
 @schedule_manage_router.get("/records/{run_record_id}", response_model=schedule_schemas.RunRecordRead)
 async def get_run_record(service: RunRecordServiceDep, run_record_id: int):
+    await use_task_registry().flush(task_runtime_schemas.TaskType.SCHEDULE, run_record_id)
     return await service.get_by_id(run_record_id)
 
 @schedule_manage_router.delete("/records/{run_record_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_run_record(service: RunRecordServiceDep, run_record_id: int):
+    use_task_registry().discard(task_runtime_schemas.TaskType.SCHEDULE, run_record_id)
     await service.delete(run_record_id)
@@ -1,58 +1,29 @@
-import asyncio
-from fastapi import APIRouter, Request
-from fastapi.sse import EventSourceResponse
+from collections.abc import AsyncIterable
+from typing import Annotated
+from fastapi import APIRouter, Header, status
+from fastapi.sse import EventSourceResponse, ServerSentEvent
 from pydantic import BaseModel
-from src.agent.task import AgentTask
-from src.agent.types import (
-    AgentGenerator,
-    AgentEvent,
-    TaskDoneEvent, TaskInterruptedEvent, ErrorEvent
-)
-from loguru import logger
-from .runtime import create_agent_task
+from src.agent.task import TaskRun, use_task_run_manager
+from src.agent.types import AgentEvent, encode_agent_event
+from .runtime import use_agent_task
+from ...exceptions import ApiError, ApiErrorCode
 from src.schemas.tasks import runtime as task_runtime_schemas
 
 
-_logger = logger.bind(name="TaskStreamRoute")
-
 class TaskStreamBody(BaseModel):
     # to ensure that the agent_id for the target task is not None
     agent_id: int
 
 class ContinueTaskBody(TaskStreamBody): ...
 
-async def stream_connector(task: AgentTask, request: Request) -> AgentGenerator:
-    pending_terminal_event = None
-    try:
-        async for event in task.run():
-            if await request.is_disconnected():
-                await task.stop()
-                break
-
-            if isinstance(event, (TaskDoneEvent, TaskInterruptedEvent)):
-                pending_terminal_event = event
-                continue
-            yield event
-    except asyncio.CancelledError, GeneratorExit:
-        await task.stop()
-        raise
-    except Exception as e:
-        _logger.exception("Error in agent stream")
-        yield ErrorEvent(error=str(e))
-    finally:
-        try:
-            # ensure task is persisted before yielding terminal event
-            await asyncio.shield(task.persist())
-        except Exception as e:
-            _logger.exception("Failed to persist task state in stream finalization")
-
-    if await request.is_disconnected():
-        return
-
-    if pending_terminal_event is None:
-        _logger.warning("No terminal event yielded")
-        pending_terminal_event = TaskDoneEvent()
-    yield pending_terminal_event
+async def stream_connector(run: TaskRun, last_event_id: int | None) -> AsyncIterable[ServerSentEvent]:
+    """
+    Stream the events of the run to the client. The run goes on when the client disconnects,
+    the client can attach again with the id of the last event it received.
+    """
+    async for event in run.events(last_event_id):
+        # pre-encoded, so that the event is not serialized again through the generic path
+        yield ServerSentEvent(raw_data=encode_agent_event(event.data).decode(), id=str(event.id))
 
 
 # --- --- --- --- --- ---
@@ -68,8 +39,33 @@ async def continue_task(
     task_type: task_runtime_schemas.TaskType,
     task_id: int,
     body: ContinueTaskBody,
-    request: Request,
-):
-    task = await create_agent_task(task_type, task_id, body.agent_id)
-    async for event in stream_connector(task, request):
+    last_event_id: Annotated[int | None, Header()] = None,
+) -> AsyncIterable[ServerSentEvent]:
+    """
+    Start a run of the task, or attach to the run in progress.
+    """
+    run, created = use_task_run_manager().start(
+        task_type, task_id,
+        lambda: use_agent_task(task_type, task_id, body.agent_id),
+        last_event_id)
+    async for event in stream_connector(run, 0 if created else last_event_id):
+        yield event
+
+@task_stream_router.get(
+    "/{task_type}/{task_id}/events",
+    responses={ 200: {"model": AgentEvent} },
+    response_class=EventSourceResponse,
+)
+async def attach_task(
+    task_type: task_runtime_schemas.TaskType,
+    task_id: int,
+    last_event_id: Annotated[int | None, Header()] = None,
+) -> AsyncIterable[ServerSentEvent]:
+    """
+    Watch the run of the task, replaying the kept events after `Last-Event-ID`.
+    """
+    run = use_task_run_manager().get(task_type, task_id)
+    if run is None:
+        raise ApiError(status.HTTP_404_NOT_FOUND, ApiErrorCode.TASK_NOT_RUNNING)
+    async for event in stream_connector(run, last_event_id):
         yield event
@@ -3,6 +3,8 @@ from fastapi import Query
 from fastapi import status
 from fastapi_pagination import Page
 
+from src.agent.task import use_task_registry
+from src.schemas.tasks import runtime as task_runtime_schemas
 from src.schemas.tasks import task as task_schemas
 
 from ...dependencies import TaskServiceDep
@@ -22,6 +24,7 @@ async def get_recent_tasks(service: TaskServiceDep):
 
 @task_manage_router.get("/{task_id}", response_model=task_schemas.TaskRead)
 async def get_task(service: TaskServiceDep, task_id: int):
+    await use_task_registry().flush(task_runtime_schemas.TaskType.TASK, task_id)
     return await service.get_by_id(task_id)
 
 @task_manage_router.post("/",
@@ -36,4 +39,5 @@ async def summarize_task_title(service: TaskServiceDep, task_id: int):
 
 @task_manage_router.delete("/{task_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_task(service: TaskServiceDep, task_id: int):
+    use_task_registry().discard(task_runtime_schemas.TaskType.TASK, task_id)
     await service.delete(task_id)
@@ -5,6 +5,8 @@ from fastapi import APIRouter
 from fastapi import Query
 from fastapi import status
 
+from src.agent.task import use_task_registry
+from src.agent.tool import BuiltinToolsetManager
 from src.db import toolset_models
 from src.schemas import toolset as toolset_schemas
 
@@ -102,6 +104,9 @@ async def update_toolset(
 ):
     updated = await toolset_service.update(toolset_id, body)
     if updated.type == toolset_models.ToolsetType.BUILT_IN:
+        BuiltinToolsetManager.invalidate()
+        # the live tasks hold the built-in toolsets loaded at their creation
+        await use_task_registry().evict_all()
         return updated
     try:
         await mcp_toolset_service.replace(updated)
@@ -3,6 +3,7 @@ from fastapi import Query
 from fastapi import status
 from fastapi_pagination import Page
 
+from src.agent.task import use_task_registry
 from src.schemas import workspace as workspace_schemas
 
 from ..dependencies import WorkspaceServiceDep
@@ -39,7 +40,9 @@ async def create_workspace(service: WorkspaceServiceDep, body: workspace_schemas
 async def update_workspace(service: WorkspaceServiceDep,
                            workspace_id: int,
                            body: workspace_schemas.WorkspaceUpdate):
-    return await service.update(workspace_id, body)
+    updated = await service.update(workspace_id, body)
+    await use_task_registry().evict_all()
+    return updated
 
 @workspaces_router.put("/{workspace_id}/notes", response_model=workspace_schemas.WorkspaceRead)
 async def update_workspace_notes(service: WorkspaceServiceDep,
@@ -49,6 +52,8 @@ async def update_workspace_notes(service: WorkspaceServiceDep,
 
 @workspaces_router.delete("/{workspace_id}", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_workspace(service: WorkspaceServiceDep, workspace_id: int):
+    # flush before the workspace tasks are removed along with it
+    await use_task_registry().evict_all()
     await service.delete(workspace_id)
 
 @workspaces_router.post("/{workspace_id}/open", status_code=status.HTTP_204_NO_CONTENT)
@@ -1,25 +1,38 @@
-import asyncio
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Hashable
 from typing import Annotated
 from fastapi import Depends, Request
+from src.utils.event_hub import EventHub, HubEvent
 from .types import DispatcherEventData
 
+def _coalesce_key(data: DispatcherEventData) -> Hashable:
+    # a slow client only needs the latest run of each schedule
+    return (data.event_id, data.schedule_id)
+
 class SseDispatcher:
-    def __init__(self):
-        self._queue: asyncio.Queue[DispatcherEventData] = asyncio.Queue()
-        self._is_running = True
+    """
+    Broadcasts the app events to every connected client. Each client has its own bounded
+    buffer, so that a stalled client neither blocks the senders nor grows the memory.
+    """
+    def __init__(self, subscriber_capacity: int = 256):
+        self._hub = EventHub[DispatcherEventData](subscriber_capacity, coalesce_key=_coalesce_key)
 
     async def send(self, data: DispatcherEventData):
-        await self._queue.put(data)
+        self._hub.publish(data)
+
+    async def listen(self,
+                     workspace_ids: set[int] | None = None,
+                     event_types: set[str] | None = None
+                     ) -> AsyncGenerator[HubEvent[DispatcherEventData], None]:
+        def accept(data: DispatcherEventData) -> bool:
+            return ((workspace_ids is None or data.workspace_id in workspace_ids) and
+                    (event_types is None or data.event_id in event_types))
 
-    async def listen(self) -> AsyncGenerator[DispatcherEventData, None]:
-        while self._is_running:
-            yield await self._queue.get()
-            self._queue.task_done()
+        with self._hub.subscribe(accept) as subscription:
+            async for event in subscription:
+                yield event
 
     async def close(self):
-        self._is_running = False
-        await self._queue.join()
+        self._hub.close()
 
 def get_sse_dispatcher(request: Request) -> SseDispatcher:
     return request.state.sse_dispatcher
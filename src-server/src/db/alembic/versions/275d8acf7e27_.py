@@ -0,0 +1,102 @@
+"""Move task messages into the per-message task_messages table.
+
+Revision ID: 275d8acf7e27
+Revises: 156de290a41b
+Create Date: 2026-05-24 14:02:11.415236
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from db.models.utils import PydanticJSON
+
+
+# revision identifiers, used by Alembic.
+revision: str = '275d8acf7e27'
+down_revision: Union[str, Sequence[str], None] = '156de290a41b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table name, owner_type stored by the ORM enum)
+OWNER_TABLES = (
+    ("tasks", "TASK"),
+    ("subtasks", "SUBTASK"),
+    ("run_records", "RUN_RECORD"),
+)
+
+task_messages_table = sa.table(
+    "task_messages",
+    sa.column("owner_type", sa.String()),
+    sa.column("owner_id", sa.Integer()),
+    sa.column("position", sa.Integer()),
+    sa.column("message", sa.JSON()),
+)
+
+
+def _load_json(value):
+    if value is None: return []
+    if isinstance(value, str): return json.loads(value)
+    return value
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('task_messages',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('message', PydanticJSON(None), nullable=False),
+    sa.Column('owner_type', sa.Enum('TASK', 'SUBTASK', 'RUN_RECORD', name='taskresourceownertype', native_enum=False), nullable=False),
+    sa.Column('owner_id', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('task_messages', schema=None) as batch_op:
+        batch_op.create_index('ix_task_messages_owner_position', ['owner_type', 'owner_id', 'position'], unique=True)
+
+    conn = op.get_bind()
+    for table_name, owner_type in OWNER_TABLES:
+        rows = conn.execute(sa.text(f"SELECT id, messages FROM {table_name}")).all()
+        for owner_id, messages in rows:
+            entries = [
+                {
+                    "owner_type": owner_type,
+                    "owner_id": owner_id,
+                    "position": position,
+                    "message": message,
+                }
+                for position, message in enumerate(_load_json(messages))
+            ]
+            if entries:
+                conn.execute(task_messages_table.insert(), entries)
+
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_column('messages')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    conn = op.get_bind()
+    for table_name, owner_type in OWNER_TABLES:
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('messages', PydanticJSON(None), server_default='[]', nullable=False))
+
+        owner_ids = conn.execute(sa.text(f"SELECT id FROM {table_name}")).scalars().all()
+        for owner_id in owner_ids:
+            messages = conn.execute(
+                sa.select(task_messages_table.c.message)
+                .where(
+                    task_messages_table.c.owner_type == owner_type,
+                    task_messages_table.c.owner_id == owner_id,
+                )
+                .order_by(task_messages_table.c.position)
+            ).scalars().all()
+            conn.execute(
+                sa.text(f"UPDATE {table_name} SET messages = :messages WHERE id = :id"),
+                {"messages": json.dumps(list(messages), ensure_ascii=False), "id": owner_id},
+            )
+
+    with op.batch_alter_table('task_messages', schema=None) as batch_op:
+        batch_op.drop_index('ix_task_messages_owner_position')
+
+    op.drop_table('task_messages')
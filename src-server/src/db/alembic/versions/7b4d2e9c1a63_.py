@@ -0,0 +1,58 @@
+"""Key the tool call audit verdicts by workspace.
+
+Revision ID: 7b4d2e9c1a63
+Revises: e5c3a9d17b42
+Create Date: 2026-06-09 11:02:47.385120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7b4d2e9c1a63'
+down_revision: Union[str, Sequence[str], None] = 'e5c3a9d17b42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the verdicts are only a cache and the existing ones cannot be attributed
+    # to a workspace, so the table is recreated instead of migrated
+    with op.batch_alter_table('tool_call_verdicts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tool_call_verdicts_created_at'))
+    op.drop_table('tool_call_verdicts')
+
+    op.create_table('tool_call_verdicts',
+    sa.Column('workspace_id', sa.Integer(), nullable=False),
+    sa.Column('fingerprint', sa.String(), nullable=False),
+    sa.Column('tool_name', sa.String(), nullable=False),
+    sa.Column('risk_level', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(), nullable=False),
+    sa.Column('created_at', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['workspace_id'], ['workspaces.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('workspace_id', 'fingerprint')
+    )
+    with op.batch_alter_table('tool_call_verdicts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tool_call_verdicts_created_at'), ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('tool_call_verdicts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tool_call_verdicts_created_at'))
+    op.drop_table('tool_call_verdicts')
+
+    op.create_table('tool_call_verdicts',
+    sa.Column('fingerprint', sa.String(), nullable=False),
+    sa.Column('tool_name', sa.String(), nullable=False),
+    sa.Column('risk_level', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(), nullable=False),
+    sa.Column('created_at', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('fingerprint')
+    )
+    with op.batch_alter_table('tool_call_verdicts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tool_call_verdicts_created_at'), ['created_at'], unique=False)
@@ -0,0 +1,35 @@
+"""Add the context compaction state to the task tables.
+
+Revision ID: 8b3e61c0d2a7
+Revises: 275d8acf7e27
+Create Date: 2026-05-27 09:41:26.203518
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from db.models.utils import DataClassJSON
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b3e61c0d2a7'
+down_revision: Union[str, Sequence[str], None] = '275d8acf7e27'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ("tasks", "subtasks", "run_records")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table_name in TABLES:
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('compaction', DataClassJSON(None), nullable=True))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table_name in TABLES:
+        with op.batch_alter_table(table_name, schema=None) as batch_op:
+            batch_op.drop_column('compaction')
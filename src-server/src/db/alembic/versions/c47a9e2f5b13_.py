@@ -0,0 +1,55 @@
+"""Store the converted markdown by content hash.
+
+Revision ID: c47a9e2f5b13
+Revises: 8b3e61c0d2a7
+Create Date: 2026-05-29 16:12:48.730112
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47a9e2f5b13'
+down_revision: Union[str, Sequence[str], None] = '8b3e61c0d2a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('markdown_contents',
+    sa.Column('hash', sa.String(), nullable=False),
+    sa.Column('content', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    # keep only the latest entry of each source path, the older ones belong to previous file versions
+    op.execute(
+        "DELETE FROM markdown_caches WHERE id NOT IN "
+        "(SELECT MAX(id) FROM markdown_caches GROUP BY workspace_id, source_path)"
+    )
+    op.execute("INSERT OR IGNORE INTO markdown_contents (hash, content) SELECT hash, content FROM markdown_caches")
+
+    with op.batch_alter_table('markdown_caches', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('source_stat', sa.String(), nullable=True))
+        batch_op.drop_column('content')
+        batch_op.create_index('ix_markdown_caches_workspace_source_path', ['workspace_id', 'source_path'], unique=True)
+        batch_op.create_index('ix_markdown_caches_hash', ['hash'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('markdown_caches', schema=None) as batch_op:
+        batch_op.drop_index('ix_markdown_caches_hash')
+        batch_op.drop_index('ix_markdown_caches_workspace_source_path')
+        batch_op.add_column(sa.Column('content', sa.String(), server_default='', nullable=False))
+        batch_op.drop_column('source_stat')
+
+    op.execute(
+        "UPDATE markdown_caches SET content = "
+        "(SELECT content FROM markdown_contents WHERE markdown_contents.hash = markdown_caches.hash) "
+        "WHERE hash IN (SELECT hash FROM markdown_contents)"
+    )
+    op.drop_table('markdown_contents')
@@ -0,0 +1,33 @@
+"""Track the size and last use of the markdown contents.
+
+Revision ID: d2f8b6a41c97
+Revises: c47a9e2f5b13
+Create Date: 2026-05-30 10:27:05.118437
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f8b6a41c97'
+down_revision: Union[str, Sequence[str], None] = 'c47a9e2f5b13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('markdown_contents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('size', sa.Integer(), server_default='0', nullable=False))
+        batch_op.add_column(sa.Column('last_used_at', sa.Integer(), server_default='0', nullable=False))
+    op.execute("UPDATE markdown_contents SET size = length(content), last_used_at = CAST(strftime('%s', 'now') AS INTEGER)")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('markdown_contents', schema=None) as batch_op:
+        batch_op.drop_column('last_used_at')
+        batch_op.drop_column('size')
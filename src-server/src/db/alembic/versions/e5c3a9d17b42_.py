@@ -0,0 +1,46 @@
+"""Persist the tool call audit verdicts and add the workspace tool call rules.
+
+Revision ID: e5c3a9d17b42
+Revises: d2f8b6a41c97
+Create Date: 2026-06-02 14:36:21.604917
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5c3a9d17b42'
+down_revision: Union[str, Sequence[str], None] = 'd2f8b6a41c97'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('tool_call_verdicts',
+    sa.Column('fingerprint', sa.String(), nullable=False),
+    sa.Column('tool_name', sa.String(), nullable=False),
+    sa.Column('risk_level', sa.Integer(), nullable=False),
+    sa.Column('reason', sa.String(), nullable=False),
+    sa.Column('created_at', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('fingerprint')
+    )
+    with op.batch_alter_table('tool_call_verdicts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_tool_call_verdicts_created_at'), ['created_at'], unique=False)
+
+    with op.batch_alter_table('workspaces', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('tool_call_rules', sa.JSON(), server_default='[]', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('workspaces', schema=None) as batch_op:
+        batch_op.drop_column('tool_call_rules')
+
+    with op.batch_alter_table('tool_call_verdicts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_tool_call_verdicts_created_at'))
+
+    op.drop_table('tool_call_verdicts')
@@ -11,18 +11,20 @@ relationship = partial(_relationship, lazy="raise")
 from .provider import Provider, LlmModel
 from .agent import Agent
 from .workspace import Workspace, WorkspaceNote
-from .tasks import Task, TaskResource, Subtask, Schedule, RunRecord
+from .tasks import Task, TaskResource, TaskMessage, Subtask, Schedule, RunRecord
 from .toolset import Toolset, Tool
 from .skill import Skill
-from .markdown_cache import MarkdownCache
+from .markdown_cache import MarkdownCache, MarkdownContent
+from .tool_call_verdict import ToolCallVerdict
 
 __all__ = [
     "Base",
     "Provider", "LlmModel",
     "Agent",
     "Workspace", "WorkspaceNote",
-    "Task", "TaskResource", "Subtask", "Schedule", "RunRecord",
+    "Task", "TaskResource", "TaskMessage", "Subtask", "Schedule", "RunRecord",
     "Toolset", "Tool",
     "Skill",
-    "MarkdownCache",
+    "MarkdownCache", "MarkdownContent",
+    "ToolCallVerdict",
 ]
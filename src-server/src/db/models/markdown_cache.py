@@ -1,17 +1,38 @@
-from sqlalchemy import ForeignKey
+import time
+from sqlalchemy import ForeignKey, Index
 from sqlalchemy.orm import Mapped, mapped_column
 from . import Base
 
 
+class MarkdownContent(Base):
+    """
+    The converted markdown, addressed by the hash of the source file,
+    so that identical documents share one conversion.
+    """
+    __tablename__ = "markdown_contents"
+    hash: Mapped[str] = mapped_column(primary_key=True)
+    content: Mapped[str]
+
+    # the length of the content, the least recently used contents are evicted
+    # once the total size exceeds the cache limit
+    size: Mapped[int] = mapped_column(default=0)
+    last_used_at: Mapped[int] = mapped_column(default=lambda: int(time.time()))
+
+
 class MarkdownCache(Base):
     __tablename__ = "markdown_caches"
+    __table_args__ = (
+        Index("ix_markdown_caches_workspace_source_path", "workspace_id", "source_path", unique=True),
+        Index("ix_markdown_caches_hash", "hash"),
+    )
     id: Mapped[int] = mapped_column(primary_key=True)
     hash: Mapped[str]
 
-    # the converted markdown content
-    content: Mapped[str]
-
     # the path of source file, should be posix relative path
     source_path: Mapped[str]
 
+    # "{size}:{mtime_ns}:{inode}" of the source file when it was hashed,
+    # the hash is reused while the file keeps the same stat
+    source_stat: Mapped[str | None] = mapped_column(default=None)
+
     workspace_id: Mapped[int] = mapped_column(ForeignKey("workspaces.id", ondelete="CASCADE"))
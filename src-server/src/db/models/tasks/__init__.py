@@ -1,5 +1,6 @@
 from .resource import TaskResource
+from .message import TaskMessage
 from .task import Task
 from .subtask import Subtask
 from .schedule import Schedule, RunRecord
-from .shared import TaskResourceOwnerType, TaskUsage
+from .shared import TaskResourceOwnerType, TaskUsage, ContextCompaction
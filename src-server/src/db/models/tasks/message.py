@@ -0,0 +1,63 @@
+from typing import Protocol
+from dais_sdk.types import Message
+from sqlalchemy import Index, and_
+from sqlalchemy.orm import Mapped, declared_attr, foreign, mapped_column
+from .shared import TaskResourceOwnerType, message_adapter
+from .. import Base, relationship
+from ..utils import PydanticJSON
+
+
+class TaskMessage(Base):
+    """
+    One row per message of a task conversation, so that persisting a conversation
+    only touches the messages that actually changed.
+    """
+    __tablename__ = "task_messages"
+    __table_args__ = (
+        Index("ix_task_messages_owner_position", "owner_type", "owner_id", "position", unique=True),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True)
+    position: Mapped[int]
+    message: Mapped[Message] = mapped_column(PydanticJSON(message_adapter))
+
+    owner_type: Mapped[TaskResourceOwnerType]
+    owner_id: Mapped[int]
+
+
+class _DbTable(Protocol):
+    __tablename__: str
+    id: Mapped[int]
+
+class HasMessages:
+    @declared_attr
+    def message_entries(cls: type[_DbTable]) -> Mapped[list[TaskMessage]]:
+        owner_type_val = cls.__tablename__
+        return relationship(
+            "TaskMessage",
+            primaryjoin=and_(
+                TaskMessage.owner_type == owner_type_val,
+                foreign(TaskMessage.owner_id) == cls.id,
+            ),
+            foreign_keys=[TaskMessage.owner_id],
+            order_by=TaskMessage.position,
+            cascade="all, delete-orphan",
+            overlaps="message_entries",
+            single_parent=True,
+        )
+
+    @property
+    def messages(self) -> list[Message]:
+        return [entry.message for entry in self.message_entries]
+
+    @messages.setter
+    def messages(self, messages: list[Message]):
+        """
+        Only intended for transient entities, persisted conversations should be
+        written through TaskMessageRepository.
+        """
+        owner_type = TaskResourceOwnerType(getattr(self, "__tablename__"))
+        self.message_entries = [
+            TaskMessage(owner_type=owner_type, position=position, message=message)
+            for position, message in enumerate(messages)
+        ]
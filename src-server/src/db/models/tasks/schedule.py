@@ -1,12 +1,12 @@
 import time
 from typing import TYPE_CHECKING, Annotated, Literal
-from dais_sdk.types import Message
 from pydantic import BaseModel, Field, TypeAdapter
 from sqlalchemy import ForeignKey
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column
 from .resource import HasResources
-from .shared import TaskUsage, messages_adapter
+from .message import HasMessages
+from .shared import ContextCompaction, TaskUsage
 from .. import Base, relationship
 from ..utils import DataClassJSON, PydanticJSON
 
@@ -34,12 +34,12 @@ ScheduleConfig = Annotated[
 
 schedule_config_adapter = TypeAdapter(ScheduleConfig)
 
-class RunRecord(HasResources, Base):
+class RunRecord(HasResources, HasMessages, Base):
     __tablename__ = "run_records"
     id: Mapped[int] = mapped_column(primary_key=True)
     run_at: Mapped[int] = mapped_column(default=lambda: int(time.time()))
     usage: Mapped[TaskUsage] = mapped_column(DataClassJSON(TaskUsage), default=TaskUsage.default)
-    messages: Mapped[list[Message]] = mapped_column(PydanticJSON(messages_adapter), default=list)
+    compaction: Mapped[ContextCompaction | None] = mapped_column(DataClassJSON(ContextCompaction), default=None)
 
     schedule_id: Mapped[int] = mapped_column(ForeignKey("schedules.id", ondelete="CASCADE"))
     schedule: Mapped[Schedule] = relationship(back_populates="run_records", foreign_keys=[schedule_id])
@@ -5,11 +5,12 @@ from dais_sdk.types import Message
 from pydantic import TypeAdapter
 
 
-messages_adapter = TypeAdapter(list[Message])
+message_adapter = TypeAdapter(Message)
 
 class TaskResourceOwnerType(StrEnum):
     """
-    The values in this enum are corresponding to the task table names
+    The values in this enum are corresponding to the task table names,
+    used as the owner discriminator of both task resources and task messages
     """
     TASK = "tasks"
     SUBTASK = "subtasks"
@@ -32,3 +33,17 @@ class TaskUsage:
             total_tokens=0,
             max_tokens=0,
         )
+
+@dataclass
+class ContextCompaction:
+    """
+    Replaces the leading messages of a conversation with a summary when building
+    the LLM requests, the full history stays in the task messages.
+    """
+    # number of the leading messages covered by the summary
+    boundary: int
+    # id of the last covered message, used to detect that the history has been rewritten
+    last_message_id: str
+    summary: str
+    # large tool results before this position are elided from the requests
+    elide_before: int = 0
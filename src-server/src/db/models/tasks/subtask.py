@@ -1,22 +1,22 @@
 from typing import TYPE_CHECKING
-from dais_sdk.types import Message
 from sqlalchemy import ForeignKey
 from sqlalchemy.orm import Mapped, mapped_column
-from .shared import messages_adapter, TaskUsage
+from .shared import ContextCompaction, TaskUsage
 from .resource import HasResources
+from .message import HasMessages
 from .. import Base, relationship
-from ..utils import DataClassJSON, PydanticJSON
+from ..utils import DataClassJSON
 
 if TYPE_CHECKING:
     from .task import Task
     from ..agent import Agent
 
 
-class Subtask(HasResources, Base):
+class Subtask(HasResources, HasMessages, Base):
     __tablename__ = "subtasks"
     id: Mapped[int] = mapped_column(primary_key=True)
     usage: Mapped[TaskUsage] = mapped_column(DataClassJSON(TaskUsage), default=TaskUsage.default)
-    messages: Mapped[list[Message]] = mapped_column(PydanticJSON(messages_adapter), default=list)
+    compaction: Mapped[ContextCompaction | None] = mapped_column(DataClassJSON(ContextCompaction), default=None)
 
     task_id: Mapped[int] = mapped_column(ForeignKey("tasks.id", ondelete="CASCADE"))
     task: Mapped[Task] = relationship(foreign_keys=[task_id], viewonly=True)
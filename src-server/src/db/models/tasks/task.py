@@ -1,25 +1,25 @@
 import time
 from typing import TYPE_CHECKING
-from dais_sdk.types import Message
 from sqlalchemy import ForeignKey
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, mapped_column
-from .shared import messages_adapter, TaskUsage
+from .shared import ContextCompaction, TaskUsage
 from .resource import HasResources
+from .message import HasMessages
 from .. import Base, relationship
-from ..utils import DataClassJSON, PydanticJSON
+from ..utils import DataClassJSON
 
 if TYPE_CHECKING:
     from ..agent import Agent
     from ..workspace import Workspace
 
 
-class Task(HasResources, Base):
+class Task(HasResources, HasMessages, Base):
     __tablename__ = "tasks"
     id: Mapped[int] = mapped_column(primary_key=True)
     title: Mapped[str]
     usage: Mapped[TaskUsage] = mapped_column(DataClassJSON(TaskUsage), default=TaskUsage.default)
-    messages: Mapped[list[Message]] = mapped_column(PydanticJSON(messages_adapter), default=list)
+    compaction: Mapped[ContextCompaction | None] = mapped_column(DataClassJSON(ContextCompaction), default=None)
     last_run_at: Mapped[int] = mapped_column(default=lambda: int(time.time()))
 
     agent_id: Mapped[int | None] = mapped_column(ForeignKey("agents.id", ondelete="SET NULL"))
@@ -0,0 +1,18 @@
+import time
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column
+from . import Base
+
+
+class ToolCallVerdict(Base):
+    """
+    The safety audit verdict of a tool call in a workspace,
+    keyed by the fingerprint of its workspace, tool name and arguments.
+    """
+    __tablename__ = "tool_call_verdicts"
+    workspace_id: Mapped[int] = mapped_column(ForeignKey("workspaces.id", ondelete="CASCADE"), primary_key=True)
+    fingerprint: Mapped[str] = mapped_column(primary_key=True)
+    tool_name: Mapped[str]
+    risk_level: Mapped[int]
+    reason: Mapped[str]
+    created_at: Mapped[int] = mapped_column(default=lambda: int(time.time()), index=True)
@@ -5,6 +5,7 @@ from sqlalchemy.types import TypeDecorator
 
 class PydanticJSON(TypeDecorator):
     impl = JSON
+    cache_ok = True
 
     def __init__(self, adapter: TypeAdapter):
         super().__init__()
@@ -1,5 +1,5 @@
 from typing import TYPE_CHECKING
-from sqlalchemy import ForeignKey, select
+from sqlalchemy import JSON, ForeignKey, select
 from sqlalchemy.orm import Mapped, mapped_column
 from sqlalchemy.ext.asyncio import AsyncSession
 from . import Base, relationship
@@ -28,6 +28,8 @@ class Workspace(Base):
     directory: Mapped[str]
 
     instruction: Mapped[str]
+    # the ToolCallRule list that settles the approval of matching tool calls without the safety audit
+    tool_call_rules: Mapped[list[dict]] = mapped_column(JSON, default=list)
     notes: Mapped[list[WorkspaceNote]] = relationship(foreign_keys=[WorkspaceNote._workspace_id], cascade="all, delete-orphan")
 
     usable_agents: Mapped[list[Agent]] = relationship(secondary=workspace_agent_association_table)
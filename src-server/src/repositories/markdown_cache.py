@@ -1,4 +1,6 @@
-from sqlalchemy import delete
+import time
+
+from sqlalchemy import delete, func, update
 from sqlalchemy import select
 
 from src.db.models import markdown_cache as markdown_cache_models
@@ -7,41 +9,36 @@ from .repository_base import RepositoryBase
 
 
 class MarkdownCacheRepository(RepositoryBase[markdown_cache_models.MarkdownCache]):
-    async def get(self,
-                  *,
-                  workspace_id: int,
-                  hash_value: str,
-                  source_path: str) -> markdown_cache_models.MarkdownCache | None:
+    async def get_entry(self,
+                        *,
+                        workspace_id: int,
+                        source_path: str) -> markdown_cache_models.MarkdownCache | None:
         return await self._db_session.scalar(
             select(markdown_cache_models.MarkdownCache).where(
                 markdown_cache_models.MarkdownCache.workspace_id == workspace_id,
-                markdown_cache_models.MarkdownCache.hash == hash_value,
                 markdown_cache_models.MarkdownCache.source_path == source_path,
             )
         )
 
-    async def set(self,
-                  *,
-                  workspace_id: int,
-                  hash_value: str,
-                  source_path: str,
-                  content: str):
-        cache = await self.get(
-            workspace_id=workspace_id,
-            hash_value=hash_value,
-            source_path=source_path,
-        )
-        if cache is None:
+    async def set_entry(self,
+                        *,
+                        workspace_id: int,
+                        source_path: str,
+                        hash_value: str,
+                        source_stat: str | None):
+        entry = await self.get_entry(workspace_id=workspace_id, source_path=source_path)
+        if entry is None:
             self._db_session.add(
                 markdown_cache_models.MarkdownCache(
                     hash=hash_value,
-                    content=content,
                     source_path=source_path,
+                    source_stat=source_stat,
                     workspace_id=workspace_id,
                 )
             )
         else:
-            cache.content = content
+            entry.hash = hash_value
+            entry.source_stat = source_stat
         await self._db_session.flush()
 
     async def get_entries(self, workspace_id: int) -> list[tuple[int, str]]:
@@ -63,3 +60,72 @@ class MarkdownCacheRepository(RepositoryBase[markdown_cache_models.MarkdownCache
                 )
             )
         await self._db_session.flush()
+
+
+class MarkdownContentRepository(RepositoryBase[markdown_cache_models.MarkdownContent]):
+    async def get_content(self, hash_value: str) -> tuple[str, int] | None:
+        """The content and the time of its last recorded use."""
+        row = (await self._db_session.execute(
+            select(
+                markdown_cache_models.MarkdownContent.content,
+                markdown_cache_models.MarkdownContent.last_used_at,
+            ).where(
+                markdown_cache_models.MarkdownContent.hash == hash_value
+            )
+        )).tuples().first()
+        return row
+
+    async def touch(self, hash_value: str, used_at: int):
+        await self._db_session.execute(
+            update(markdown_cache_models.MarkdownContent)
+            .where(markdown_cache_models.MarkdownContent.hash == hash_value)
+            .values(last_used_at=used_at)
+        )
+        await self._db_session.flush()
+
+    async def set_content(self, *, hash_value: str, content: str):
+        cached = await self._db_session.get(markdown_cache_models.MarkdownContent, hash_value)
+        if cached is None:
+            self._db_session.add(markdown_cache_models.MarkdownContent(
+                hash=hash_value,
+                content=content,
+                size=len(content),
+            ))
+        else:
+            cached.content = content
+            cached.size = len(content)
+            cached.last_used_at = int(time.time())
+        await self._db_session.flush()
+
+    async def get_total_size(self) -> int:
+        total = await self._db_session.scalar(
+            select(func.coalesce(func.sum(markdown_cache_models.MarkdownContent.size), 0))
+        )
+        return total or 0
+
+    async def evict(self, max_total_size: int) -> int:
+        """
+        Delete the least recently used contents until the total size fits in `max_total_size`.
+        Returns the number of deleted contents.
+        """
+        rows = (await self._db_session.execute(
+            select(
+                markdown_cache_models.MarkdownContent.hash,
+                markdown_cache_models.MarkdownContent.size,
+            ).order_by(markdown_cache_models.MarkdownContent.last_used_at.desc())
+        )).tuples()
+
+        kept_size = 0
+        to_delete: list[str] = []
+        for hash_value, size in rows:
+            kept_size += size
+            if kept_size > max_total_size:
+                to_delete.append(hash_value)
+        if to_delete:
+            await self._db_session.execute(
+                delete(markdown_cache_models.MarkdownContent).where(
+                    markdown_cache_models.MarkdownContent.hash.in_(to_delete)
+                )
+            )
+        await self._db_session.flush()
+        return len(to_delete)
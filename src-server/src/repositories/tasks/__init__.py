@@ -1,3 +1,4 @@
+from .message import TaskMessageRepository
 from .resource import TaskResourceRepository
 from .schedule import ScheduleRepository, RunRecordRepository
 from .subtask import SubtaskRepository
@@ -8,6 +9,7 @@ __all__ = [
     "RunRecordRepository",
     "ScheduleRepository",
     "SubtaskRepository",
+    "TaskMessageRepository",
     "TaskRepository",
     "TaskResourceRepository",
 ]
@@ -0,0 +1,115 @@
+from collections.abc import Iterable
+
+from dais_sdk.types import Message
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+
+from src.db.models import tasks as task_models
+
+from ..repository_base import RepositoryBase
+
+
+class TaskMessageRepository(RepositoryBase[task_models.TaskMessage]):
+    async def get_all(
+        self,
+        owner_type: task_models.TaskResourceOwnerType,
+        owner_id: int,
+    ) -> list[Message]:
+        messages = await self._db_session.scalars(
+            select(task_models.TaskMessage.message)
+            .where(
+                task_models.TaskMessage.owner_type == owner_type,
+                task_models.TaskMessage.owner_id == owner_id,
+            )
+            .order_by(task_models.TaskMessage.position)
+        )
+        return list(messages.all())
+
+    async def upsert(
+        self,
+        owner_type: task_models.TaskResourceOwnerType,
+        owner_id: int,
+        messages: Iterable[tuple[int, Message]],
+    ):
+        """
+        Insert or overwrite the messages at the given positions.
+        """
+        rows = [
+            {
+                "owner_type": owner_type,
+                "owner_id": owner_id,
+                "position": position,
+                "message": message,
+            }
+            for position, message in messages
+        ]
+        if len(rows) == 0: return
+
+        stmt = insert(task_models.TaskMessage)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["owner_type", "owner_id", "position"],
+            set_={"message": stmt.excluded.message},
+        )
+        await self._db_session.execute(stmt, rows)
+        await self._db_session.flush()
+
+    async def truncate(
+        self,
+        owner_type: task_models.TaskResourceOwnerType,
+        owner_id: int,
+        length: int,
+    ):
+        """
+        Delete the messages whose position is not less than `length`.
+        """
+        await self._db_session.execute(
+            delete(task_models.TaskMessage).where(
+                task_models.TaskMessage.owner_type == owner_type,
+                task_models.TaskMessage.owner_id == owner_id,
+                task_models.TaskMessage.position >= length,
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        await self._db_session.flush()
+
+    async def replace_all(
+        self,
+        owner_type: task_models.TaskResourceOwnerType,
+        owner_id: int,
+        messages: list[Message],
+    ):
+        await self.truncate(owner_type, owner_id, len(messages))
+        await self.upsert(owner_type, owner_id, enumerate(messages))
+
+    async def delete_by_owners(
+        self,
+        owner_type: task_models.TaskResourceOwnerType,
+        owner_ids: list[int],
+    ):
+        if owner_ids:
+            await self._db_session.execute(
+                delete(task_models.TaskMessage).where(
+                    task_models.TaskMessage.owner_type == owner_type,
+                    task_models.TaskMessage.owner_id.in_(owner_ids),
+                )
+            )
+        await self._db_session.flush()
+
+    async def delete_orphans(self):
+        """
+        Delete the messages whose owner no longer exists,
+        e.g. subtasks removed by the database-level cascade of their parent task.
+        """
+        owner_tables = (
+            (task_models.TaskResourceOwnerType.TASK, task_models.Task),
+            (task_models.TaskResourceOwnerType.SUBTASK, task_models.Subtask),
+            (task_models.TaskResourceOwnerType.RUN_RECORD, task_models.RunRecord),
+        )
+        for owner_type, owner_table in owner_tables:
+            await self._db_session.execute(
+                delete(task_models.TaskMessage).where(
+                    task_models.TaskMessage.owner_type == owner_type,
+                    task_models.TaskMessage.owner_id.not_in(select(owner_table.id)),
+                )
+            )
+        await self._db_session.flush()
@@ -1,12 +1,14 @@
 from dais_sdk.types import UserMessage
 from fastapi_pagination.ext.sqlalchemy import apaginate
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from src.db.models import tasks as task_models
 from src.db.models import workspace as workspace_models
 from src.schemas.tasks import schedule as schedule_schemas
 
+from .message import TaskMessageRepository
 from ..repository_base import RepositoryBase
 
 
@@ -78,9 +80,16 @@ class ScheduleRepository(RepositoryBase[task_models.Schedule]):
 
 
 class RunRecordRepository(RepositoryBase[task_models.RunRecord]):
+    def __init__(self, db_session: AsyncSession):
+        super().__init__(db_session)
+        self._message_repository = TaskMessageRepository(db_session)
+
     @staticmethod
     def relations():
-        return [selectinload(task_models.RunRecord.schedule)]
+        return [
+            selectinload(task_models.RunRecord.schedule),
+            selectinload(task_models.RunRecord.message_entries),
+        ]
 
     async def get_page(self, schedule_id: int):
         stmt = (
@@ -141,13 +150,33 @@ class RunRecordRepository(RepositoryBase[task_models.RunRecord]):
         data: schedule_schemas.RunRecordUpdate,
     ) -> task_models.RunRecord:
         if data.messages is not None:
-            record.messages = data.messages
+            await self._message_repository.replace_all(
+                task_models.TaskResourceOwnerType.RUN_RECORD,
+                record.id,
+                data.messages,
+            )
         self.apply_fields(record, data, exclude={"messages"})
         record_id = await self.flush_and_expunge(record)
         updated = await self.get_by_id(record_id)
         assert updated is not None
         return updated
 
+    async def update_usage(self,
+                           record_id: int,
+                           usage: task_models.TaskUsage,
+                           compaction: task_models.ContextCompaction | None) -> bool:
+        """
+        Update the runtime state without loading the conversation.
+        Returns False if the run record does not exist.
+        """
+        result = await self._db_session.execute(
+            update(task_models.RunRecord)
+            .where(task_models.RunRecord.id == record_id)
+            .values(usage=usage, compaction=compaction)
+        )
+        await self._db_session.flush()
+        return result.rowcount > 0
+
     async def delete(self, record: task_models.RunRecord):
         await self._db_session.delete(record)
         await self._db_session.flush()
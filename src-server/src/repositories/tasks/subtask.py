@@ -1,18 +1,26 @@
 from dais_sdk.types import UserMessage
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from src.db.models import tasks as task_models
 from src.schemas.tasks import subtask as subtask_schemas
 
+from .message import TaskMessageRepository
 from ..repository_base import RepositoryBase
 
 
 class SubtaskRepository(RepositoryBase[task_models.Subtask]):
+    def __init__(self, db_session: AsyncSession):
+        super().__init__(db_session)
+        self._message_repository = TaskMessageRepository(db_session)
+
     @staticmethod
     def relations():
         return [
             selectinload(task_models.Subtask.task),
             selectinload(task_models.Subtask.agent),
+            selectinload(task_models.Subtask.message_entries),
         ]
 
     async def get_by_id(self, subtask_id: int) -> task_models.Subtask | None:
@@ -42,9 +50,29 @@ class SubtaskRepository(RepositoryBase[task_models.Subtask]):
         data: subtask_schemas.SubtaskUpdate,
     ) -> task_models.Subtask:
         if data.messages is not None:
-            subtask.messages = data.messages
+            await self._message_repository.replace_all(
+                task_models.TaskResourceOwnerType.SUBTASK,
+                subtask.id,
+                data.messages,
+            )
         self.apply_fields(subtask, data, exclude={"messages"})
         subtask_id = await self.flush_and_expunge(subtask)
         updated = await self.get_by_id(subtask_id)
         assert updated is not None
         return updated
+
+    async def update_usage(self,
+                           subtask_id: int,
+                           usage: task_models.TaskUsage,
+                           compaction: task_models.ContextCompaction | None) -> bool:
+        """
+        Update the runtime state without loading the conversation.
+        Returns False if the subtask does not exist.
+        """
+        result = await self._db_session.execute(
+            update(task_models.Subtask)
+            .where(task_models.Subtask.id == subtask_id)
+            .values(usage=usage, compaction=compaction)
+        )
+        await self._db_session.flush()
+        return result.rowcount > 0
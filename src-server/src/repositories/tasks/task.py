@@ -1,20 +1,27 @@
 from fastapi_pagination.ext.sqlalchemy import apaginate
-from sqlalchemy import select
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
 from src.db.models import agent as agent_models
 from src.db.models import tasks as task_models
 from src.schemas.tasks import task as task_schemas
 
+from .message import TaskMessageRepository
 from ..repository_base import RepositoryBase
 
 
 class TaskRepository(RepositoryBase[task_models.Task]):
+    def __init__(self, db_session: AsyncSession):
+        super().__init__(db_session)
+        self._message_repository = TaskMessageRepository(db_session)
+
     @staticmethod
     def relations():
         return [
             selectinload(task_models.Task.agent),
             selectinload(task_models.Task.workspace),
+            selectinload(task_models.Task.message_entries),
         ]
 
     def get_query(self, workspace_id: int, query: str | None = None):
@@ -69,16 +76,39 @@ class TaskRepository(RepositoryBase[task_models.Task]):
         data: task_schemas.TaskUpdate,
     ) -> task_models.Task:
         if data.messages is not None:
-            task.messages = data.messages
+            await self._message_repository.replace_all(
+                task_models.TaskResourceOwnerType.TASK,
+                task.id,
+                data.messages,
+            )
         self.apply_fields(task, data, exclude={"messages"})
         task_id = await self.flush_and_expunge(task)
         updated = await self.get_by_id(task_id)
         assert updated is not None
         return updated
 
+    async def update_usage(self,
+                           task_id: int,
+                           usage: task_models.TaskUsage,
+                           compaction: task_models.ContextCompaction | None,
+                           last_run_at: int) -> bool:
+        """
+        Update the runtime state without loading the conversation.
+        Returns False if the task does not exist.
+        """
+        result = await self._db_session.execute(
+            update(task_models.Task)
+            .where(task_models.Task.id == task_id)
+            .values(usage=usage, compaction=compaction, last_run_at=last_run_at)
+        )
+        await self._db_session.flush()
+        return result.rowcount > 0
+
     async def delete(self, task: task_models.Task):
         await self._db_session.delete(task)
         await self._db_session.flush()
+        # subtasks are removed by the database-level cascade
+        await self._message_repository.delete_orphans()
 
     async def get_ids_before(self, cutoff: int) -> list[int]:
         ids = await self._db_session.scalars(
@@ -0,0 +1,43 @@
+from sqlalchemy import delete
+
+from src.db.models import tool_call_verdict as tool_call_verdict_models
+
+from .repository_base import RepositoryBase
+
+
+class ToolCallVerdictRepository(RepositoryBase[tool_call_verdict_models.ToolCallVerdict]):
+    async def get_by_fingerprint(self, workspace_id: int, fingerprint: str) -> tool_call_verdict_models.ToolCallVerdict | None:
+        return await self._db_session.get(tool_call_verdict_models.ToolCallVerdict, (workspace_id, fingerprint))
+
+    async def set_verdict(self,
+                          *,
+                          workspace_id: int,
+                          fingerprint: str,
+                          tool_name: str,
+                          risk_level: int,
+                          reason: str,
+                          created_at: int):
+        verdict = await self.get_by_fingerprint(workspace_id, fingerprint)
+        if verdict is None:
+            self._db_session.add(tool_call_verdict_models.ToolCallVerdict(
+                workspace_id=workspace_id,
+                fingerprint=fingerprint,
+                tool_name=tool_name,
+                risk_level=risk_level,
+                reason=reason,
+                created_at=created_at,
+            ))
+        else:
+            verdict.risk_level = risk_level
+            verdict.reason = reason
+            verdict.created_at = created_at
+        await self._db_session.flush()
+
+    async def delete_created_before(self, cutoff: int) -> int:
+        result = await self._db_session.execute(
+            delete(tool_call_verdict_models.ToolCallVerdict).where(
+                tool_call_verdict_models.ToolCallVerdict.created_at < cutoff
+            )
+        )
+        await self._db_session.flush()
+        return result.rowcount
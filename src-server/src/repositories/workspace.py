@@ -12,6 +12,7 @@ from src.db.models import workspace as workspace_models
 from src.schemas import workspace as workspace_schemas
 
 from .repository_base import RepositoryBase
+from .tasks.message import TaskMessageRepository
 
 
 class WorkspaceRepository(RepositoryBase[workspace_models.Workspace]):
@@ -198,6 +199,8 @@ class WorkspaceRepository(RepositoryBase[workspace_models.Workspace]):
     async def delete(self, workspace: workspace_models.Workspace):
         await self._db_session.delete(workspace)
         await self._db_session.flush()
+        # tasks and schedules are removed by the database-level cascade
+        await TaskMessageRepository(self._db_session).delete_orphans()
 
     @staticmethod
     def _create_notes(notes: list[workspace_schemas.WorkspaceNoteBase]) -> list[workspace_models.WorkspaceNote]:
@@ -23,6 +23,10 @@ class TaskRuntimeContext(DTOBase):
     agent_id: int | None
     workspace_id: int
     messages: list[Message]
+    compaction: task_models.ContextCompaction | None = None
+    # set while the task is running, the id of the run event that the messages are up to,
+    # so that a client can attach to the run after it
+    last_event_id: int | None = None
 
     @classmethod
     def from_task(cls, task: task_models.Task) -> Self:
@@ -33,6 +37,7 @@ class TaskRuntimeContext(DTOBase):
             agent_id=task.agent_id,
             workspace_id=task.workspace_id,
             messages=task.messages,
+            compaction=task.compaction,
         )
 
     @classmethod
@@ -44,6 +49,7 @@ class TaskRuntimeContext(DTOBase):
             agent_id=subtask.agent_id,
             workspace_id=subtask.task.workspace_id,
             messages=subtask.messages,
+            compaction=subtask.compaction,
         )
 
     @classmethod
@@ -55,4 +61,5 @@ class TaskRuntimeContext(DTOBase):
             agent_id=record.schedule.agent_id,
             workspace_id=record.schedule.workspace_id,
             messages=record.messages,
+            compaction=record.compaction,
         )
@@ -1,3 +1,9 @@
+import re
+from fnmatch import fnmatchcase
+from typing import Any, Literal
+
+from pydantic import field_validator
+
 from . import DTOBase
 from .agent import AgentBrief
 from .toolset import ToolRead
@@ -11,6 +17,35 @@ class WorkspaceNoteBase(DTOBase):
 class WorkspaceNoteRead(WorkspaceNoteBase):
     id: int
 
+class ToolCallRule(DTOBase):
+    # fnmatch pattern of the tool name, matched with and without the toolset prefix
+    tool: str
+    # regular expressions searched in the arguments, by argument name
+    arguments: dict[str, str] = {}
+    # "allow" approves the call without the safety audit, "deny" always asks the user
+    action: Literal["allow", "deny"]
+
+    @field_validator("arguments")
+    @classmethod
+    def validate_patterns(cls, arguments: dict[str, str]) -> dict[str, str]:
+        for pattern in arguments.values():
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid pattern {pattern!r}: {e}")
+        return arguments
+
+    def matches(self, tool_name: str, arguments: dict[str, Any]) -> bool:
+        short_name = tool_name.rsplit("__", 1)[-1]
+        if not (fnmatchcase(tool_name, self.tool) or fnmatchcase(short_name, self.tool)):
+            return False
+        for name, pattern in self.arguments.items():
+            if name not in arguments: return False
+            value = arguments[name]
+            if re.search(pattern, value if isinstance(value, str) else str(value)) is None:
+                return False
+        return True
+
 class WorkspaceBase(DTOBase):
     name: str
     directory: str
@@ -21,6 +56,7 @@ class WorkspaceBrief(WorkspaceBase):
 class WorkspaceRead(WorkspaceBase):
     id: int
     instruction: str
+    tool_call_rules: list[ToolCallRule] = []
     notes: list[WorkspaceNoteRead]
     usable_agents: list[AgentBrief]
     usable_tools: list[ToolRead]
@@ -28,6 +64,7 @@ class WorkspaceRead(WorkspaceBase):
 
 class WorkspaceCreate(WorkspaceBase):
     instruction: str
+    tool_call_rules: list[ToolCallRule] = []
     notes: list[WorkspaceNoteBase]
     usable_agent_ids: list[int]
     usable_tool_ids: list[int]
@@ -37,6 +74,7 @@ class WorkspaceUpdate(DTOBase):
     name: str | None
     directory: str | None
     instruction: str | None
+    tool_call_rules: list[ToolCallRule] | None = None
     usable_agent_ids: list[int] | None
     usable_tool_ids: list[int] | None
     usable_skill_ids: list[int] | None = None
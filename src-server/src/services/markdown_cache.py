@@ -1,23 +1,120 @@
 import asyncio
 import hashlib
+import os
+import time
+from dataclasses import dataclass, replace
 from os import PathLike
 
 from anyio import Path
 from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.repositories.markdown_cache import MarkdownCacheRepository
+from src.repositories.markdown_cache import MarkdownCacheRepository, MarkdownContentRepository
+from src.utils.metrics import use_metrics_registry
 
 
 _logger = logger.bind(name="MarkdownCacheService")
 
 
+class MarkdownCacheStats:
+    def __init__(self):
+        registry = use_metrics_registry()
+        self.lookups = registry.counter(
+            "dais_markdown_cache_lookups_total",
+            "Lookups of converted markdown, by source kind and hit or miss.",
+            ("source", "result"))
+        self.evictions = registry.counter(
+            "dais_markdown_cache_evictions_total",
+            "Converted markdown contents evicted from the cache.",
+            ())
+
+__stats: MarkdownCacheStats | None = None
+
+def use_markdown_cache_stats() -> MarkdownCacheStats:
+    global __stats
+    if __stats is None:
+        __stats = MarkdownCacheStats()
+    return __stats
+
+
+class MarkdownContentService:
+    """
+    The markdown conversions addressed by the SHA-256 of the source bytes, shared by the
+    workspace files and the task resources. The least recently used contents are evicted
+    once their total size exceeds `MAX_TOTAL_SIZE` characters.
+    """
+    MAX_TOTAL_SIZE = 256 * 1024 * 1024
+    # the last use of a content is written at most once per interval, it only orders the eviction
+    TOUCH_INTERVAL = 10 * 60
+
+    def __init__(self, repository: MarkdownContentRepository):
+        self._repository = repository
+
+    @classmethod
+    def from_db_session(cls, db_session: AsyncSession) -> MarkdownContentService:
+        return cls(MarkdownContentRepository(db_session))
+
+    async def lookup(self, hash_value: str, source: str = "task_resource") -> tuple[str, bool] | None:
+        """
+        The cached content and whether its recorded last use is due to be touched.
+        Nothing is written, so that a lookup does not take the write lock of the database.
+        """
+        cached = await self._repository.get_content(hash_value)
+        use_markdown_cache_stats().lookups.inc(source=source, result="miss" if cached is None else "hit")
+        if cached is None:
+            return None
+        content, last_used_at = cached
+        return content, last_used_at < time.time() - self.TOUCH_INTERVAL
+
+    async def get(self, hash_value: str, source: str = "task_resource") -> str | None:
+        looked_up = await self.lookup(hash_value, source)
+        return None if looked_up is None else looked_up[0]
+
+    async def touch(self, hash_value: str):
+        await self._repository.touch(hash_value, int(time.time()))
+
+    async def set(self, hash_value: str, content: str):
+        await self._repository.set_content(hash_value=hash_value, content=content)
+        if await self._repository.get_total_size() <= self.MAX_TOTAL_SIZE:
+            return
+        evicted = await self._repository.evict(self.MAX_TOTAL_SIZE)
+        use_markdown_cache_stats().evictions.inc(evicted)
+        _logger.info(f"Evicted {evicted} cached markdown contents")
+
+
+@dataclass(frozen=True)
+class MarkdownCacheLookup:
+    """
+    A read-only lookup of a workspace file, what it leaves to be written
+    is recorded afterwards in a short session by `MarkdownCacheService.record`.
+    """
+    source_path: str
+    hash: str
+    # "{size}:{mtime_ns}:{inode}" of the source file when it was looked up
+    source_stat: str
+    content: str | None
+    # the source path has no recorded hash for this stat yet, e.g. a touched file
+    # or a document whose content was converted for another path
+    stat_outdated: bool = False
+    touch_due: bool = False
+
+    @property
+    def needs_record(self) -> bool:
+        return self.content is not None and (self.stat_outdated or self.touch_due)
+
 class MarkdownCacheService:
+    """
+    Caches the markdown conversions of workspace files in the MarkdownContentService.
+    Each source path records the content hash together with the file stat,
+    so that an unchanged file is not hashed again.
+    """
     def __init__(self,
                  repository: MarkdownCacheRepository,
+                 content_service: MarkdownContentService,
                  workspace_id: int,
                  cwd: PathLike):
         self._repository = repository
+        self._content_service = content_service
         self._cwd = Path(cwd)
         self._workspace_id = workspace_id
 
@@ -26,15 +123,46 @@ class MarkdownCacheService:
                         db_session: AsyncSession,
                         workspace_id: int,
                         cwd: PathLike) -> MarkdownCacheService:
-        return cls(MarkdownCacheRepository(db_session), workspace_id, cwd)
+        return cls(MarkdownCacheRepository(db_session),
+                   MarkdownContentService.from_db_session(db_session),
+                   workspace_id,
+                   cwd)
 
-    async def _compute_hash(self, path: Path) -> str | None:
+    @staticmethod
+    def _hash_file(path: PathLike) -> str:
+        # streamed in chunks, so that large documents are not loaded into memory
+        with open(path, "rb") as file:
+            return hashlib.file_digest(file, "sha256").hexdigest()
+
+    @staticmethod
+    def _stat_fingerprint(stat: os.stat_result) -> str:
+        return f"{stat.st_size}:{stat.st_mtime_ns}:{stat.st_ino}"
+
+    async def _resolve_hash(self, path: Path) -> tuple[str, str, bool] | None:
+        """
+        The hash and the stat fingerprint of the source file, and whether they are recorded.
+        The recorded hash is reused while the size, modification time and inode are unchanged.
+        """
         abs_path = self._cwd / path
-        if not await abs_path.exists():
+        try:
+            stat = await abs_path.stat()
+        except (FileNotFoundError, NotADirectoryError):
             return None
-        file_bytes = await abs_path.read_bytes()
-        hash_value = await asyncio.to_thread(hashlib.sha256, file_bytes)
-        return hash_value.hexdigest()
+        fingerprint = self._stat_fingerprint(stat)
+        entry = await self._repository.get_entry(workspace_id=self._workspace_id, source_path=path.as_posix())
+        if entry is not None and entry.source_stat == fingerprint:
+            return entry.hash, fingerprint, True
+
+        hash_value = await asyncio.to_thread(self._hash_file, abs_path)
+        return hash_value, fingerprint, False
+
+    async def _record_hash(self, source_path: str, hash_value: str, source_stat: str):
+        await self._repository.set_entry(
+            workspace_id=self._workspace_id,
+            source_path=source_path,
+            hash_value=hash_value,
+            source_stat=source_stat,
+        )
 
     def _normalize_path(self, path: PathLike) -> Path | None:
         normalized = Path(path)
@@ -45,33 +173,50 @@ class MarkdownCacheService:
         except ValueError:
             return None
 
-    async def get(self, path: PathLike) -> str | None:
+    async def lookup(self, path: PathLike) -> MarkdownCacheLookup | None:
+        # nothing is written, so that the session does not hold the write lock
+        # while the caller converts the document on a miss
         normalized = self._normalize_path(path)
         if normalized is None:
             return None
-        hash_value = await self._compute_hash(normalized)
-        if hash_value is None:
+        resolved = await self._resolve_hash(normalized)
+        if resolved is None:
             return None
-        cache = await self._repository.get(
-            workspace_id=self._workspace_id,
-            hash_value=hash_value,
-            source_path=normalized.as_posix(),
-        )
-        return cache.content if cache is not None else None
+        hash_value, source_stat, recorded = resolved
+        lookup = MarkdownCacheLookup(source_path=normalized.as_posix(),
+                                     hash=hash_value,
+                                     source_stat=source_stat,
+                                     content=None,
+                                     stat_outdated=not recorded)
+        looked_up = await self._content_service.lookup(hash_value, source="workspace_file")
+        if looked_up is None:
+            return lookup
+        content, touch_due = looked_up
+        return replace(lookup, content=content, touch_due=touch_due)
+
+    async def get(self, path: PathLike) -> str | None:
+        lookup = await self.lookup(path)
+        return None if lookup is None else lookup.content
+
+    async def record(self, lookup: MarkdownCacheLookup):
+        """Write down what a cache hit of `lookup` left to record."""
+        if lookup.stat_outdated:
+            # so that the file is not hashed again until it changes
+            await self._record_hash(lookup.source_path, lookup.hash, lookup.source_stat)
+        if lookup.touch_due:
+            await self._content_service.touch(lookup.hash)
 
     async def set(self, path: Path, content: str):
         normalized = self._normalize_path(path)
         if normalized is None:
             return
-        hash_value = await self._compute_hash(normalized)
-        if hash_value is None:
+        resolved = await self._resolve_hash(normalized)
+        if resolved is None:
             return
-        await self._repository.set(
-            workspace_id=self._workspace_id,
-            hash_value=hash_value,
-            source_path=normalized.as_posix(),
-            content=content,
-        )
+        hash_value, source_stat, recorded = resolved
+        if not recorded:
+            await self._record_hash(normalized.as_posix(), hash_value, source_stat)
+        await self._content_service.set(hash_value, content)
 
     async def clear_unused(self):
         to_delete = []
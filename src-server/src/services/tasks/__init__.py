@@ -1,3 +1,4 @@
+from .message import TaskMessageService
 from .resource import TaskResourceService
 from .schedule import RunRecordService, ScheduleService, ScheduleNotFoundError, RunRecordNotFoundError
 from .task import TaskService, TaskNotFoundError
@@ -11,6 +12,7 @@ __all__ = [
     "SubtaskService",
     "SubtaskNotFoundError",
     "TaskService",
+    "TaskMessageService",
     "TaskResourceService",
     "TaskNotFoundError",
 ]
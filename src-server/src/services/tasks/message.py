@@ -0,0 +1,44 @@
+from collections.abc import Iterable
+
+from dais_sdk.types import Message
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.repositories.tasks.message import TaskMessageRepository
+from src.schemas.tasks import runtime as task_runtime_schemas
+
+
+class TaskMessageService:
+    def __init__(self,
+                 repository: TaskMessageRepository,
+                 task_type: task_runtime_schemas.TaskType):
+        self._repository = repository
+        self._task_type = task_type
+
+    @classmethod
+    def from_db_session(cls,
+                        db_session: AsyncSession,
+                        task_type: task_runtime_schemas.TaskType) -> TaskMessageService:
+        return cls(TaskMessageRepository(db_session), task_type)
+
+    async def get_all(self, task_id: int) -> list[Message]:
+        return await self._repository.get_all(
+            self._task_type.to_resource_owner_type(),
+            task_id,
+        )
+
+    async def upsert(self, task_id: int, messages: Iterable[tuple[int, Message]]):
+        """
+        Write the given (position, message) pairs, overwriting the stored ones.
+        """
+        await self._repository.upsert(
+            self._task_type.to_resource_owner_type(),
+            task_id,
+            messages,
+        )
+
+    async def truncate(self, task_id: int, length: int):
+        await self._repository.truncate(
+            self._task_type.to_resource_owner_type(),
+            task_id,
+            length,
+        )
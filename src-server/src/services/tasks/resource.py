@@ -33,15 +33,21 @@ class TaskResourceService:
         await path.mkdir(parents=True, exist_ok=True)
         return path
 
-    async def load_task_resource(self, task_id: int, resource_id: int) -> Path | None:
-        resource = await self._repository.get_by_id_and_owner(
+    async def get_task_resource_path(self, task_id: int, resource: task_models.TaskResource) -> Path:
+        return await self._get_resource_dir(task_id) / resource.filename
+
+    async def get_task_resource(self, task_id: int, resource_id: int) -> task_models.TaskResource | None:
+        return await self._repository.get_by_id_and_owner(
             resource_id,
             self._task_type.to_resource_owner_type(),
             task_id,
         )
+
+    async def load_task_resource(self, task_id: int, resource_id: int) -> Path | None:
+        resource = await self.get_task_resource(task_id, resource_id)
         if resource is None: return None
 
-        resource_path = await self._get_resource_dir(task_id) / resource.filename
+        resource_path = await self.get_task_resource_path(task_id, resource)
         if not await resource_path.exists(): return None
         return resource_path
 
@@ -114,6 +114,13 @@ class RunRecordService:
         record = await self.get_by_id(record_id)
         return await self._repository.update(record, data)
 
+    async def update_usage(self,
+                           record_id: int,
+                           usage: task_models.TaskUsage,
+                           compaction: task_models.ContextCompaction | None):
+        if not await self._repository.update_usage(record_id, usage, compaction):
+            raise RunRecordNotFoundError(record_id)
+
     async def delete(self, record_id: int):
         record = await self.get_by_id(record_id)
         await self._repository.delete(record)
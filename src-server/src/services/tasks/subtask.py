@@ -35,3 +35,10 @@ class SubtaskService:
                              data: subtask_schemas.SubtaskUpdate) -> task_models.Subtask:
         subtask = await self.get_by_id(subtask_id)
         return await self._repository.update(subtask, data)
+
+    async def update_usage(self,
+                           subtask_id: int,
+                           usage: task_models.TaskUsage,
+                           compaction: task_models.ContextCompaction | None):
+        if not await self._repository.update_usage(subtask_id, usage, compaction):
+            raise SubtaskNotFoundError(subtask_id)
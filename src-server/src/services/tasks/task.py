@@ -4,7 +4,7 @@ from loguru import logger
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.agent.prompts import TitleSummarization
-from src.agent.prompts import create_one_turn_llm
+from src.agent.prompts import use_one_turn_llm
 from src.db.models import tasks as task_models
 from src.repositories.tasks.task import TaskRepository
 from src.schemas.tasks import runtime as task_runtime_schemas
@@ -64,6 +64,13 @@ class TaskService:
         task = await self.get_by_id(task_id)
         return await self._repository.update(task, data)
 
+    async def update_usage(self,
+                           task_id: int,
+                           usage: task_models.TaskUsage,
+                           compaction: task_models.ContextCompaction | None):
+        if not await self._repository.update_usage(task_id, usage, compaction, int(time.time())):
+            raise TaskNotFoundError(task_id)
+
     async def summarize_title(self, task_id: int) -> task_models.Task:
         task = await self.get_by_id(task_id)
         settings = use_app_setting_manager().settings
@@ -73,8 +80,8 @@ class TaskService:
                 "Failed to summarize task title",
             )
         try:
-            llm = await create_one_turn_llm(settings.flash_model)
-            title = await TitleSummarization(llm, settings.reply_language)(task.messages)
+            async with use_one_turn_llm(settings.flash_model) as llm:
+                title = await TitleSummarization(llm, settings.reply_language)(task.messages)
             _logger.info(f"Generated title: {title}")
         except Exception as error:
             _logger.exception("Failed to request title summarization")
@@ -0,0 +1,47 @@
+import time
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import tool_call_verdict as tool_call_verdict_models
+from src.repositories.tool_call_verdict import ToolCallVerdictRepository
+
+
+class ToolCallVerdictService:
+    """
+    The persisted safety audit verdicts, so that an identical tool call is not audited
+    again until its verdict is older than `TTL` seconds.
+    """
+    TTL = 7 * 24 * 60 * 60
+
+    def __init__(self, repository: ToolCallVerdictRepository):
+        self._repository = repository
+
+    @classmethod
+    def from_db_session(cls, db_session: AsyncSession) -> ToolCallVerdictService:
+        return cls(ToolCallVerdictRepository(db_session))
+
+    async def get(self, workspace_id: int, fingerprint: str) -> tool_call_verdict_models.ToolCallVerdict | None:
+        verdict = await self._repository.get_by_fingerprint(workspace_id, fingerprint)
+        if verdict is None or verdict.created_at < time.time() - self.TTL:
+            return None
+        return verdict
+
+    async def set(self,
+                  workspace_id: int,
+                  fingerprint: str,
+                  *,
+                  tool_name: str,
+                  risk_level: int,
+                  reason: str,
+                  created_at: int | None = None):
+        await self._repository.set_verdict(
+            workspace_id=workspace_id,
+            fingerprint=fingerprint,
+            tool_name=tool_name,
+            risk_level=risk_level,
+            reason=reason,
+            created_at=created_at or int(time.time()),
+        )
+
+    async def cleanup_expired(self) -> int:
+        return await self._repository.delete_created_before(int(time.time()) - self.TTL)
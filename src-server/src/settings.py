@@ -80,6 +80,30 @@ class AppSettings(JsonSettings):
     smart_approve_threshold: int = 50 # 0 ~ 100
     smart_approve_timeout: int = 20
 
+    # the maximum number of tool calls of one task that execute at the same time
+    tool_concurrency_limit: int = 4
+    # the maximum number of subtasks that run at the same time, in total and for one task
+    subtask_concurrency_limit: int = 4
+    subtask_concurrency_per_task: int = 3
+
+    # the document conversion workers, None picks the count from the CPU cores,
+    # a conversion is aborted after the timeout in seconds and the sizes are in MiB
+    conversion_max_workers: int | None = None
+    conversion_timeout: int = 300
+    conversion_max_source_size: int = 256
+    conversion_memory_limit: int = 4096
+
+    # the streamed text and tool call chunks are merged until they reach this many bytes
+    # or this many milliseconds passed, setting either one to 0 streams every chunk as it arrives
+    stream_coalesce_bytes: int = 1024
+    stream_coalesce_interval: int = 50
+
+    context_compaction: bool = True
+    context_compaction_threshold: int = 80 # 0 ~ 100, percentage of the model context size
+
+    # convert the documents of the active workspaces into the markdown cache in the background
+    document_preconversion: bool = False
+
     remote_access: bool = False
     remote_access_port: int = 12586
 
@@ -1,4 +1,7 @@
 from .directory_watcher import DirectoryWatcher, FileChange
+from .file_index import FileIndex, FileIndexManager, use_file_index_manager
+from .line_index import LineIndex, get_line_index, read_line_window
+from .conversion_executor import ConversionExecutor, ConversionTimeoutError, use_conversion_executor
 from .markdown_converter import MarkdownConverter
 from .get_unique_filename import get_unique_filename
 from .open_in_file_manager import open_in_file_manager
@@ -0,0 +1,187 @@
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
+
+from loguru import logger
+
+if TYPE_CHECKING:
+    from markitdown import MarkItDown
+
+
+_worker_markitdown: MarkItDown | None = None
+
+def _init_worker(memory_limit: int | None):
+    global _worker_markitdown
+    from markitdown import MarkItDown
+    _worker_markitdown = MarkItDown()
+
+    if memory_limit is None: return
+    try:
+        import resource
+    except ImportError:
+        # not available on Windows
+        return
+    _, hard_limit = resource.getrlimit(resource.RLIMIT_AS)
+    if hard_limit != resource.RLIM_INFINITY:
+        memory_limit = min(memory_limit, hard_limit)
+    resource.setrlimit(resource.RLIMIT_AS, (memory_limit, hard_limit))
+
+def _convert_in_worker(source: str | bytes) -> str:
+    assert _worker_markitdown is not None
+    stream_or_path = io.BytesIO(source) if isinstance(source, bytes) else Path(source)
+    return _worker_markitdown.convert(stream_or_path).markdown
+
+
+class ConversionTimeoutError(TimeoutError): ...
+
+class SourceTooLargeError(ValueError): ...
+
+@dataclass
+class ConversionJob:
+    key: str
+    state: Literal["queued", "running"] = "queued"
+    created_at: float = field(default_factory=time.monotonic)
+    started_at: float | None = None
+    # the number of callers awaiting the job, it is cancelled when the last one leaves
+    waiters: int = 0
+    task: asyncio.Task[str] | None = None
+
+class ConversionExecutor:
+    """
+    Runs the markitdown conversions in a process pool, so that the CPU-bound parsing of
+    large documents neither holds the GIL of the event loop nor fills the default thread pool.
+
+    - At most `max_workers` conversions run at once, the others wait in the event loop.
+    - Identical in-flight conversions (same `key`) share one job.
+    - A conversion running longer than `timeout` seconds is aborted by killing the pool
+      workers. The other jobs interrupted by the kill are retried once on a new pool.
+    - Sources larger than `max_source_bytes` are rejected, workers are replaced after
+      `max_tasks_per_child` conversions and their address space is limited to `memory_limit` bytes.
+    """
+    _logger = logger.bind(name="ConversionExecutor")
+
+    def __init__(self,
+                 max_workers: int | None = None,
+                 timeout: float = 300,
+                 max_source_bytes: int = 256 * 1024 * 1024,
+                 memory_limit: int | None = 4 * 1024 * 1024 * 1024,
+                 max_tasks_per_child: int = 16):
+        self._max_workers = max_workers or max(1, min(4, (os.cpu_count() or 2) // 2))
+        self._timeout = timeout
+        self._max_source_bytes = max_source_bytes
+        self._memory_limit = memory_limit
+        self._max_tasks_per_child = max_tasks_per_child
+        self._semaphore = asyncio.Semaphore(self._max_workers)
+        self._pool: ProcessPoolExecutor | None = None
+        self._jobs: dict[str, ConversionJob] = {}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(
+                self._max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self._memory_limit,),
+                max_tasks_per_child=self._max_tasks_per_child)
+        return self._pool
+
+    def _discard_pool(self, pool: ProcessPoolExecutor):
+        if self._pool is pool:
+            self._pool = None
+        # a running job can not be cancelled, so the workers are killed
+        pool.kill_workers()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def _run(self, job: ConversionJob, source: str | bytes) -> str:
+        async with self._semaphore:
+            job.state = "running"
+            job.started_at = time.monotonic()
+            loop = asyncio.get_running_loop()
+            for attempt in range(2):
+                pool = self._get_pool()
+                try:
+                    return await asyncio.wait_for(
+                        loop.run_in_executor(pool, _convert_in_worker, source),
+                        self._timeout)
+                except TimeoutError:
+                    self._logger.warning(f"Conversion of {job.key} timed out after {self._timeout}s")
+                    self._discard_pool(pool)
+                    raise ConversionTimeoutError(f"Document conversion timed out after {self._timeout} seconds")
+                except BrokenProcessPool:
+                    # the pool was killed for another job, or a worker crashed
+                    if self._pool is pool:
+                        self._discard_pool(pool)
+                        raise
+                    if attempt > 0: raise
+            raise AssertionError("unreachable")
+
+    def _source_key(self, source: Path | bytes) -> tuple[str | bytes, str]:
+        if isinstance(source, bytes):
+            if len(source) > self._max_source_bytes:
+                raise SourceTooLargeError(f"Document is too large to convert ({len(source)} bytes)")
+            return source, hashlib.sha256(source).hexdigest()
+        stat = source.stat()
+        if stat.st_size > self._max_source_bytes:
+            raise SourceTooLargeError(f"Document {source.name} is too large to convert ({stat.st_size} bytes)")
+        return str(source), f"{source.resolve()}:{stat.st_size}:{stat.st_mtime_ns}"
+
+    async def convert(self, source: Path | bytes, key: str | None = None) -> str:
+        """
+        Convert the document to markdown. `key` identifies the content of the source,
+        e.g. its checksum, and defaults to the hash of the bytes or the stat of the path.
+        """
+        worker_source, default_key = await asyncio.to_thread(self._source_key, source)
+        key = key or default_key
+
+        job = self._jobs.get(key)
+        if job is None:
+            job = self._jobs[key] = ConversionJob(key)
+            job.task = asyncio.create_task(self._run(job, worker_source))
+            def remove_job(_):
+                if self._jobs.get(key) is job:
+                    self._jobs.pop(key)
+            job.task.add_done_callback(remove_job)
+        assert job.task is not None
+
+        job.waiters += 1
+        try:
+            return await asyncio.shield(job.task)
+        finally:
+            job.waiters -= 1
+            if job.waiters == 0 and not job.task.done():
+                job.task.cancel()
+                # later callers start a new job instead of joining the cancelled one
+                if self._jobs.get(key) is job:
+                    self._jobs.pop(key)
+
+    def jobs(self) -> list[ConversionJob]:
+        return list(self._jobs.values())
+
+    async def close(self):
+        for job in list(self._jobs.values()):
+            if job.task is not None:
+                job.task.cancel()
+        if self._pool is not None:
+            self._discard_pool(self._pool)
+
+__instance: ConversionExecutor | None = None
+
+def use_conversion_executor() -> ConversionExecutor:
+    global __instance
+    if __instance is None:
+        from src.settings import use_app_setting_manager
+        settings = use_app_setting_manager().settings
+        __instance = ConversionExecutor(
+            max_workers=settings.conversion_max_workers,
+            timeout=settings.conversion_timeout,
+            max_source_bytes=settings.conversion_max_source_size * 1024 * 1024,
+            memory_limit=settings.conversion_memory_limit * 1024 * 1024)
+    return __instance
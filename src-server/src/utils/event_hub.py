@@ -0,0 +1,135 @@
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Hashable
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class HubEvent[T]:
+    # increases monotonically within a hub, so that a subscriber can resume after it
+    id: int
+    data: T
+
+class Subscription[T]:
+    """
+    The pending events of one subscriber, kept in a buffer of at most `capacity` events.
+    When a slow subscriber fills its buffer, a new event replaces the pending one of the same
+    coalesce key, or the oldest pending event is dropped. Publishing therefore never waits.
+    """
+    def __init__(self,
+                 hub: EventHub[T],
+                 capacity: int,
+                 accept: Callable[[T], bool] | None,
+                 coalesce_key: Callable[[T], Hashable | None] | None):
+        self._hub = hub
+        self._capacity = capacity
+        self._accept = accept
+        self._coalesce_key = coalesce_key
+        self._buffer: deque[HubEvent[T]] = deque()
+        self._wakeup = asyncio.Event()
+        self._closed = False
+        self.dropped = 0
+
+    def _make_room(self, data: T):
+        if self._coalesce_key is not None and (key := self._coalesce_key(data)) is not None:
+            for pending in self._buffer:
+                if self._coalesce_key(pending.data) == key:
+                    self._buffer.remove(pending)
+                    return
+        self._buffer.popleft()
+
+    def push(self, event: HubEvent[T]):
+        if self._closed: return
+        if self._accept is not None and not self._accept(event.data): return
+        if len(self._buffer) >= self._capacity:
+            self._make_room(event.data)
+            self.dropped += 1
+        self._buffer.append(event)
+        self._wakeup.set()
+
+    def close(self):
+        """Stop receiving events, the pending ones are still delivered."""
+        self._closed = True
+        self._wakeup.set()
+
+    async def __aiter__(self) -> AsyncIterator[HubEvent[T]]:
+        while True:
+            if len(self._buffer) > 0:
+                yield self._buffer.popleft()
+                continue
+            if self._closed: return
+            self._wakeup.clear()
+            await self._wakeup.wait()
+
+    def __enter__(self) -> Subscription[T]:
+        return self
+
+    def __exit__(self, *_):
+        self._hub.unsubscribe(self)
+
+class EventHub[T]:
+    """
+    Publishes every event to all the subscribers, each one with its own bounded buffer.
+    The last `history_size` events are kept, so that a subscriber can replay the events
+    it missed after a given event id.
+    """
+    def __init__(self,
+                 subscriber_capacity: int = 256,
+                 history_size: int = 0,
+                 coalesce_key: Callable[[T], Hashable | None] | None = None):
+        self._subscriber_capacity = subscriber_capacity
+        self._coalesce_key = coalesce_key
+        self._subscriptions: set[Subscription[T]] = set()
+        self._history: deque[HubEvent[T]] = deque(maxlen=history_size)
+        self._last_event_id = 0
+        self._closed = False
+
+    @property
+    def last_event_id(self) -> int:
+        return self._last_event_id
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def publish(self, data: T) -> HubEvent[T]:
+        self._last_event_id += 1
+        event = HubEvent(self._last_event_id, data)
+        self._history.append(event)
+        for subscription in self._subscriptions:
+            subscription.push(event)
+        return event
+
+    def can_replay(self, last_event_id: int) -> bool:
+        """Whether all the events after `last_event_id` are still in the history."""
+        oldest_id = self._history[0].id if len(self._history) > 0 else self._last_event_id + 1
+        return last_event_id >= oldest_id - 1
+
+    def subscribe(self,
+                  accept: Callable[[T], bool] | None = None,
+                  last_event_id: int | None = None) -> Subscription[T]:
+        """
+        Subscribe to the events published from now on, preceded by the kept
+        events after `last_event_id` if it is given.
+        The subscription of a closed hub only delivers the replayed events.
+        """
+        subscription = Subscription(self, self._subscriber_capacity, accept, self._coalesce_key)
+        if last_event_id is not None:
+            for event in self._history:
+                if event.id > last_event_id:
+                    subscription.push(event)
+        if self._closed:
+            subscription.close()
+        else:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription[T]):
+        subscription.close()
+        self._subscriptions.discard(subscription)
+
+    def close(self):
+        self._closed = True
+        for subscription in self._subscriptions:
+            subscription.close()
+        self._subscriptions.clear()
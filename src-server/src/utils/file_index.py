@@ -0,0 +1,345 @@
+import asyncio
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from collections.abc import Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Literal
+
+from anyio import Path as AnyioPath
+from dais_scantree.ignore_rule import IgnoreRuleNode, is_hidden, load_gitignore_spec
+from loguru import logger
+from watchfiles import Change as ChangeType
+
+from .directory_watcher import DirectoryWatcher, FileChange
+
+
+@dataclass(frozen=True, slots=True)
+class IndexedEntry:
+    # the path relative to the index root, in posix format and without trailing slash
+    path: str
+    name: str
+    is_dir: bool
+    is_symlink: bool
+
+    @property
+    def depth(self) -> int:
+        return self.path.count("/") + 1
+
+type SearchCandidate = tuple[str, str, Literal["folder", "file"]]
+
+class FileIndex:
+    """
+    An in-memory index of a directory tree, following the same hidden-file and gitignore
+    rules as the default `dais_scantree` scans, so that the listing, glob and fuzzy queries
+    do not walk the tree again. Symlinked directories are indexed but not followed.
+
+    The index is built once and then kept current by `apply_changes`. When the tree has
+    more than `max_entries` entries the index is marked incomplete and callers should
+    fall back to scanning.
+    """
+    _logger = logger.bind(name="FileIndex")
+
+    # a change batch larger than this is cheaper to handle with a full rebuild
+    MAX_INCREMENTAL_CHANGES = 2000
+
+    def __init__(self, root: Path, max_entries: int = 200_000):
+        self.root = root
+        self._max_entries = max_entries
+        self._lock = threading.RLock()
+        self._entries: dict[str, IndexedEntry] = {}
+        # parent directory ("" for the root) -> name -> entry
+        self._children: dict[str, dict[str, IndexedEntry]] = {}
+        # indexed directory -> the ignore rules applying inside of it
+        self._dir_nodes: dict[str, IgnoreRuleNode] = {}
+        self._candidates: tuple[int, list[SearchCandidate]] | None = None
+        self.complete = False
+        self.version = 0
+
+    def _relative(self, path: Path) -> str | None:
+        try:
+            relative = path.relative_to(self.root).as_posix()
+        except ValueError:
+            return None
+        return "" if relative == "." else relative
+
+    def _insert(self, entry: IndexedEntry):
+        parent, _, _ = entry.path.rpartition("/")
+        self._entries[entry.path] = entry
+        self._children.setdefault(parent, {})[entry.name] = entry
+
+    def _remove(self, relative: str):
+        entry = self._entries.pop(relative, None)
+        if entry is None: return
+        parent, _, _ = relative.rpartition("/")
+        siblings = self._children.get(parent)
+        if siblings is not None:
+            siblings.pop(entry.name, None)
+        if entry.is_dir:
+            self._remove_descendants(relative)
+
+    def _remove_descendants(self, directory: str):
+        self._dir_nodes.pop(directory, None)
+        for child in list(self._children.pop(directory, {}).values()):
+            self._entries.pop(child.path, None)
+            if child.is_dir:
+                self._remove_descendants(child.path)
+
+    def _scan_into(self, directory: str, node: IgnoreRuleNode):
+        """
+        Breadth-first scan of `directory`, mirroring the gitignore-aware scan of dais_scantree.
+        """
+        self._dir_nodes[directory] = node
+        queue: deque[tuple[str, IgnoreRuleNode]] = deque([(directory, node)])
+        while len(queue) > 0:
+            current, current_node = queue.popleft()
+            try:
+                with os.scandir(current_node.path) as iterator:
+                    dir_entries = list(iterator)
+            except (PermissionError, FileNotFoundError, NotADirectoryError):
+                continue
+            for dir_entry in dir_entries:
+                entry_path = Path(dir_entry.path)
+                if current_node.check_ignore(entry_path): continue
+                if is_hidden(entry_path): continue
+                if len(self._entries) >= self._max_entries:
+                    self.complete = False
+                    return
+                relative = f"{current}/{dir_entry.name}" if current else dir_entry.name
+                is_dir = dir_entry.is_dir(follow_symlinks=False)
+                self._insert(IndexedEntry(relative, dir_entry.name, is_dir, dir_entry.is_symlink()))
+                if is_dir:
+                    child_node = IgnoreRuleNode(entry_path, load_gitignore_spec(entry_path), current_node)
+                    self._dir_nodes[relative] = child_node
+                    queue.append((relative, child_node))
+
+    def build(self):
+        with self._lock:
+            started_at = time.perf_counter()
+            self._entries.clear()
+            self._children.clear()
+            self._dir_nodes.clear()
+            self.complete = True
+            self._scan_into("", IgnoreRuleNode(self.root, load_gitignore_spec(self.root)))
+            self.version += 1
+            self._logger.debug(f"Indexed {len(self._entries)} entries of {self.root} "
+                               f"in {time.perf_counter() - started_at:.3f}s")
+
+    def _rescan_directory(self, directory: str):
+        parent_node = self._dir_nodes.get(directory)
+        if parent_node is None: return
+        self._remove_descendants(directory)
+        path = self.root / directory
+        node = IgnoreRuleNode(path, load_gitignore_spec(path), parent_node.parent)
+        self._scan_into(directory, node)
+
+    def _add(self, path: Path, relative: str):
+        parent, _, name = relative.rpartition("/")
+        parent_node = self._dir_nodes.get(parent)
+        # the parent is ignored, hidden or not indexed yet
+        if parent_node is None: return
+        if is_hidden(path): return
+        if not path.exists(follow_symlinks=False):
+            self._remove(relative)
+            return
+        if parent_node.check_ignore(path): return
+
+        existing = self._entries.get(relative)
+        is_dir = path.is_dir(follow_symlinks=False)
+        if existing is not None and existing.is_dir == is_dir: return
+        if existing is not None:
+            self._remove(relative)
+        if len(self._entries) >= self._max_entries:
+            self.complete = False
+            return
+        self._insert(IndexedEntry(relative, name, is_dir, path.is_symlink()))
+        if is_dir:
+            self._scan_into(relative, IgnoreRuleNode(path, load_gitignore_spec(path), parent_node))
+
+    def apply_changes(self, changes: list[FileChange]):
+        with self._lock:
+            if len(changes) > self.MAX_INCREMENTAL_CHANGES:
+                self.build()
+                return
+            rescan_directories: set[str] = set()
+            for change_type, raw_path in changes:
+                path = Path(raw_path)
+                relative = self._relative(path)
+                if relative is None or relative == "": continue
+                if path.name == ".gitignore":
+                    rescan_directories.add(relative.rpartition("/")[0])
+                    continue
+                match change_type:
+                    case ChangeType.deleted:
+                        self._remove(relative)
+                    case ChangeType.added | ChangeType.modified:
+                        self._add(path, relative)
+            for directory in sorted(rescan_directories, key=len):
+                self._rescan_directory(directory)
+            self.version += 1
+
+    def resolve_directory(self, path: Path) -> str | None:
+        """
+        The index key of an indexed directory, None if the directory is not indexed.
+        """
+        relative = self._relative(path)
+        if relative is None: return None
+        with self._lock:
+            return relative if relative in self._dir_nodes else None
+
+    def list_children(self, directory: str) -> list[IndexedEntry]:
+        with self._lock:
+            return list(self._children.get(directory, {}).values())
+
+    def walk(self, directory: str, max_depth: int | None = None) -> list[tuple[IndexedEntry, int]]:
+        """
+        The entries under `directory` in depth-first pre-order, paired with their depth below it.
+        """
+        def visit(current: str, depth: int) -> Iterator[tuple[IndexedEntry, int]]:
+            if max_depth is not None and depth > max_depth: return
+            for entry in self._children.get(current, {}).values():
+                yield entry, depth
+                if entry.is_dir:
+                    yield from visit(entry.path, depth + 1)
+
+        with self._lock:
+            return list(visit(directory, 1))
+
+    def subtree(self, directory: str) -> list[IndexedEntry]:
+        """
+        The entries under `directory` in breadth-first order.
+        """
+        with self._lock:
+            result: list[IndexedEntry] = []
+            queue: deque[str] = deque([directory])
+            while len(queue) > 0:
+                for entry in self._children.get(queue.popleft(), {}).values():
+                    result.append(entry)
+                    if entry.is_dir:
+                        queue.append(entry.path)
+            return result
+
+    def search_candidates(self) -> list[SearchCandidate]:
+        """
+        (name, relative path, type) of all the non-symlink entries, cached until the index changes.
+        """
+        with self._lock:
+            if self._candidates is not None and self._candidates[0] == self.version:
+                return self._candidates[1]
+            candidates: list[SearchCandidate] = [
+                (entry.name, entry.path, "folder" if entry.is_dir else "file")
+                for entry in self.subtree("")
+                if not entry.is_symlink
+            ]
+            self._candidates = (self.version, candidates)
+            return candidates
+
+@dataclass
+class _ManagedIndex:
+    index: FileIndex
+    watcher: DirectoryWatcher | None = None
+    ready: bool = False
+    last_used_at: float = field(default_factory=time.monotonic)
+
+class FileIndexManager:
+    """
+    Keeps a watched FileIndex per directory. `peek` never blocks: it returns the index
+    once it is built and schedules the build on the first request, so that the first
+    queries of a directory fall back to scanning.
+
+    The indexes are only created after `start`, so that short-lived callers (tests,
+    scripts) do not spawn watchers.
+    """
+    _logger = logger.bind(name="FileIndexManager")
+
+    def __init__(self, capacity: int = 8, idle_timeout: float = 1800):
+        self._capacity = capacity
+        self._idle_timeout = idle_timeout
+        self._indexes: OrderedDict[Path, _ManagedIndex] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+        self._started = False
+
+    def start(self):
+        self._started = True
+
+    def _spawn(self, coroutine):
+        task = asyncio.create_task(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _prepare(self, root: Path, managed: _ManagedIndex):
+        index = managed.index
+        # the changes reported while the index is being built
+        pending: list[FileChange] = []
+
+        async def on_changes(changes: list[FileChange]):
+            if not managed.ready:
+                pending.extend(changes)
+                return
+            await asyncio.to_thread(index.apply_changes, changes)
+
+        try:
+            # the watcher starts first, so that no change between the scan and the watching is lost
+            managed.watcher = DirectoryWatcher(AnyioPath(root), on_changes)
+            await managed.watcher.start()
+            await asyncio.to_thread(index.build)
+            while len(pending) > 0:
+                changes = pending.copy()
+                pending.clear()
+                await asyncio.to_thread(index.apply_changes, changes)
+            managed.ready = True
+        except Exception:
+            self._logger.exception(f"Failed to build the file index of {root}")
+            await self._dispose(root, managed)
+
+    async def _dispose(self, root: Path, managed: _ManagedIndex):
+        if self._indexes.get(root) is managed:
+            self._indexes.pop(root)
+        managed.ready = False
+        if managed.watcher is not None:
+            await managed.watcher.stop()
+            managed.watcher = None
+
+    def _sweep(self):
+        now = time.monotonic()
+        expired = [root for root, managed in self._indexes.items()
+                   if managed.ready and now - managed.last_used_at > self._idle_timeout]
+        overflow = len(self._indexes) - len(expired) - self._capacity
+        # the indexes are kept in LRU order, the least recently used ones come first
+        overflowed = [root for root, managed in self._indexes.items()
+                      if managed.ready and root not in expired][:max(overflow, 0)]
+        for root in expired + overflowed:
+            self._spawn(self._dispose(root, self._indexes[root]))
+
+    def peek(self, root: Path) -> FileIndex | None:
+        if not self._started: return None
+        # the indexed paths are compared with resolved paths, and a symlinked root shares its index
+        root = root.resolve()
+        managed = self._indexes.get(root)
+        if managed is None:
+            managed = self._indexes[root] = _ManagedIndex(FileIndex(root))
+            self._spawn(self._prepare(root, managed))
+            self._sweep()
+            return None
+        self._indexes.move_to_end(root)
+        managed.last_used_at = time.monotonic()
+        if not managed.ready or not managed.index.complete: return None
+        return managed.index
+
+    async def close(self):
+        self._started = False
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        for root, managed in list(self._indexes.items()):
+            await self._dispose(root, managed)
+
+__instance: FileIndexManager | None = None
+
+def use_file_index_manager() -> FileIndexManager:
+    global __instance
+    if __instance is None:
+        __instance = FileIndexManager()
+    return __instance
@@ -0,0 +1,79 @@
+import bisect
+import os
+from array import array
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+
+
+CHUNK_SIZE = 1024 * 1024
+
+@dataclass(frozen=True, slots=True)
+class LineIndex:
+    """
+    A sparse line index of a file: the number of lines before the start of each chunk
+    of `CHUNK_SIZE` bytes, so that a line can be located by reading a single chunk.
+    Lines are separated by "\\n", the same as the line numbers reported by ripgrep.
+    """
+    size: int
+    total_lines: int
+    # chunk_lines[i] is the number of "\n" before the byte offset i * CHUNK_SIZE
+    chunk_lines: array
+
+    @classmethod
+    def build(cls, path: Path) -> "LineIndex":
+        chunk_lines = array("q")
+        newlines = 0
+        size = 0
+        last_byte = b""
+        with open(path, "rb") as file:
+            while chunk := file.read(CHUNK_SIZE):
+                chunk_lines.append(newlines)
+                newlines += chunk.count(b"\n")
+                size += len(chunk)
+                last_byte = chunk[-1:]
+        # an unterminated last line counts as a line, like `str.splitlines`
+        total_lines = newlines + (1 if size > 0 and last_byte != b"\n" else 0)
+        return cls(size=size, total_lines=total_lines, chunk_lines=chunk_lines)
+
+    def line_offset(self, file, line: int) -> int:
+        """
+        The byte offset of the start of the 0-based `line`, read from the opened binary `file`.
+        """
+        if line <= 0: return 0
+        # the chunk containing the newline that ends line `line - 1`
+        chunk_index = bisect.bisect_right(self.chunk_lines, line - 1) - 1
+        chunk_start = chunk_index * CHUNK_SIZE
+        file.seek(chunk_start)
+        chunk = file.read(CHUNK_SIZE)
+        skipped = line - self.chunk_lines[chunk_index]
+        rest = chunk.split(b"\n", skipped)[-1]
+        return chunk_start + len(chunk) - len(rest)
+
+@lru_cache(maxsize=32)
+def _load_line_index(path: str, size: int, mtime_ns: int) -> LineIndex:
+    return LineIndex.build(Path(path))
+
+def get_line_index(path: Path) -> LineIndex:
+    """
+    The line index of the file, cached until its size or modification time changes.
+    """
+    stat = os.stat(path)
+    return _load_line_index(str(path), stat.st_size, stat.st_mtime_ns)
+
+def read_line_window(path: Path, offset: int, max_lines: int) -> tuple[list[str], int]:
+    """
+    Read at most `max_lines` lines starting from the 1-based line `offset` without loading
+    the rest of the file. Returns the lines, without line endings, and the total line count.
+    """
+    index = get_line_index(path)
+    if offset > index.total_lines or max_lines <= 0:
+        return [], index.total_lines
+
+    lines: list[str] = []
+    with open(path, "rb") as file:
+        file.seek(index.line_offset(file, offset - 1))
+        while len(lines) < max_lines and (raw_line := file.readline()):
+            raw_line = raw_line.removesuffix(b"\n").removesuffix(b"\r")
+            lines.append(raw_line.decode("utf-8"))
+    return lines, index.total_lines
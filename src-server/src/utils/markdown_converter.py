@@ -1,14 +1,11 @@
-import asyncio
-import io
 from functools import singledispatchmethod
 from pathlib import Path as StdPath
 from anyio import Path as AnyioPath
 from loguru import logger
 from magika import ContentTypeLabel
-from markitdown import MarkItDown
 
+from .conversion_executor import use_conversion_executor
 
-_markitdown = MarkItDown()
 
 class MarkdownConverter:
     CONVERTABLE_EXTS = (".pdf", ".docx", ".pptx", ".xlsx", ".epub")
@@ -32,19 +29,15 @@ class MarkdownConverter:
 
 
     @singledispatchmethod
-    async def convert(self, source) -> str:
+    async def convert(self, source, key: str | None = None) -> str:
         logger.warning(f"Unexpected value type: {type(source)}")
         return str(source)
 
     @convert.register(StdPath)
     @convert.register(AnyioPath)
-    async def _(self, path: StdPath | AnyioPath) -> str:
-        path = StdPath(path)
-        result = await asyncio.to_thread(_markitdown.convert, path)
-        return result.markdown
+    async def _(self, path: StdPath | AnyioPath, key: str | None = None) -> str:
+        return await use_conversion_executor().convert(StdPath(path), key)
 
     @convert.register(bytes)
-    async def _(self, binary: bytes) -> str:
-        io_interface = io.BytesIO(binary)
-        result = await asyncio.to_thread(_markitdown.convert, io_interface)
-        return result.markdown
+    async def _(self, binary: bytes, key: str | None = None) -> str:
+        return await use_conversion_executor().convert(binary, key)
@@ -0,0 +1,171 @@
+import bisect
+import math
+from collections import OrderedDict
+from collections.abc import Sequence
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+
+type LabelValues = tuple[str, ...]
+
+DEFAULT_LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+@dataclass
+class _HistogramSeries:
+    bucket_counts: list[int]
+    count: int = 0
+    sum: float = 0
+    min: float = math.inf
+    max: float = -math.inf
+
+class Metric[S]:
+    """
+    A metric with a fixed set of label names. Each distinct label combination is
+    a series; the least recently updated series are dropped once `max_series` is
+    exceeded, so that the memory stays bounded even for high-cardinality labels.
+    """
+    type: Literal["counter", "histogram"]
+
+    def __init__(self, name: str, help: str, labels: Sequence[str], max_series: int):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._max_series = max_series
+        self._series: OrderedDict[LabelValues, S] = OrderedDict()
+
+    def _create_series(self) -> S: ...
+
+    def _get_series(self, label_values: dict[str, str]) -> S:
+        key = tuple(str(label_values[label]) for label in self.labels)
+        series = self._series.get(key)
+        if series is None:
+            series = self._series[key] = self._create_series()
+            if len(self._series) > self._max_series:
+                self._series.popitem(last=False)
+        else:
+            self._series.move_to_end(key)
+        return series
+
+    def series(self) -> list[tuple[dict[str, str], S]]:
+        return [(dict(zip(self.labels, key)), series) for key, series in self._series.items()]
+
+class Counter(Metric[list[float]]):
+    type = "counter"
+
+    def _create_series(self) -> list[float]:
+        return [0]
+
+    def inc(self, amount: float = 1, **label_values: str):
+        self._get_series(label_values)[0] += amount
+
+class Histogram(Metric[_HistogramSeries]):
+    type = "histogram"
+
+    def __init__(self,
+                 name: str,
+                 help: str,
+                 labels: Sequence[str],
+                 max_series: int,
+                 buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS):
+        super().__init__(name, help, labels, max_series)
+        self.buckets = tuple(sorted(buckets))
+
+    def _create_series(self) -> _HistogramSeries:
+        return _HistogramSeries(bucket_counts=[0] * len(self.buckets))
+
+    def observe(self, value: float, **label_values: str):
+        series = self._get_series(label_values)
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            series.bucket_counts[index] += 1
+        series.count += 1
+        series.sum += value
+        series.min = min(series.min, value)
+        series.max = max(series.max, value)
+
+@dataclass
+class MetricsRegistry:
+    max_series: int = 1000
+    _metrics: dict[str, Counter | Histogram] = field(default_factory=dict)
+
+    def counter(self, name: str, help: str, labels: Sequence[str]) -> Counter:
+        return self._register(Counter(name, help, labels, self.max_series))
+
+    def histogram(self,
+                  name: str,
+                  help: str,
+                  labels: Sequence[str],
+                  buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, help, labels, self.max_series, buckets))
+
+    def _register[M: Counter | Histogram](self, metric: M) -> M:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    @staticmethod
+    def _format_labels(labels: dict[str, str]) -> str:
+        if len(labels) == 0: return ""
+        def escape(value: str) -> str:
+            return value.replace("\\", "\\\\").replace("\n", "\\n").replace("\"", "\\\"")
+        return "{" + ",".join(f"{key}=\"{escape(value)}\"" for key, value in labels.items()) + "}"
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        if value == math.inf: return "+Inf"
+        return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+    def render_prometheus(self) -> str:
+        """
+        The metrics in the Prometheus text exposition format.
+        """
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            if isinstance(metric, Counter):
+                for labels, value in metric.series():
+                    lines.append(f"{metric.name}{self._format_labels(labels)} {self._format_value(value[0])}")
+                continue
+            for labels, series in metric.series():
+                cumulative = 0
+                for bound, bucket_count in zip(metric.buckets, series.bucket_counts):
+                    cumulative += bucket_count
+                    bucket_labels = self._format_labels({**labels, "le": self._format_value(bound)})
+                    lines.append(f"{metric.name}_bucket{bucket_labels} {cumulative}")
+                inf_labels = self._format_labels({**labels, "le": "+Inf"})
+                lines.append(f"{metric.name}_bucket{inf_labels} {series.count}")
+                lines.append(f"{metric.name}_sum{self._format_labels(labels)} {self._format_value(series.sum)}")
+                lines.append(f"{metric.name}_count{self._format_labels(labels)} {series.count}")
+        return "\n".join(lines) + "\n"
+
+    def to_json(self) -> list[dict[str, Any]]:
+        result: list[dict[str, Any]] = []
+        for metric in self._metrics.values():
+            if isinstance(metric, Counter):
+                series = [{"labels": labels, "value": value[0]} for labels, value in metric.series()]
+            else:
+                series = [{
+                    "labels": labels,
+                    "count": histogram.count,
+                    "sum": histogram.sum,
+                    "min": histogram.min if histogram.count > 0 else None,
+                    "max": histogram.max if histogram.count > 0 else None,
+                    "buckets": dict(zip(map(str, metric.buckets), histogram.bucket_counts)),
+                } for labels, histogram in metric.series()]
+            result.append({
+                "name": metric.name,
+                "help": metric.help,
+                "type": metric.type,
+                "series": series,
+            })
+        return result
+
+__instance: MetricsRegistry | None = None
+
+def use_metrics_registry() -> MetricsRegistry:
+    global __instance
+    if __instance is None:
+        __instance = MetricsRegistry()
+    return __instance
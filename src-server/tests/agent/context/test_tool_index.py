@@ -0,0 +1,50 @@
+from dais_sdk.tool import Toolset
+from dais_sdk.types import ToolDef
+
+from src.agent.context.tool_index import ToolIndex
+
+
+def first_tool(): ...
+def second_tool(): ...
+
+class FakeToolset(Toolset):
+    def __init__(self, name: str, tools: list[ToolDef]):
+        self._name = name
+        self._tools = tools
+        self.get_tools_calls = 0
+
+    @property
+    def name(self) -> str:
+        return self._name
+
+    def get_tools(self) -> list[ToolDef]:
+        self.get_tools_calls += 1
+        return self._tools
+
+def make_tool(name: str, tool_id: int, execute=first_tool) -> ToolDef:
+    return ToolDef(name=name,
+                   description="",
+                   execute=execute,
+                   metadata={"id": tool_id, "auto_approve": False, "needs_user_interaction": False})
+
+
+class TestToolIndex:
+    def test_finds_tools_by_name_and_id(self):
+        tool_a, tool_b = make_tool("a", 1), make_tool("b", 2, second_tool)
+        toolset = FakeToolset("fake", [tool_a, tool_b])
+
+        index = ToolIndex([toolset])
+
+        assert index.find_by_name("b") is tool_b
+        assert index.find_by_id(1) is tool_a
+        assert index.find_by_name("missing") is None
+        assert index.tools == [tool_a, tool_b]
+        assert toolset.get_tools_calls == 1
+
+    def test_first_toolset_wins_on_name_conflict(self):
+        first, second = make_tool("same", 1), make_tool("same", 2)
+
+        index = ToolIndex([FakeToolset("first", [first]), FakeToolset("second", [second])])
+
+        assert index.find_by_name("same") is first
+        assert index.find_by_id(2) is second
@@ -51,6 +51,22 @@ class TestNoteMaterializer:
 
         assert result == "# Workspace notes\n\n- item"
 
+    @pytest.mark.asyncio
+    async def test_get_notes_index_rereads_only_changed_file(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
+        monkeypatch.setattr("src.agent.notes.materializer.DATA_DIR", tmp_path)
+
+        notes_dir = await NoteMaterializer.get_notes_dir(10)
+        notes_index = notes_dir / "NOTES.md"
+        await notes_index.write_text("# Notes", "utf-8")
+        assert await NoteMaterializer.get_notes_index(10) == "# Notes"
+
+        with patch.object(AnyioPath, "read_text", AsyncMock(side_effect=OSError("read failed"))) as read_text:
+            assert await NoteMaterializer.get_notes_index(10) == "# Notes"
+        read_text.assert_not_awaited()
+
+        await notes_index.write_text("# Updated notes", "utf-8")
+        assert await NoteMaterializer.get_notes_index(10) == "# Updated notes"
+
     @pytest.mark.asyncio
     async def test_get_notes_index_returns_none_when_missing(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch):
         monkeypatch.setattr("src.agent.notes.materializer.DATA_DIR", tmp_path)
@@ -0,0 +1,61 @@
+import asyncio
+
+import pytest
+
+from src.agent.task.chunk_coalescer import ChunkCoalescer
+from src.agent.types import TextChunkEvent, ToolCallChunkEvent, UsageChunkEvent
+
+
+def text(content: str, message_id: str = "m1") -> TextChunkEvent:
+    return TextChunkEvent(content=content, message_id=message_id)
+
+def tool_call(arguments: str | None, index: int = 0, call_id: str | None = None, name: str | None = None) -> ToolCallChunkEvent:
+    return ToolCallChunkEvent(call_id=call_id, name=name, arguments=arguments, index=index)
+
+async def stream_of(*chunks, delay: float = 0):
+    for chunk in chunks:
+        if delay > 0: await asyncio.sleep(delay)
+        yield chunk
+
+async def collect(coalescer: ChunkCoalescer, stream) -> list:
+    return [chunk async for chunk in coalescer.coalesce(stream)]
+
+
+class TestChunkCoalescer:
+    @pytest.mark.asyncio
+    async def test_merges_adjacent_chunks(self):
+        usage = UsageChunkEvent(input_tokens=1, output_tokens=1, max_tokens=1, total_tokens=2,
+                                accumulated_input_tokens=1, accumulated_output_tokens=1)
+        chunks = await collect(ChunkCoalescer(max_bytes=1024, interval=1), stream_of(
+            text("Hel"), text("lo"), usage,
+            tool_call(None, call_id="c1", name="read"), tool_call('{"a"'), tool_call(":1}"),
+            tool_call("{}", index=1, call_id="c2", name="list"),
+        ))
+
+        assert chunks == [
+            text("Hello"), usage,
+            tool_call('{"a":1}', call_id="c1", name="read"),
+            tool_call("{}", index=1, call_id="c2", name="list"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_flushes_by_size_and_interval(self):
+        by_size = await collect(ChunkCoalescer(max_bytes=4, interval=1), stream_of(
+            text("ab"), text("cd"), text("e")))
+        assert by_size == [text("abcd"), text("e")]
+
+        by_interval = await collect(ChunkCoalescer(max_bytes=1024, interval=0.02), stream_of(
+            text("a"), text("b"), delay=0.05))
+        assert by_interval == [text("a"), text("b")]
+
+    @pytest.mark.asyncio
+    async def test_delivers_pending_chunk_before_error(self):
+        async def failing():
+            yield text("partial")
+            raise RuntimeError("boom")
+
+        received = []
+        with pytest.raises(RuntimeError):
+            async for chunk in ChunkCoalescer(max_bytes=1024, interval=1).coalesce(failing()):
+                received.append(chunk)
+        assert received == [text("partial")]
@@ -0,0 +1,105 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from dais_sdk.types import AssistantMessage, ToolMessage, UserMessage
+
+from src.agent.context.tracked_messages import TrackedMessages
+from src.agent.task import context_compactor as compactor_module
+from src.agent.task.context_compactor import ContextCompactor
+from src.db.models import tasks as task_models
+
+
+def make_conversation(turns: int, result: str = "ok") -> TrackedMessages:
+    messages = TrackedMessages([UserMessage(content="do the work")])
+    for turn in range(turns):
+        messages.append(AssistantMessage(content=f"step {turn}"))
+        messages.append(ToolMessage(call_id=str(turn), name="tool", arguments={}, result=result))
+    return messages
+
+def make_ctx(messages: TrackedMessages, total_tokens: int = 900, max_tokens: int = 1000) -> SimpleNamespace:
+    usage = task_models.TaskUsage.default()
+    usage.total_tokens = total_tokens
+    usage.max_tokens = max_tokens
+    return SimpleNamespace(task_id=1, messages=messages, usage=usage, compaction=None)
+
+def make_settings(**overrides) -> MagicMock:
+    settings = SimpleNamespace(context_compaction=True,
+                               context_compaction_threshold=80,
+                               flash_model=1,
+                               reply_language="en")
+    for key, value in overrides.items():
+        setattr(settings, key, value)
+    manager = MagicMock()
+    manager.settings = settings
+    return manager
+
+@asynccontextmanager
+async def fake_one_turn_llm(model_id: int):
+    yield MagicMock()
+
+
+@pytest.mark.integration
+class TestContextCompactor:
+    def test_should_compact_over_threshold(self):
+        with patch.object(compactor_module, "use_app_setting_manager", return_value=make_settings()):
+            assert ContextCompactor(make_ctx(make_conversation(10), total_tokens=850)).should_compact()
+            assert not ContextCompactor(make_ctx(make_conversation(10), total_tokens=500)).should_compact()
+
+    def test_should_not_compact_without_flash_model(self):
+        with patch.object(compactor_module, "use_app_setting_manager",
+                          return_value=make_settings(flash_model=None)):
+            assert not ContextCompactor(make_ctx(make_conversation(10))).should_compact()
+
+    @pytest.mark.asyncio
+    async def test_compact_keeps_recent_messages_and_history(self):
+        messages = make_conversation(10)
+        ctx = make_ctx(messages)
+        summarization = AsyncMock(return_value="summary")
+
+        with (
+            patch.object(compactor_module, "use_app_setting_manager", return_value=make_settings()),
+            patch.object(compactor_module, "use_one_turn_llm", fake_one_turn_llm),
+            patch.object(compactor_module, "ContextSummarization", return_value=summarization),
+        ):
+            compactor = ContextCompactor(ctx)
+            assert await compactor.compact()
+            request_messages = compactor.build_messages()
+
+        compaction = ctx.compaction
+        assert compaction is not None
+        assert len(messages) == 21
+        assert not isinstance(messages[compaction.boundary], ToolMessage)
+        assert len(messages) - compaction.boundary >= ContextCompactor.KEEP_RECENT_MESSAGES
+        assert request_messages[1:] == messages[compaction.boundary:]
+        assert isinstance(request_messages[0], UserMessage)
+        assert "summary" in request_messages[0].content
+        summarized = summarization.await_args.args[0]
+        assert summarized.messages == messages[:compaction.boundary]
+
+    def test_truncated_history_invalidates_compaction(self):
+        messages = make_conversation(10)
+        ctx = make_ctx(messages)
+        ctx.compaction = task_models.ContextCompaction(
+            boundary=13, last_message_id=messages[12].id, summary="summary")
+
+        compactor = ContextCompactor(ctx)
+        assert len(compactor.build_messages()) == 21 - 13 + 1
+        messages.truncate(5)
+        assert compactor.build_messages() is messages
+        assert ctx.compaction is None
+
+    def test_stale_large_tool_results_are_elided(self):
+        messages = make_conversation(10, result="x" * 10000)
+        ctx = make_ctx(messages)
+        ctx.compaction = task_models.ContextCompaction(
+            boundary=13, last_message_id=messages[12].id, summary="summary", elide_before=15)
+
+        request_messages = ContextCompactor(ctx).build_messages()
+        results = {message.call_id: message.result
+                   for message in request_messages if isinstance(message, ToolMessage)}
+        assert "characters elided" in results["6"]
+        assert results["9"] == "x" * 10000
+        # the stored history is left untouched
+        assert messages[14].result == "x" * 10000
@@ -0,0 +1,29 @@
+import json
+
+from dais_sdk.types import ToolMessage
+
+from src.agent.types import MessagePatchEvent, MessageReplaceEvent, TextChunkEvent, encode_agent_event
+
+
+class TestAgentEventEncoding:
+    def test_encodes_like_the_event_model(self):
+        message = ToolMessage(call_id="c1", name="read", arguments={"path": "a.txt"}, result="content")
+
+        for event in (TextChunkEvent(content="hi", message_id="m1"), MessageReplaceEvent(message=message)):
+            assert encode_agent_event(event) == event.model_dump_json().encode()
+
+    def test_patch_only_carries_the_changing_fields(self):
+        message = ToolMessage(call_id="c1", name="write", arguments={"content": "x" * 1000}, metadata={"user_approval": 1})
+        patch = MessagePatchEvent.from_message(message)
+        message.result = "done"
+        message.metadata["risk_level"] = 10
+
+        encoded = json.loads(encode_agent_event(patch))
+
+        assert encoded == {
+            "message_id": message.id,
+            "result": None,
+            "error": None,
+            "metadata": {"user_approval": 1},
+            "event_id": "MESSAGE_PATCH",
+        }
@@ -0,0 +1,157 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.agent.task.registry import TaskRegistry
+from src.schemas.tasks import runtime as task_runtime_schemas
+
+
+TASK = task_runtime_schemas.TaskType.TASK
+
+def make_task(agent_id: int = 1) -> MagicMock:
+    task = MagicMock()
+    task.agent_id = agent_id
+    task.persist = AsyncMock()
+    return task
+
+def make_factory(*tasks: MagicMock) -> AsyncMock:
+    return AsyncMock(side_effect=list(tasks))
+
+
+@pytest.mark.integration
+class TestTaskRegistry:
+    @pytest.mark.asyncio
+    async def test_lease_reuses_live_task(self):
+        registry = TaskRegistry()
+        task = make_task()
+        factory = make_factory(task)
+
+        async with registry.lease(TASK, 1, 1, factory) as first:
+            pass
+        async with registry.lease(TASK, 1, 1, factory) as second:
+            pass
+
+        assert first is task
+        assert second is task
+        factory.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_lease_rebuilds_task_when_agent_changes(self):
+        registry = TaskRegistry()
+        old_task, new_task = make_task(agent_id=1), make_task(agent_id=2)
+        factory = make_factory(old_task, new_task)
+
+        async with registry.lease(TASK, 1, 1, factory):
+            pass
+        async with registry.lease(TASK, 1, 2, factory) as task:
+            assert task is new_task
+
+        old_task.persist.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_agent_change_waits_for_the_holders_and_flushes_the_old_task(self):
+        registry = TaskRegistry()
+        old_task, new_task = make_task(agent_id=1), make_task(agent_id=2)
+        factory = make_factory(old_task, new_task)
+        release = asyncio.Event()
+
+        async def hold():
+            async with registry.lease(TASK, 1, 1, factory):
+                await release.wait()
+
+        async def rebuild():
+            async with registry.lease(TASK, 1, 2, factory) as task:
+                return task
+
+        holder = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        rebuilder = asyncio.create_task(rebuild())
+        await asyncio.sleep(0.01)
+        assert not rebuilder.done()
+        assert registry.get(TASK, 1) is old_task
+
+        release.set()
+        await holder
+
+        assert await rebuilder is new_task
+        old_task.persist.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_evicts_least_recently_used_task_over_capacity(self):
+        registry = TaskRegistry(capacity=2)
+        tasks = [make_task() for _ in range(3)]
+
+        for task_id, task in enumerate(tasks):
+            async with registry.lease(TASK, task_id, 1, make_factory(task)):
+                pass
+
+        assert registry.get(TASK, 0) is None
+        assert registry.get(TASK, 1) is tasks[1]
+        assert registry.get(TASK, 2) is tasks[2]
+        tasks[0].persist.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_leased_task_is_not_evicted(self):
+        registry = TaskRegistry(capacity=1, idle_timeout=0)
+        task = make_task()
+
+        async with registry.lease(TASK, 1, 1, make_factory(task)):
+            async with registry.lease(TASK, 2, 1, make_factory(make_task())):
+                pass
+            assert registry.get(TASK, 1) is task
+
+        assert registry.get(TASK, 1) is None
+
+    @pytest.mark.asyncio
+    async def test_schedule_persist_is_flushed_once(self):
+        registry = TaskRegistry(persist_delay=60)
+        task = make_task()
+
+        async with registry.lease(TASK, 1, 1, make_factory(task)):
+            registry.schedule_persist(TASK, 1)
+            registry.schedule_persist(TASK, 1)
+
+        task.persist.assert_not_awaited()
+        await registry.flush(TASK, 1)
+        task.persist.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_discard_drops_task_without_persisting(self):
+        registry = TaskRegistry(persist_delay=60)
+        task = make_task()
+
+        async with registry.lease(TASK, 1, 1, make_factory(task)):
+            registry.schedule_persist(TASK, 1)
+        registry.discard(TASK, 1)
+        await registry.shutdown()
+
+        assert registry.get(TASK, 1) is None
+        task.persist.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_builds_different_tasks_in_parallel_and_shares_one_build_per_key(self):
+        registry = TaskRegistry()
+        release = asyncio.Event()
+        started: list[int] = []
+
+        def slow_factory(task_id: int):
+            async def factory():
+                started.append(task_id)
+                await release.wait()
+                return make_task()
+            return factory
+
+        async def lease(task_id: int):
+            async with registry.lease(TASK, task_id, 1, slow_factory(task_id)) as task:
+                return task
+
+        leases = [asyncio.create_task(lease(task_id)) for task_id in (1, 1, 2)]
+        await asyncio.sleep(0.01)
+        # the build of task 1 does not block the build of task 2
+        assert started == [1, 2]
+
+        release.set()
+        first, second, other = await asyncio.gather(*leases)
+        assert first is second
+        assert other is not first
@@ -0,0 +1,127 @@
+import asyncio
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from dais_sdk.types import AssistantMessage
+
+from src.agent.task.run_manager import TaskRun, TaskRunManager
+from src.agent.types import (
+    ErrorEvent, MessageEndEvent, MessageStartEvent, TaskDoneEvent, TaskInterruptedEvent, TaskStartEvent, TextChunkEvent,
+)
+from src.schemas.tasks import runtime as task_runtime_schemas
+
+
+TASK = task_runtime_schemas.TaskType.TASK
+
+def make_lease(release: asyncio.Event):
+    task = MagicMock()
+    task.persist = AsyncMock()
+    task.stop = AsyncMock()
+    async def run():
+        yield TaskStartEvent()
+        await release.wait()
+        yield ErrorEvent(error="step")
+        yield TaskDoneEvent()
+    task.run = run
+
+    @asynccontextmanager
+    async def lease():
+        yield task
+    return lease, task
+
+
+class TestTaskRunManager:
+    @pytest.mark.asyncio
+    async def test_run_survives_viewers_and_replays_missed_events(self):
+        manager = TaskRunManager(retention=0)
+        release = asyncio.Event()
+        lease, task = make_lease(release)
+
+        run, created = manager.start(TASK, 1, lease)
+        assert created
+        viewer = run.events(0)
+        first = await anext(viewer)
+        assert isinstance(first.data, TaskStartEvent)
+        # the viewer disconnects, the run goes on
+        await viewer.aclose()
+        assert manager.start(TASK, 1, lease) == (run, False)
+
+        release.set()
+        replayed = [event.data async for event in run.events(first.id)]
+
+        assert [type(data) for data in replayed] == [ErrorEvent, TaskDoneEvent]
+        task.persist.assert_awaited()
+
+    @pytest.mark.asyncio
+    async def test_resuming_client_attaches_to_the_finished_run(self):
+        manager = TaskRunManager()
+        release = asyncio.Event()
+        release.set()
+        lease, _ = make_lease(release)
+
+        run, _ = manager.start(TASK, 1, lease)
+        events = [event async for event in run.events(0)]
+        assert not run.is_running
+
+        assert manager.start(TASK, 1, lease, last_event_id=events[0].id) == (run, False)
+        restarted, created = manager.start(TASK, 1, lease)
+        assert created and restarted is not run
+        await restarted.job
+
+    @pytest.mark.asyncio
+    async def test_viewer_is_told_about_events_no_longer_kept(self):
+        manager = TaskRunManager(history_size=2)
+        release = asyncio.Event()
+        release.set()
+        lease, _ = make_lease(release)
+
+        run, _ = manager.start(TASK, 1, lease)
+        await run.job
+
+        replayed = [event async for event in run.events(0)]
+
+        assert replayed[0].id == 0
+        assert isinstance(replayed[0].data, ErrorEvent) and "reload" in replayed[0].data.error
+        assert [type(event.data) for event in replayed[1:]] == [ErrorEvent, TaskDoneEvent]
+
+    def test_resume_event_id_replays_the_message_in_progress(self):
+        run = TaskRun((TASK, 1), history_size=16)
+        run.publish(TaskStartEvent())
+        assert run.resume_event_id == 1
+
+        run.publish(MessageStartEvent(message_id="m"))
+        run.publish(TextChunkEvent(message_id="m", content="partial"))
+        assert run.resume_event_id == 1
+
+        run.publish(MessageEndEvent(message=AssistantMessage(id="m", content="partial")))
+        assert run.resume_event_id == 4
+
+    @pytest.mark.asyncio
+    async def test_slow_viewer_is_told_about_dropped_events(self):
+        run = TaskRun((TASK, 1), history_size=2)
+        viewer = run.events(0)
+        run.publish(TaskStartEvent())
+        first = await anext(viewer)
+        for _ in range(3):
+            run.publish(TextChunkEvent(message_id="m", content="chunk"))
+        run.hub.close()
+
+        rest = [event async for event in viewer]
+
+        assert [event.id for event in rest] == [first.id]
+        assert isinstance(rest[0].data, ErrorEvent) and "reload" in rest[0].data.error
+
+    @pytest.mark.asyncio
+    async def test_stop_interrupts_the_run(self):
+        manager = TaskRunManager()
+        lease, task = make_lease(asyncio.Event())
+
+        run, _ = manager.start(TASK, 1, lease)
+        await asyncio.sleep(0)
+
+        assert await manager.stop(TASK, 1)
+        events = [event.data async for event in run.events(0)]
+        assert isinstance(events[-1], TaskInterruptedEvent)
+        task.stop.assert_awaited_once()
+        assert not await manager.stop(TASK, 1)
@@ -0,0 +1,64 @@
+import asyncio
+
+import pytest
+
+from src.agent.task.subtask_executor import SubtaskExecutor
+
+
+def make_job(delay: float, running: list[int], peak: list[int], result: str | None = None):
+    async def job() -> str:
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            running[0] -= 1
+        if result is None: raise RuntimeError("boom")
+        return result
+    return job
+
+
+class TestSubtaskExecutor:
+    @pytest.mark.asyncio
+    async def test_yields_outcomes_in_completion_order(self):
+        executor = SubtaskExecutor(global_limit=4, per_task_limit=4)
+        running, peak = [0], [0]
+        jobs = [make_job(0.06, running, peak, "slow"),
+                make_job(0.01, running, peak, "fast"),
+                make_job(0.03, running, peak)]
+
+        outcomes = [outcome async for outcome in executor.run_many(1, jobs)]
+
+        assert [outcome.index for outcome in outcomes] == [1, 2, 0]
+        assert outcomes[0].result == "fast"
+        assert isinstance(outcomes[1].error, RuntimeError)
+
+    @pytest.mark.asyncio
+    async def test_limits_subtasks_per_task_and_in_total(self):
+        executor = SubtaskExecutor(global_limit=3, per_task_limit=2)
+        first_running, first_peak = [0], [0]
+        second_running, second_peak = [0], [0]
+        total_running, total_peak = [0], [0]
+
+        def tracked(running: list[int], peak: list[int]):
+            inner = make_job(0.02, running, peak, "done")
+            async def job() -> str:
+                total_running[0] += 1
+                total_peak[0] = max(total_peak[0], total_running[0])
+                try:
+                    return await inner()
+                finally:
+                    total_running[0] -= 1
+            return job
+
+        async def drain(task_id: int, jobs) -> None:
+            async for _ in executor.run_many(task_id, jobs): ...
+
+        await asyncio.gather(
+            drain(1, [tracked(first_running, first_peak) for _ in range(5)]),
+            drain(2, [tracked(second_running, second_peak) for _ in range(5)]),
+        )
+
+        assert first_peak[0] == 2 and second_peak[0] == 2
+        assert total_peak[0] == 3
+        assert executor._task_slots == {}
@@ -0,0 +1,120 @@
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+from dais_sdk.types import ToolMessage
+
+from src.agent.task.tool_call_manager import tool_call_dispatcher as dispatcher_module
+from src.agent.task.tool_call_manager.tool_call_dispatcher import ToolCallDispatch, ToolCallDispatcher, ToolCallDispatchResult
+from src.agent.types import (
+    MessagePatchEvent, ToolRequirePermissionEvent, ToolExecutedEvent, ToolExecutionStartEvent, ToolExecutionProgressEvent,
+)
+
+
+def make_dispatcher(monkeypatch: pytest.MonkeyPatch, concurrency_limit: int, delays: dict[str, float]) -> ToolCallDispatcher:
+    settings_manager = SimpleNamespace(settings=SimpleNamespace(tool_concurrency_limit=concurrency_limit))
+    monkeypatch.setattr(dispatcher_module, "use_app_setting_manager", lambda: settings_manager)
+
+    dispatcher = ToolCallDispatcher.__new__(ToolCallDispatcher)
+    dispatcher._ctx = MagicMock()
+    async def fake_execute(tool, message: ToolMessage) -> ToolExecutedEvent:
+        await asyncio.sleep(delays[message.call_id])
+        if message.call_id == "failing":
+            raise RuntimeError("boom")
+        message.result = message.call_id
+        return ToolExecutedEvent(call_id=message.call_id, result=message.result)
+    dispatcher.execute = fake_execute  # type: ignore[method-assign]
+    return dispatcher
+
+def make_result() -> ToolCallDispatchResult:
+    return ToolCallDispatchResult(has_finished_task=False, has_blocked_tool_calls=False)
+
+def execute_stream(dispatcher: ToolCallDispatcher, approved: list[ToolCallDispatch]):
+    return dispatcher._execute_stream(approved, [], make_result())
+
+def make_dispatches(*call_ids: str) -> list[ToolCallDispatch]:
+    return [ToolCallDispatch(message=ToolMessage(call_id=call_id, name="tool", arguments={}, metadata={}), tool=SimpleNamespace(name="tool"))
+            for call_id in call_ids]
+
+
+class TestToolCallDispatcher:
+    @pytest.mark.asyncio
+    async def test_yields_results_in_completion_order(self, monkeypatch: pytest.MonkeyPatch):
+        dispatcher = make_dispatcher(monkeypatch, 4, {"slow": 0.2, "fast": 0.01, "failing": 0.05})
+
+        dispatches = make_dispatches("slow", "fast", "failing")
+        events = [event async for event in execute_stream(dispatcher, dispatches)]
+
+        executed = [event.call_id for event in events if isinstance(event, ToolExecutedEvent)]
+        assert executed == ["fast", "failing", "slow"]
+        started = [event.call_id for event in events if isinstance(event, ToolExecutionStartEvent)]
+        assert started == ["slow", "fast", "failing"]
+        failed = [event for event in events
+                  if isinstance(event, MessagePatchEvent) and event.message_id == dispatches[2].message.id][-1]
+        assert failed.error is not None and "boom" in failed.error
+
+    @pytest.mark.asyncio
+    async def test_limits_concurrent_executions(self, monkeypatch: pytest.MonkeyPatch):
+        dispatcher = make_dispatcher(monkeypatch, 1, {"first": 0.05, "second": 0.01})
+
+        events = [event async for event in execute_stream(dispatcher, make_dispatches("first", "second"))]
+
+        order = [(type(event).__name__, event.call_id) for event in events
+                 if isinstance(event, (ToolExecutionStartEvent, ToolExecutedEvent))]
+        assert order == [
+            ("ToolExecutionStartEvent", "first"), ("ToolExecutedEvent", "first"),
+            ("ToolExecutionStartEvent", "second"), ("ToolExecutedEvent", "second"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_reports_progress_of_long_running_tools(self, monkeypatch: pytest.MonkeyPatch):
+        dispatcher = make_dispatcher(monkeypatch, 4, {"slow": 0.12})
+        dispatcher.PROGRESS_INTERVAL = 0.05
+
+        events = [event async for event in execute_stream(dispatcher, make_dispatches("slow"))]
+
+        progress = [event for event in events if isinstance(event, ToolExecutionProgressEvent)]
+        assert len(progress) == 2
+        assert isinstance(events[-1], MessagePatchEvent)
+
+    @pytest.mark.asyncio
+    async def test_approved_calls_run_during_the_audit(self, monkeypatch: pytest.MonkeyPatch):
+        dispatcher = make_dispatcher(monkeypatch, 4, {"approved": 0.01, "safe": 0.01, "risky": 0.01})
+        audit_released = asyncio.Event()
+        safe, risky = make_dispatches("safe", "risky")
+        async def fake_audit(dispatches):
+            await audit_released.wait()
+            return [risky], [safe]
+        dispatcher._tool_call_reviewer = SimpleNamespace(audit_tool_calls=fake_audit)
+        result = make_result()
+
+        stream = dispatcher._execute_stream(make_dispatches("approved"), [safe, risky], result)
+        events = []
+        async for event in stream:
+            events.append(event)
+            if isinstance(event, ToolExecutedEvent) and event.call_id == "approved":
+                audit_released.set()
+
+        executed = [event.call_id for event in events if isinstance(event, ToolExecutedEvent)]
+        assert executed == ["approved", "safe"]
+        blocked = [event.call_id for event in events if isinstance(event, ToolRequirePermissionEvent)]
+        assert blocked == ["risky"]
+        assert result.has_blocked_tool_calls
+
+    @pytest.mark.asyncio
+    async def test_failed_audit_blocks_its_calls(self, monkeypatch: pytest.MonkeyPatch):
+        dispatcher = make_dispatcher(monkeypatch, 4, {"approved": 0.01})
+        async def failing_audit(dispatches):
+            raise RuntimeError("audit unavailable")
+        dispatcher._tool_call_reviewer = SimpleNamespace(audit_tool_calls=failing_audit)
+        result = make_result()
+
+        stream = dispatcher._execute_stream(make_dispatches("approved"), make_dispatches("first", "second"), result)
+        events = [event async for event in stream]
+
+        executed = [event.call_id for event in events if isinstance(event, ToolExecutedEvent)]
+        assert executed == ["approved"]
+        blocked = [event.call_id for event in events if isinstance(event, ToolRequirePermissionEvent)]
+        assert blocked == ["first", "second"]
+        assert result.has_blocked_tool_calls
@@ -0,0 +1,71 @@
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from dais_sdk.types import ToolMessage
+
+from src.agent.task.tool_call_manager import tool_result_offloader as offloader_module
+from src.agent.task.tool_call_manager.tool_result_offloader import OFFLOAD_THRESHOLD, ToolResultOffloader
+from src.schemas.tasks import runtime as task_runtime_schemas
+
+
+@asynccontextmanager
+async def fake_db_context():
+    yield MagicMock()
+
+def make_resource_service() -> MagicMock:
+    service = MagicMock()
+    service.save_task_resource = AsyncMock(return_value=SimpleNamespace(id=7, filename="result.txt"))
+    service.get_task_resource_path = AsyncMock(return_value="/data/result.txt")
+    return service
+
+def make_message(result: str) -> ToolMessage:
+    return ToolMessage(call_id="1", name="read_file", arguments={}, result=result)
+
+
+@pytest.mark.integration
+class TestToolResultOffloader:
+    def test_preview_keeps_head_and_tail_lines(self):
+        result = "\n".join(f"line {index}" for index in range(10000))
+        preview = ToolResultOffloader.format_preview(result, "/data/result.txt")
+
+        assert preview.startswith("line 0\n")
+        assert preview.endswith("line 9999")
+        assert "/data/result.txt" in preview
+        assert len(preview) < OFFLOAD_THRESHOLD
+
+    def test_preview_of_single_line_result_reads_by_characters(self):
+        result = '{"items":[' + ",".join(f'"item {index}"' for index in range(10000)) + "]}"
+        preview = ToolResultOffloader.format_preview(result, "/data/result.txt")
+
+        assert "1 lines" in preview
+        assert f"chunks of {OFFLOAD_THRESHOLD // 2} characters" in preview
+        assert len(preview) < OFFLOAD_THRESHOLD
+
+    @pytest.mark.asyncio
+    async def test_offload_large_result(self):
+        service = make_resource_service()
+        message = make_message("x" * (OFFLOAD_THRESHOLD + 1))
+
+        with (
+            patch.object(offloader_module, "db_context", fake_db_context),
+            patch.object(offloader_module.TaskResourceService, "from_db_session", return_value=service),
+        ):
+            offloaded = await ToolResultOffloader(1, task_runtime_schemas.TaskType.TASK).offload(message)
+
+        assert offloaded
+        saved_bytes = service.save_task_resource.await_args.args[2]
+        assert saved_bytes == b"x" * (OFFLOAD_THRESHOLD + 1)
+        assert isinstance(message.result, str) and len(message.result) < OFFLOAD_THRESHOLD
+        assert message.metadata["offloaded_result"]["resource_id"] == 7
+
+    @pytest.mark.asyncio
+    async def test_small_result_is_kept_inline(self):
+        message = make_message("small")
+        with patch.object(offloader_module, "db_context") as db_context:
+            offloaded = await ToolResultOffloader(1, task_runtime_schemas.TaskType.TASK).offload(message)
+
+        assert not offloaded
+        assert message.result == "small"
+        db_context.assert_not_called()
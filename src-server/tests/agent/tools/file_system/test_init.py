@@ -7,6 +7,7 @@ import src.agent.tool.builtin_tools.file_system as file_system_module
 from src.agent.tool.builtin_tools.file_system import FileSystemToolset
 from src.agent.tool.toolset_wrapper import BuiltinToolsetContext
 from src.agent.types import ContextUsage
+from src.services.markdown_cache import MarkdownCacheLookup
 
 
 CONVERTABLE_EXTENSIONS = ["pdf", "docx", "pptx", "xlsx", "epub"]
@@ -51,7 +52,10 @@ class TestMarkitdownConvertableBinaryDetection:
             def from_db_session(cls, db_session, workspace_id: int, cwd: Path):
                 return cls(db_session, workspace_id, cwd)
 
-            async def get(self, path: Path) -> str | None:
+            async def lookup(self, path: Path) -> MarkdownCacheLookup | None:
+                return MarkdownCacheLookup(source_path=path.as_posix(), hash="hash", source_stat="", content=None)
+
+            async def record(self, lookup: MarkdownCacheLookup) -> None:
                 return None
 
             async def set(self, path: Path, content: str) -> None:
@@ -7,6 +7,7 @@ import pytest
 import src.agent.tool.builtin_tools.file_system as file_system_module
 from dais_sdk.types import AudioBlock, ImageBlock, VideoBlock
 from src.agent.tool.builtin_tools.file_system import FileSystemToolset, MAX_MEDIA_CONTENT_BLOCK_BYTES
+from src.services.markdown_cache import MarkdownCacheLookup
 
 
 class FileContentResult:
@@ -66,6 +67,18 @@ class TestReadFile:
         assert int(root.attrib["total_lines"]) == 4
         assert text == "Line 2\nLine 3"
 
+    @pytest.mark.asyncio
+    async def test_read_single_line_file_by_characters(self, builtin_toolset_context, temp_workspace):
+        content = "".join(str(index % 10) for index in range(25000))
+        (temp_workspace / "minified.json").write_text(content)
+        tool = FileSystemToolset(builtin_toolset_context)
+
+        result = await tool.read_file("minified.json", char_offset=20000, max_chars=10000)
+        root, text = parse_file_content_xml(result)
+
+        assert root.attrib == {"start_char": "20000", "end_char": "25000", "total_chars": "25000"}
+        assert text == content[20000:]
+
     @pytest.mark.asyncio
     @pytest.mark.parametrize(
         ("filename", "content", "detected_group", "detected_mime_type", "expected_block_type"),
@@ -165,7 +178,10 @@ class TestReadFile:
             def from_db_session(cls, db_session, workspace_id: int, cwd: Path):
                 return cls(db_session, workspace_id, cwd)
 
-            async def get(self, path: Path) -> str | None:
+            async def lookup(self, path: Path) -> MarkdownCacheLookup | None:
+                return MarkdownCacheLookup(source_path=path.as_posix(), hash="hash", source_stat="", content=None)
+
+            async def record(self, lookup: MarkdownCacheLookup) -> None:
                 return None
 
             async def set(self, path: Path, content: str) -> None:
@@ -209,8 +225,11 @@ class TestReadFile:
             def from_db_session(cls, db_session, workspace_id: int, cwd: Path):
                 return cls(db_session, workspace_id, cwd)
 
-            async def get(self, path: Path) -> str | None:
-                return cache_store.get(path.relative_to(self._cwd).as_posix())
+            async def lookup(self, path: Path) -> MarkdownCacheLookup | None:
+                return MarkdownCacheLookup(source_path=path.as_posix(), hash="hash", source_stat="", content=cache_store.get(path.relative_to(self._cwd).as_posix()))
+
+            async def record(self, lookup: MarkdownCacheLookup) -> None:
+                return None
 
             async def set(self, path: Path, content: str) -> None:
                 cache_store[path.relative_to(self._cwd).as_posix()] = content
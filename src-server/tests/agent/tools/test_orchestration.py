@@ -1,11 +1,31 @@
+import asyncio
 import xml.etree.ElementTree as ET
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from src.agent.tool.builtin_tools.orchestration import compose_subtask_result
+from src.agent import task as task_module
+from src.agent.context import AgentContext
+from src.agent.task import SubtaskExecutor
+from src.agent.tool.builtin_tools import orchestration as orchestration_module
+from src.agent.tool.builtin_tools.orchestration import OrchestrationToolset, SubtaskSpec, compose_subtask_result
 from src.agent.types import TaskFinished
 
 
+@pytest.fixture
+def subtask_service(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    @asynccontextmanager
+    async def fake_db_context():
+        yield None
+    service = MagicMock()
+    service.create = AsyncMock(side_effect=lambda data: SimpleNamespace(id=len(service.create.mock_calls), agent_id=data.agent_id))
+    monkeypatch.setattr(orchestration_module, "db_context", fake_db_context)
+    monkeypatch.setattr(orchestration_module.SubtaskService, "from_db_session", lambda _: service)
+    return service
+
+
 @pytest.mark.tool
 class TestSubtaskResult:
     def test_finished_result_includes_assistant_message_before_summary(self):
@@ -37,3 +57,82 @@ class TestSubtaskResult:
         assert root.attrib == {"subtask_id": "8", "status": "finished"}
         assert root.text == "Concise completion summary."
 
+
+
+@pytest.mark.tool
+class TestCreateSubtasks:
+    @pytest.mark.asyncio
+    async def test_invalid_agent_creates_no_subtask(self, builtin_toolset_context, subtask_service, monkeypatch):
+        async def load_resource(agent_id: int, workspace_id: int):
+            if agent_id == 2:
+                raise LookupError(f"Agent {agent_id} not found")
+            return SimpleNamespace(agent_id=agent_id)
+        monkeypatch.setattr(AgentContext, "load_resource", load_resource)
+        tool = OrchestrationToolset(builtin_toolset_context)
+
+        with pytest.raises(LookupError):
+            await tool.create_subtasks([
+                SubtaskSpec(agent_id=1, instruction="first"),
+                SubtaskSpec(agent_id=2, instruction="second"),
+            ])
+
+        subtask_service.create.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_rejects_too_many_subtasks(self, builtin_toolset_context, subtask_service, monkeypatch):
+        load_resource = AsyncMock(return_value=None)
+        monkeypatch.setattr(AgentContext, "load_resource", load_resource)
+        tool = OrchestrationToolset(builtin_toolset_context)
+
+        with pytest.raises(ValueError):
+            await tool.create_subtasks([
+                SubtaskSpec(agent_id=1, instruction=str(index))
+                for index in range(orchestration_module.MAX_PARALLEL_SUBTASKS + 1)
+            ])
+
+        load_resource.assert_not_awaited()
+        subtask_service.create.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_results_follow_the_order_of_the_specs(self, builtin_toolset_context, subtask_service, monkeypatch):
+        monkeypatch.setattr(AgentContext, "load_resource", AsyncMock(return_value=None))
+        executor = SubtaskExecutor()
+        monkeypatch.setattr(task_module, "use_subtask_executor", lambda: executor)
+        tool = OrchestrationToolset(builtin_toolset_context)
+
+        async def run_new_subtask(subtask, agent_id, resource=None):
+            # the first subtask completes last
+            await asyncio.sleep(0.05 if subtask.id == 1 else 0)
+            return f'<subtask_result subtask_id="{subtask.id}" status="finished">{agent_id}</subtask_result>'
+        monkeypatch.setattr(tool, "_run_new_subtask", run_new_subtask)
+
+        result = await tool.create_subtasks([
+            SubtaskSpec(agent_id=3, instruction="slow"),
+            SubtaskSpec(agent_id=4, instruction="fast"),
+        ])
+
+        root = ET.fromstring(result)
+        assert [(element.attrib["subtask_id"], element.text) for element in root] == [("1", "3"), ("2", "4")]
+
+
+@pytest.mark.tool
+class TestFollowupSubtask:
+    @pytest.mark.asyncio
+    async def test_runs_in_a_slot_of_the_parent_task(self, builtin_toolset_context, subtask_service, monkeypatch):
+        subtask_service.get_by_id = AsyncMock(return_value=SimpleNamespace(id=7, agent_id=1))
+        executor = SubtaskExecutor()
+        monkeypatch.setattr(task_module, "use_subtask_executor", lambda: executor)
+        @asynccontextmanager
+        async def lease(task_type, task_id, agent_id, factory):
+            yield MagicMock()
+        monkeypatch.setattr(task_module, "use_task_registry", lambda: SimpleNamespace(lease=lease))
+        parent_slots = []
+        async def run_subtask(task):
+            parent_slots.append(list(executor._task_slots))
+            return "<subtask_result/>"
+        monkeypatch.setattr(orchestration_module, "run_subtask", run_subtask)
+        tool = OrchestrationToolset(builtin_toolset_context)
+
+        await tool.followup_subtask(7, "continue")
+
+        assert parent_slots == [[builtin_toolset_context.task_id]]
@@ -0,0 +1,64 @@
+import asyncio
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from watchfiles import Change as ChangeType
+
+from src.agent.utils import document_preconverter as preconverter_module
+from src.agent.utils.document_preconverter import DocumentPreconverter
+from src.utils import ConversionExecutor
+
+
+class FakeWatcher:
+    instances: list["FakeWatcher"] = []
+
+    def __init__(self, directory, on_changes):
+        self.on_changes = on_changes
+        FakeWatcher.instances.append(self)
+
+    async def start(self): ...
+    async def stop(self): ...
+
+
+@pytest.fixture
+def preconverter(monkeypatch: pytest.MonkeyPatch) -> DocumentPreconverter:
+    settings_manager = SimpleNamespace(settings=SimpleNamespace(document_preconversion=True))
+    monkeypatch.setattr(preconverter_module, "use_app_setting_manager", lambda: settings_manager)
+    monkeypatch.setattr(preconverter_module, "DirectoryWatcher", FakeWatcher)
+    executor = ConversionExecutor()
+    monkeypatch.setattr(preconverter_module, "use_conversion_executor", lambda: executor)
+    FakeWatcher.instances.clear()
+    return DocumentPreconverter()
+
+
+class TestDocumentPreconverter:
+    @pytest.mark.asyncio
+    async def test_converts_scanned_and_changed_documents(self, preconverter: DocumentPreconverter, tmp_path: Path):
+        (tmp_path / "docs").mkdir()
+        (tmp_path / "docs" / "report.pdf").write_bytes(b"pdf")
+        (tmp_path / "notes.txt").write_text("text")
+        converted: list[Path] = []
+        async def fake_convert(workspace, path: Path):
+            converted.append(path)
+        preconverter._convert = fake_convert  # type: ignore[method-assign]
+
+        preconverter.start()
+        preconverter.activate(1, tmp_path)
+        await asyncio.sleep(0.1)
+        assert converted == [tmp_path / "docs" / "report.pdf"]
+
+        await FakeWatcher.instances[0].on_changes([
+            (ChangeType.added, str(tmp_path / "slides.pptx")),
+            (ChangeType.deleted, str(tmp_path / "old.docx")),
+            (ChangeType.modified, str(tmp_path / "notes.txt")),
+        ])
+        await asyncio.sleep(0.1)
+        assert converted[1:] == [tmp_path / "slides.pptx"]
+        await preconverter.close()
+
+    @pytest.mark.asyncio
+    async def test_activate_is_noop_until_started(self, preconverter: DocumentPreconverter, tmp_path: Path):
+        preconverter.activate(1, tmp_path)
+
+        assert FakeWatcher.instances == []
@@ -0,0 +1,62 @@
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from dais_sdk.providers import LlmProviders
+
+from src.agent.utils.provider_pool import ProviderPool
+
+
+@pytest.fixture
+def create_provider(monkeypatch: pytest.MonkeyPatch) -> MagicMock:
+    def _create(provider_type, base_url, api_key):
+        provider = MagicMock()
+        provider.close = AsyncMock()
+        return provider
+
+    mock = MagicMock(side_effect=_create)
+    monkeypatch.setattr("src.agent.utils.provider_pool.LLM.create_provider", mock)
+    return mock
+
+
+class TestProviderPool:
+    @pytest.mark.asyncio
+    async def test_reuses_provider_for_same_key(self, create_provider: MagicMock):
+        pool = ProviderPool()
+
+        async with pool.lease(LlmProviders.OPENAI, "https://a", "key") as first:
+            pass
+        async with pool.lease(LlmProviders.OPENAI, "https://a", "key") as second:
+            pass
+        async with pool.lease(LlmProviders.OPENAI, "https://a", "other-key") as third:
+            pass
+
+        assert first is second
+        assert third is not first
+        assert create_provider.call_count == 2
+        first.close.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_closes_least_recently_used_provider_over_capacity(self, create_provider: MagicMock):
+        pool = ProviderPool(capacity=1)
+
+        async with pool.lease(LlmProviders.OPENAI, "https://a", "key") as first:
+            pass
+        async with pool.lease(LlmProviders.OPENAI, "https://b", "key") as second:
+            async with pool.lease(LlmProviders.OPENAI, "https://c", "key") as third:
+                pass
+            # the leased provider is kept even when over capacity
+            third.close.assert_awaited_once()
+            second.close.assert_not_awaited()
+        first.close.assert_awaited_once()
+
+        await pool.close()
+        second.close.assert_awaited_once()
+
+    @pytest.mark.asyncio
+    async def test_closes_idle_provider(self, create_provider: MagicMock):
+        pool = ProviderPool(idle_timeout=0)
+
+        async with pool.lease(LlmProviders.ANTHROPIC, "https://a", "key") as provider:
+            pass
+
+        provider.close.assert_awaited_once()
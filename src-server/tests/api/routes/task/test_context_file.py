@@ -1,6 +1,7 @@
 from pathlib import Path
 
 import pytest
+from rapidfuzz import fuzz
 
 from src.api.exceptions import ApiError, ApiErrorCode
 from src.api.routes.tasks.context_file import (
@@ -148,7 +149,7 @@ class TestSearchFile:
             assert scan_limit == 10_000
             return scan_result
 
-        def fake_wratio(actual_query: str, value: str):
+        def fake_wratio(actual_query: str, value: str, **kwargs):
             assert actual_query == query
             return score_map.get(value, 0)
 
@@ -158,3 +159,23 @@ class TestSearchFile:
         items = _search_file(query, temp_workspace.resolve(), match_limit=match_limit)
 
         assert [item.model_dump() for item in items] == expected_items
+
+    def test_search_file_matches_pairwise_scoring(self, monkeypatch: pytest.MonkeyPatch, temp_workspace: Path):
+        scan_result = [
+            ("context_file.py", "src/api/context_file.py", "file"),
+            ("context", "src/context", "folder"),
+            ("xyz", "xyz", "folder"),
+            ("contest.md", "docs/contest.md", "file"),
+            ("readme.md", "readme.md", "file"),
+        ]
+        monkeypatch.setattr("src.api.routes.tasks.context_file._scan_cached",
+                            lambda root, scan_limit, _slot=0: scan_result)
+
+        items = _search_file("context", temp_workspace.resolve(), match_limit=10)
+
+        expected = sorted(
+            ((max(fuzz.WRatio("context", name), fuzz.WRatio("context", path)), name, path, node_type)
+             for name, path, node_type in scan_result),
+            key=lambda result: result[0], reverse=True)
+        assert [item.name for item in items] == [name for score, name, _, _ in expected if score >= 60]
+        assert "xyz" not in [item.name for item in items]
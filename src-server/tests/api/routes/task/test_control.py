@@ -0,0 +1,28 @@
+from types import SimpleNamespace
+
+import pytest
+
+from src.api.exceptions import ApiError, ApiErrorCode
+from src.api.routes.tasks import control as control_module
+from src.api.routes.tasks.control import ensure_not_running
+from src.schemas.tasks import runtime as task_runtime_schemas
+
+
+TASK = task_runtime_schemas.TaskType.TASK
+
+@pytest.mark.api
+class TestEnsureNotRunning:
+    def test_rejects_changes_while_the_run_is_in_progress(self, monkeypatch: pytest.MonkeyPatch):
+        run = SimpleNamespace(is_running=True)
+        runs = {(TASK, 1): run}
+        monkeypatch.setattr(control_module, "use_task_run_manager",
+                            lambda: SimpleNamespace(get=lambda task_type, task_id: runs.get((task_type, task_id))))
+
+        with pytest.raises(ApiError) as exc_info:
+            ensure_not_running(TASK, 1)
+        assert exc_info.value.status_code == 409
+        assert exc_info.value.error_code == ApiErrorCode.TASK_IS_RUNNING
+
+        ensure_not_running(TASK, 2)
+        run.is_running = False
+        ensure_not_running(TASK, 1)
@@ -0,0 +1,36 @@
+import asyncio
+
+import pytest
+
+from src.agent.types import ScheduleRunCompletedEvent
+from src.api.sse_dispatcher import SseDispatcher
+
+
+def make_event(workspace_id: int, run_record_id: int) -> ScheduleRunCompletedEvent:
+    return ScheduleRunCompletedEvent(
+        event_id="SCHEDULE_RUN_COMPLETED",
+        schedule_id=1,
+        schedule_name="Daily",
+        run_record_id=run_record_id,
+        workspace_id=workspace_id,
+        status="finished",
+    )
+
+
+@pytest.mark.api
+class TestSseDispatcher:
+    @pytest.mark.asyncio
+    async def test_broadcasts_to_every_listener_with_filters(self):
+        dispatcher = SseDispatcher()
+        async def collect(**filters) -> list[tuple[int, int]]:
+            return [(event.id, event.data.run_record_id) async for event in dispatcher.listen(**filters)]
+        everything = asyncio.create_task(collect())
+        workspace_two = asyncio.create_task(collect(workspace_ids={2}))
+        await asyncio.sleep(0)
+
+        await dispatcher.send(make_event(workspace_id=1, run_record_id=10))
+        await dispatcher.send(make_event(workspace_id=2, run_record_id=11))
+        await dispatcher.close()
+
+        assert await everything == [(1, 10), (2, 11)]
+        assert await workspace_two == [(2, 11)]
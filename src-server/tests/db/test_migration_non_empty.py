@@ -1,3 +1,5 @@
+import json
+
 import pytest
 from sqlalchemy import text
 
@@ -154,3 +156,84 @@ def test_upgrade_non_empty_database_to_1c2d5a8b4f90(alembic_runner, alembic_engi
     assert current_revision == "1c2d5a8b4f90"
     assert len(workspace_foreign_keys) == 1
     assert workspace_foreign_keys[0]["on_delete"] == "CASCADE"
+
+
+@pytest.mark.integration
+def test_upgrade_non_empty_database_to_275d8acf7e27(alembic_runner, alembic_engine) -> None:
+    alembic_runner.migrate_up_before("275d8acf7e27")
+
+    with alembic_engine.begin() as conn:
+        conn.execute(
+            text(
+                """
+                INSERT INTO workspaces (id, name, directory, instruction)
+                VALUES (:id, :name, :directory, :instruction)
+                """
+            ),
+            {
+                "id": 1,
+                "name": "workspace-a",
+                "directory": "/tmp/workspace-a",
+                "instruction": "instruction-a",
+            },
+        )
+        conn.execute(
+            text(
+                """
+                INSERT INTO tasks (id, title, usage, messages, last_run_at, agent_id, _workspace_id)
+                VALUES (:id, :title, :usage, :messages, :last_run_at, :agent_id, :workspace_id)
+                """
+            ),
+            {
+                "id": 1,
+                "title": "task-a",
+                "usage": "{}",
+                "messages": '[{"role": "user", "content": "first"}, {"role": "user", "content": "second"}]',
+                "last_run_at": 0,
+                "agent_id": None,
+                "workspace_id": 1,
+            },
+        )
+        conn.execute(
+            text(
+                """
+                INSERT INTO subtasks (id, usage, messages, task_id, agent_id)
+                VALUES (:id, :usage, :messages, :task_id, :agent_id)
+                """
+            ),
+            {
+                "id": 1,
+                "usage": "{}",
+                "messages": '[{"role": "user", "content": "subtask"}]',
+                "task_id": 1,
+                "agent_id": None,
+            },
+        )
+
+    alembic_runner.migrate_up_one()
+
+    with alembic_engine.connect() as conn:
+        current_revision = conn.execute(
+            text("SELECT version_num FROM alembic_version")
+        ).scalar_one()
+        message_rows = conn.execute(
+            text(
+                """
+                SELECT owner_type, owner_id, position, message
+                FROM task_messages
+                ORDER BY owner_type, position
+                """
+            )
+        ).all()
+        task_columns = conn.execute(text("PRAGMA table_info(tasks)")).mappings().all()
+
+    assert current_revision == "275d8acf7e27"
+    assert [
+        (row.owner_type, row.owner_id, row.position, json.loads(row.message)["content"])
+        for row in message_rows
+    ] == [
+        ("SUBTASK", 1, 0, "subtask"),
+        ("TASK", 1, 0, "first"),
+        ("TASK", 1, 1, "second"),
+    ]
+    assert "messages" not in {column["name"] for column in task_columns}
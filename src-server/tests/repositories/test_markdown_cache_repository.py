@@ -1,7 +1,9 @@
 import pytest
+from sqlalchemy import update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.repositories.markdown_cache import MarkdownCacheRepository
+from src.db.models.markdown_cache import MarkdownContent
+from src.repositories.markdown_cache import MarkdownCacheRepository, MarkdownContentRepository
 
 
 @pytest.fixture
@@ -11,38 +13,74 @@ def markdown_cache_repository(
     return MarkdownCacheRepository(db_session)
 
 
+@pytest.fixture
+def markdown_content_repository(
+    db_session: AsyncSession,
+) -> MarkdownContentRepository:
+    return MarkdownContentRepository(db_session)
+
+
 @pytest.mark.integration
 class TestMarkdownCacheRepository:
     @pytest.mark.asyncio
-    async def test_set_updates_existing_cache_without_duplicate(
+    async def test_set_entry_updates_existing_entry_without_duplicate(
         self,
         markdown_cache_repository: MarkdownCacheRepository,
         workspace_factory,
     ):
         workspace = await workspace_factory(name="Workspace A")
 
-        await markdown_cache_repository.set(
+        await markdown_cache_repository.set_entry(
             workspace_id=workspace.id,
-            hash_value="hash",
             source_path="note.md",
-            content="v1",
+            hash_value="hash-v1",
+            source_stat="1:1:1",
         )
-        await markdown_cache_repository.set(
+        await markdown_cache_repository.set_entry(
             workspace_id=workspace.id,
-            hash_value="hash",
             source_path="note.md",
-            content="v2",
+            hash_value="hash-v2",
+            source_stat="2:2:1",
         )
         entries = await markdown_cache_repository.get_entries(workspace.id)
-        cache = await markdown_cache_repository.get(
+        entry = await markdown_cache_repository.get_entry(
             workspace_id=workspace.id,
-            hash_value="hash",
             source_path="note.md",
         )
 
         assert len(entries) == 1
-        assert cache is not None
-        assert cache.content == "v2"
+        assert entry is not None
+        assert entry.hash == "hash-v2"
+        assert entry.source_stat == "2:2:1"
+
+    @pytest.mark.asyncio
+    async def test_set_content_updates_existing_content(
+        self,
+        markdown_content_repository: MarkdownContentRepository,
+    ):
+        await markdown_content_repository.set_content(hash_value="hash", content="v1")
+        await markdown_content_repository.set_content(hash_value="hash", content="v22")
+
+        cached = await markdown_content_repository.get_content("hash")
+        assert cached is not None and cached[0] == "v22"
+        assert await markdown_content_repository.get_content("missing") is None
+        assert await markdown_content_repository.get_total_size() == 3
+
+    @pytest.mark.asyncio
+    async def test_get_content_is_read_only_and_touch_records_the_use(
+        self,
+        db_session: AsyncSession,
+        markdown_content_repository: MarkdownContentRepository,
+    ):
+        await markdown_content_repository.set_content(hash_value="hash", content="content")
+        await db_session.execute(update(MarkdownContent).values(last_used_at=1))
+
+        assert await markdown_content_repository.get_content("hash") == ("content", 1)
+        # the lookup left the last use untouched
+        assert await markdown_content_repository.get_content("hash") == ("content", 1)
+
+        await markdown_content_repository.touch("hash", 100)
+        assert await markdown_content_repository.get_content("hash") == ("content", 100)
 
     @pytest.mark.asyncio
     async def test_delete_by_ids_removes_only_selected_entries(
@@ -51,17 +89,17 @@ class TestMarkdownCacheRepository:
         workspace_factory,
     ):
         workspace = await workspace_factory(name="Workspace A")
-        await markdown_cache_repository.set(
+        await markdown_cache_repository.set_entry(
             workspace_id=workspace.id,
-            hash_value="hash-a",
             source_path="a.md",
-            content="A",
+            hash_value="hash-a",
+            source_stat=None,
         )
-        await markdown_cache_repository.set(
+        await markdown_cache_repository.set_entry(
             workspace_id=workspace.id,
-            hash_value="hash-b",
             source_path="b.md",
-            content="B",
+            hash_value="hash-b",
+            source_stat=None,
         )
         entries = await markdown_cache_repository.get_entries(workspace.id)
 
@@ -0,0 +1,80 @@
+import pytest
+from dais_sdk.types import UserMessage
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models import tasks as task_models
+from src.repositories.tasks.message import TaskMessageRepository
+
+
+@pytest.fixture
+def task_message_repository(db_session: AsyncSession) -> TaskMessageRepository:
+    return TaskMessageRepository(db_session)
+
+
+@pytest.mark.integration
+class TestTaskMessageRepository:
+    @pytest.mark.asyncio
+    async def test_upsert_overwrites_and_appends_by_position(
+        self,
+        task_message_repository: TaskMessageRepository,
+    ):
+        owner_type = task_models.TaskResourceOwnerType.TASK
+        await task_message_repository.upsert(owner_type, 1, [
+            (0, UserMessage(content="first")),
+            (1, UserMessage(content="second")),
+        ])
+        await task_message_repository.upsert(owner_type, 1, [
+            (1, UserMessage(content="edited")),
+            (2, UserMessage(content="third")),
+        ])
+
+        messages = await task_message_repository.get_all(owner_type, 1)
+
+        assert [message.content for message in messages] == ["first", "edited", "third"]
+
+    @pytest.mark.asyncio
+    async def test_truncate_only_affects_the_target_owner(
+        self,
+        task_message_repository: TaskMessageRepository,
+    ):
+        task_owner = task_models.TaskResourceOwnerType.TASK
+        subtask_owner = task_models.TaskResourceOwnerType.SUBTASK
+        await task_message_repository.replace_all(task_owner, 1, [
+            UserMessage(content="a"),
+            UserMessage(content="b"),
+        ])
+        await task_message_repository.replace_all(subtask_owner, 1, [
+            UserMessage(content="c"),
+            UserMessage(content="d"),
+        ])
+
+        await task_message_repository.truncate(task_owner, 1, 1)
+
+        task_messages = await task_message_repository.get_all(task_owner, 1)
+        subtask_messages = await task_message_repository.get_all(subtask_owner, 1)
+        assert [message.content for message in task_messages] == ["a"]
+        assert [message.content for message in subtask_messages] == ["c", "d"]
+
+    @pytest.mark.asyncio
+    async def test_delete_orphans_removes_messages_of_missing_owners(
+        self,
+        task_message_repository: TaskMessageRepository,
+        workspace_factory,
+        task_factory,
+    ):
+        workspace = await workspace_factory(name="Workspace A")
+        task = await task_factory(
+            workspace=workspace,
+            messages=[UserMessage(content="kept")],
+        )
+        owner_type = task_models.TaskResourceOwnerType.TASK
+        await task_message_repository.upsert(owner_type, task.id + 1, [
+            (0, UserMessage(content="orphan")),
+        ])
+
+        await task_message_repository.delete_orphans()
+
+        kept = await task_message_repository.get_all(owner_type, task.id)
+        orphan = await task_message_repository.get_all(owner_type, task.id + 1)
+        assert [message.content for message in kept] == ["kept"]
+        assert orphan == []
@@ -2,12 +2,12 @@ from pathlib import Path
 
 import pytest
 import pytest_asyncio
-from sqlalchemy import func, select
+from sqlalchemy import func, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.db.models.markdown_cache import MarkdownCache
+from src.db.models.markdown_cache import MarkdownCache, MarkdownContent
 from src.db.models.workspace import Workspace
-from src.services.markdown_cache import MarkdownCacheService
+from src.services.markdown_cache import MarkdownCacheService, MarkdownContentService
 
 
 @pytest_asyncio.fixture
@@ -113,9 +113,10 @@ class TestMarkdownCacheService:
         await db_session.flush()
 
         caches = (await db_session.scalars(select(MarkdownCache).order_by(MarkdownCache.source_path))).all()
+        content = await db_session.scalar(select(MarkdownContent.content).where(MarkdownContent.hash == caches[0].hash))
 
         assert [cache.source_path for cache in caches] == ["existing.md"]
-        assert [cache.content for cache in caches] == ["existing cache"]
+        assert content == "existing cache"
 
     @pytest.mark.asyncio
     async def test_get_and_set_ignore_absolute_path_outside_workspace(
@@ -138,3 +139,118 @@ class TestMarkdownCacheService:
 
         assert cache_count == 0
         assert result is None
+
+    @pytest.mark.asyncio
+    async def test_get_reuses_hash_while_file_stat_is_unchanged(
+        self,
+        db_session: AsyncSession,
+        persisted_workspace: Workspace,
+        temp_workspace: Path,
+        mocker,
+    ):
+        source_path = temp_workspace / "doc.pdf"
+        source_path.write_bytes(b"pdf v1")
+        service = MarkdownCacheService.from_db_session(db_session, workspace_id=persisted_workspace.id, cwd=temp_workspace)
+        await service.set(Path("doc.pdf"), "converted v1")
+        hash_file = mocker.spy(MarkdownCacheService, "_hash_file")
+
+        assert await service.get(Path("doc.pdf")) == "converted v1"
+        assert hash_file.call_count == 0
+
+        source_path.write_bytes(b"pdf v2, longer")
+        assert await service.get(Path("doc.pdf")) is None
+        assert hash_file.call_count == 1
+
+    @pytest.mark.asyncio
+    async def test_get_does_not_record_new_files(
+        self,
+        db_session: AsyncSession,
+        persisted_workspace: Workspace,
+        temp_workspace: Path,
+    ):
+        (temp_workspace / "new.pdf").write_bytes(b"new document")
+        service = MarkdownCacheService.from_db_session(db_session, workspace_id=persisted_workspace.id, cwd=temp_workspace)
+
+        assert await service.get(Path("new.pdf")) is None
+
+        assert not db_session.new and not db_session.dirty
+        assert await db_session.scalar(select(func.count()).select_from(MarkdownCache)) == 0
+
+    @pytest.mark.asyncio
+    async def test_identical_documents_share_one_conversion(
+        self,
+        db_session: AsyncSession,
+        persisted_workspace: Workspace,
+        temp_workspace: Path,
+    ):
+        (temp_workspace / "a.pdf").write_bytes(b"same document")
+        (temp_workspace / "b.pdf").write_bytes(b"same document")
+        service = MarkdownCacheService.from_db_session(db_session, workspace_id=persisted_workspace.id, cwd=temp_workspace)
+
+        await service.set(Path("a.pdf"), "shared markdown")
+
+        assert await service.get(Path("b.pdf")) == "shared markdown"
+        content_count = await db_session.scalar(select(func.count()).select_from(MarkdownContent))
+        assert content_count == 1
+
+    @pytest.mark.asyncio
+    async def test_contents_are_evicted_least_recently_used_first(
+        self,
+        db_session: AsyncSession,
+        monkeypatch: pytest.MonkeyPatch,
+    ):
+        monkeypatch.setattr(MarkdownContentService, "MAX_TOTAL_SIZE", 10)
+        service = MarkdownContentService.from_db_session(db_session)
+        await service.set("hash-a", "aaaa")
+        await service.set("hash-b", "bbbb")
+        await db_session.execute(update(MarkdownContent).where(MarkdownContent.hash == "hash-a").values(last_used_at=1))
+
+        await service.set("hash-c", "cccc")
+
+        assert await service.get("hash-a") is None
+        assert await service.get("hash-b") == "bbbb"
+        assert await service.get("hash-c") == "cccc"
+
+    @pytest.mark.asyncio
+    async def test_lookup_leaves_the_touch_of_a_stale_content_to_record(
+        self,
+        db_session: AsyncSession,
+        persisted_workspace: Workspace,
+        temp_workspace: Path,
+    ):
+        (temp_workspace / "doc.pdf").write_bytes(b"document")
+        service = MarkdownCacheService.from_db_session(db_session, workspace_id=persisted_workspace.id, cwd=temp_workspace)
+        await service.set(Path("doc.pdf"), "converted")
+
+        fresh = await service.lookup(Path("doc.pdf"))
+        assert fresh is not None and fresh.content == "converted" and not fresh.needs_record
+
+        await db_session.execute(update(MarkdownContent).values(last_used_at=1))
+        stale = await service.lookup(Path("doc.pdf"))
+        assert stale is not None and stale.needs_record
+        assert await db_session.scalar(select(MarkdownContent.last_used_at)) == 1
+
+        await service.record(stale)
+        assert await db_session.scalar(select(MarkdownContent.last_used_at)) > 1
+
+    @pytest.mark.asyncio
+    async def test_hit_of_a_touched_file_records_its_stat(
+        self,
+        db_session: AsyncSession,
+        persisted_workspace: Workspace,
+        temp_workspace: Path,
+        mocker,
+    ):
+        (temp_workspace / "a.pdf").write_bytes(b"same document")
+        (temp_workspace / "b.pdf").write_bytes(b"same document")
+        service = MarkdownCacheService.from_db_session(db_session, workspace_id=persisted_workspace.id, cwd=temp_workspace)
+        await service.set(Path("a.pdf"), "shared markdown")
+        hash_file = mocker.spy(MarkdownCacheService, "_hash_file")
+
+        lookup = await service.lookup(Path("b.pdf"))
+        assert lookup is not None and lookup.content == "shared markdown" and lookup.needs_record
+        await service.record(lookup)
+
+        again = await service.lookup(Path("b.pdf"))
+        assert again is not None and again.content == "shared markdown" and not again.needs_record
+        assert hash_file.call_count == 1
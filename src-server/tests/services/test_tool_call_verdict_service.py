@@ -0,0 +1,58 @@
+import time
+
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.db.models.workspace import Workspace
+from src.services.tool_call_verdict import ToolCallVerdictService
+
+
+@pytest.fixture
+def tool_call_verdict_service(db_session: AsyncSession) -> ToolCallVerdictService:
+    return ToolCallVerdictService.from_db_session(db_session)
+
+
+@pytest_asyncio.fixture
+async def persisted_workspaces(db_session: AsyncSession) -> tuple[Workspace, Workspace]:
+    workspaces = (
+        Workspace(name="Workspace A", directory="/tmp/workspace-a", instruction="",
+                  usable_agents=[], usable_tools=[], usable_skills=[]),
+        Workspace(name="Workspace B", directory="/tmp/workspace-b", instruction="",
+                  usable_agents=[], usable_tools=[], usable_skills=[]),
+    )
+    db_session.add_all(workspaces)
+    await db_session.flush()
+    return workspaces
+
+
+@pytest.mark.service
+@pytest.mark.integration
+class TestToolCallVerdictService:
+    @pytest.mark.asyncio
+    async def test_set_and_get_verdict(self,
+                                       tool_call_verdict_service: ToolCallVerdictService,
+                                       persisted_workspaces: tuple[Workspace, Workspace]):
+        workspace, other_workspace = persisted_workspaces
+        await tool_call_verdict_service.set(workspace.id, "fingerprint", tool_name="shell", risk_level=10, reason="read only")
+        await tool_call_verdict_service.set(workspace.id, "fingerprint", tool_name="shell", risk_level=20, reason="updated")
+
+        verdict = await tool_call_verdict_service.get(workspace.id, "fingerprint")
+
+        assert verdict is not None
+        assert (verdict.risk_level, verdict.reason) == (20, "updated")
+        assert await tool_call_verdict_service.get(workspace.id, "missing") is None
+        assert await tool_call_verdict_service.get(other_workspace.id, "fingerprint") is None
+
+    @pytest.mark.asyncio
+    async def test_expired_verdicts_are_ignored_and_cleaned_up(self,
+                                                               tool_call_verdict_service: ToolCallVerdictService,
+                                                               persisted_workspaces: tuple[Workspace, Workspace]):
+        workspace, _ = persisted_workspaces
+        expired_at = int(time.time()) - ToolCallVerdictService.TTL - 1
+        await tool_call_verdict_service.set(workspace.id, "expired", tool_name="shell", risk_level=10, reason="old", created_at=expired_at)
+        await tool_call_verdict_service.set(workspace.id, "fresh", tool_name="shell", risk_level=10, reason="new")
+
+        assert await tool_call_verdict_service.get(workspace.id, "expired") is None
+        assert await tool_call_verdict_service.cleanup_expired() == 1
+        assert await tool_call_verdict_service.get(workspace.id, "fresh") is not None
@@ -120,6 +120,36 @@ class TestWorkspaceService:
         assert {a.id for a in updated.usable_agents} == {new_agent.id}
         assert {t.id for t in updated.usable_tools} == {new_tool.id}
 
+    @pytest.mark.asyncio
+    async def test_update_workspace_tool_call_rules(self, workspace_service: WorkspaceService):
+        workspace = await workspace_service.create(
+            workspace_schemas.WorkspaceCreate(
+                name="Workspace A",
+                directory="/tmp/workspace-a",
+                instruction="",
+                notes=[],
+                usable_agent_ids=[],
+                usable_tool_ids=[],
+                usable_skill_ids=[],
+            )
+        )
+        assert workspace.tool_call_rules == []
+
+        rule = workspace_schemas.ToolCallRule(tool="shell", arguments={"script": r"^make test$"}, action="allow")
+        updated = await workspace_service.update(
+            workspace.id,
+            workspace_schemas.WorkspaceUpdate(
+                name=None,
+                directory=None,
+                instruction=None,
+                tool_call_rules=[rule],
+                usable_agent_ids=None,
+                usable_tool_ids=None,
+            ),
+        )
+
+        assert workspace_schemas.WorkspaceRead.model_validate(updated).tool_call_rules == [rule]
+
     @pytest.mark.asyncio
     async def test_update_workspace_notes_rejects_running_workspace(
         self,
@@ -233,7 +263,6 @@ class TestWorkspaceService:
         db_session.add(schedule)
         cache = MarkdownCache(
             hash="cache-hash",
-            content="cached markdown",
             source_path="note.md",
             workspace_id=workspace.id,
         )
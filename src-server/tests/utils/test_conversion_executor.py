@@ -0,0 +1,82 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+import src.settings
+from src.utils import conversion_executor as conversion_executor_module
+from src.utils.conversion_executor import ConversionExecutor, ConversionJob, SourceTooLargeError
+
+
+def patch_run(executor: ConversionExecutor, release: asyncio.Event, calls: list[str | bytes]):
+    async def fake_run(job: ConversionJob, source: str | bytes) -> str:
+        calls.append(source)
+        job.state = "running"
+        await release.wait()
+        return f"converted {job.key}"
+    executor._run = fake_run  # type: ignore[method-assign]
+
+
+class TestConversionExecutor:
+    @pytest.mark.asyncio
+    async def test_identical_conversions_share_one_job(self):
+        executor = ConversionExecutor(max_workers=1)
+        release = asyncio.Event()
+        calls: list[str | bytes] = []
+        patch_run(executor, release, calls)
+
+        first = asyncio.create_task(executor.convert(b"document", key="checksum"))
+        second = asyncio.create_task(executor.convert(b"document", key="checksum"))
+        await asyncio.sleep(0.05)
+        assert [job.waiters for job in executor.jobs()] == [2]
+        release.set()
+
+        assert await asyncio.gather(first, second) == ["converted checksum", "converted checksum"]
+        assert calls == [b"document"]
+        assert executor.jobs() == []
+
+    @pytest.mark.asyncio
+    async def test_job_is_cancelled_when_the_last_caller_leaves(self):
+        executor = ConversionExecutor(max_workers=1)
+        release = asyncio.Event()
+        calls: list[str | bytes] = []
+        patch_run(executor, release, calls)
+
+        first = asyncio.create_task(executor.convert(b"document"))
+        second = asyncio.create_task(executor.convert(b"document"))
+        await asyncio.sleep(0.05)
+        job = executor.jobs()[0]
+
+        first.cancel()
+        await asyncio.sleep(0)
+        assert job.task is not None and not job.task.cancelled()
+        second.cancel()
+        await asyncio.gather(first, second, return_exceptions=True)
+        await asyncio.sleep(0)
+
+        assert job.task.cancelled()
+        assert executor.jobs() == []
+
+    @pytest.mark.asyncio
+    async def test_rejects_too_large_sources(self, tmp_path):
+        executor = ConversionExecutor(max_source_bytes=4)
+        path = tmp_path / "large.pdf"
+        path.write_bytes(b"12345")
+
+        with pytest.raises(SourceTooLargeError):
+            await executor.convert(path)
+        with pytest.raises(SourceTooLargeError):
+            await executor.convert(b"12345")
+
+    def test_reads_the_limits_from_the_settings(self, monkeypatch: pytest.MonkeyPatch):
+        settings = SimpleNamespace(
+            conversion_max_workers=2, conversion_timeout=60,
+            conversion_max_source_size=8, conversion_memory_limit=1024)
+        monkeypatch.setattr(src.settings, "use_app_setting_manager", lambda: SimpleNamespace(settings=settings))
+        monkeypatch.setattr(conversion_executor_module, "__instance", None)
+
+        executor = conversion_executor_module.use_conversion_executor()
+
+        assert (executor._max_workers, executor._timeout) == (2, 60)
+        assert executor._max_source_bytes == 8 * 1024 * 1024
+        assert executor._memory_limit == 1024 * 1024 * 1024
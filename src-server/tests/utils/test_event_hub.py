@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+from src.utils.event_hub import EventHub
+
+
+async def drain[T](subscription) -> list[T]:
+    return [event.data async for event in subscription]
+
+
+class TestEventHub:
+    @pytest.mark.asyncio
+    async def test_every_subscriber_receives_every_event(self):
+        hub = EventHub[int]()
+        first, second = hub.subscribe(), hub.subscribe()
+
+        events = [hub.publish(value) for value in range(3)]
+        hub.close()
+
+        assert [event.id for event in events] == [1, 2, 3]
+        assert await drain(first) == [0, 1, 2]
+        assert await drain(second) == [0, 1, 2]
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_drops_or_coalesces(self):
+        hub = EventHub[tuple[str, int]](subscriber_capacity=2, coalesce_key=lambda data: data[0])
+        subscription = hub.subscribe()
+
+        hub.publish(("a", 1))
+        hub.publish(("b", 1))
+        hub.publish(("a", 2)) # replaces ("a", 1)
+        hub.publish(("c", 1)) # drops the oldest
+        hub.close()
+
+        assert await drain(subscription) == [("a", 2), ("c", 1)]
+        assert subscription.dropped == 2
+
+    @pytest.mark.asyncio
+    async def test_filters_and_replays(self):
+        hub = EventHub[int](history_size=3)
+        for value in range(5):
+            hub.publish(value)
+
+        assert hub.can_replay(2) and not hub.can_replay(1)
+        subscription = hub.subscribe(accept=lambda data: data % 2 == 0, last_event_id=2)
+        hub.publish(5)
+        hub.publish(6)
+        hub.close()
+
+        assert await drain(subscription) == [2, 4, 6]
+
+    @pytest.mark.asyncio
+    async def test_waiting_subscriber_is_woken_up(self):
+        hub = EventHub[int]()
+        with hub.subscribe() as subscription:
+            received = asyncio.create_task(drain(subscription))
+            await asyncio.sleep(0)
+            hub.publish(1)
+            await asyncio.sleep(0)
+            hub.close()
+            assert await received == [1]
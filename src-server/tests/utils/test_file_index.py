@@ -0,0 +1,103 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from watchfiles import Change as ChangeType
+
+from src.utils.file_index import FileIndex, FileIndexManager
+
+
+def make_tree(root: Path):
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "src" / "pkg" / "module.py").write_text("")
+    (root / "src" / "main.py").write_text("")
+    (root / "build").mkdir()
+    (root / "build" / "output.bin").write_text("")
+    (root / ".hidden").mkdir()
+    (root / ".hidden" / "secret.txt").write_text("")
+    (root / ".gitignore").write_text("build/\n")
+
+def build_index(root: Path) -> FileIndex:
+    index = FileIndex(root)
+    index.build()
+    return index
+
+
+class TestFileIndex:
+    def test_build_skips_hidden_and_gitignored_entries(self, tmp_path: Path):
+        make_tree(tmp_path)
+        index = build_index(tmp_path)
+
+        paths = {entry.path for entry in index.subtree("")}
+        assert paths == {"src", "src/pkg", "src/main.py", "src/pkg/module.py"}
+        assert index.complete
+        assert index.resolve_directory(tmp_path / "src") == "src"
+        assert index.resolve_directory(tmp_path / "build") is None
+
+    def test_walk_respects_max_depth(self, tmp_path: Path):
+        make_tree(tmp_path)
+        index = build_index(tmp_path)
+
+        walked = [(entry.path, depth) for entry, depth in index.walk("src", max_depth=1)]
+        assert sorted(walked) == [("src/main.py", 1), ("src/pkg", 1)]
+        walked = [(entry.path, depth) for entry, depth in index.walk("src")]
+        assert ("src/pkg/module.py", 2) in walked
+
+    def test_apply_changes_adds_and_removes_entries(self, tmp_path: Path):
+        make_tree(tmp_path)
+        index = build_index(tmp_path)
+
+        (tmp_path / "docs" / "guide").mkdir(parents=True)
+        (tmp_path / "docs" / "guide" / "intro.md").write_text("")
+        (tmp_path / "build" / "new.bin").write_text("")
+        index.apply_changes([
+            (ChangeType.added, str(tmp_path / "docs")),
+            (ChangeType.added, str(tmp_path / "build" / "new.bin")),
+            (ChangeType.deleted, str(tmp_path / "src" / "pkg")),
+        ])
+
+        paths = {entry.path for entry in index.subtree("")}
+        assert paths == {"src", "src/main.py", "docs", "docs/guide", "docs/guide/intro.md"}
+
+    def test_gitignore_change_rescans_directory(self, tmp_path: Path):
+        make_tree(tmp_path)
+        index = build_index(tmp_path)
+
+        (tmp_path / ".gitignore").write_text("*.py\n")
+        index.apply_changes([(ChangeType.modified, str(tmp_path / ".gitignore"))])
+
+        paths = {entry.path for entry in index.subtree("")}
+        assert paths == {"src", "src/pkg", "build", "build/output.bin"}
+
+    def test_search_candidates_are_cached_per_version(self, tmp_path: Path):
+        make_tree(tmp_path)
+        index = build_index(tmp_path)
+
+        candidates = index.search_candidates()
+        assert ("main.py", "src/main.py", "file") in candidates
+        assert index.search_candidates() is candidates
+
+        (tmp_path / "notes.md").write_text("")
+        index.apply_changes([(ChangeType.added, str(tmp_path / "notes.md"))])
+        assert ("notes.md", "notes.md", "file") in index.search_candidates()
+
+
+class TestFileIndexManager:
+    @pytest.mark.asyncio
+    async def test_symlinked_root_shares_the_resolved_index(self, tmp_path: Path):
+        make_tree(tmp_path / "project")
+        (tmp_path / "link").symlink_to(tmp_path / "project", target_is_directory=True)
+        manager = FileIndexManager()
+        manager.start()
+        try:
+            assert manager.peek(tmp_path / "link") is None
+            for _ in range(100):
+                index = manager.peek(tmp_path / "project")
+                if index is not None: break
+                await asyncio.sleep(0.02)
+
+            assert index is not None
+            assert index.root == (tmp_path / "project").resolve()
+            assert manager.peek(tmp_path / "link") is index
+        finally:
+            await manager.close()
@@ -0,0 +1,39 @@
+from pathlib import Path
+
+import pytest
+
+from src.utils import line_index as line_index_module
+from src.utils.line_index import get_line_index, read_line_window
+
+
+class TestLineIndex:
+    @pytest.mark.parametrize("chunk_size", [4, 7, 1024 * 1024])
+    def test_windows_match_splitlines(self, monkeypatch: pytest.MonkeyPatch, tmp_path: Path, chunk_size: int):
+        monkeypatch.setattr(line_index_module, "CHUNK_SIZE", chunk_size)
+        content = "".join(f"line {index}\n" for index in range(50)) + "\n\nlast"
+        path = tmp_path / f"sample_{chunk_size}.txt"
+        path.write_text(content, encoding="utf-8")
+        lines = content.splitlines()
+
+        for offset in (1, 2, 10, 49, 52, 53):
+            window, total_lines = read_line_window(path, offset, 5)
+            assert window == lines[offset - 1:offset + 4]
+            assert total_lines == len(lines)
+
+    def test_crlf_and_empty_files(self, tmp_path: Path):
+        crlf = tmp_path / "crlf.txt"
+        crlf.write_bytes(b"a\r\nb\r\n")
+        empty = tmp_path / "empty.txt"
+        empty.write_bytes(b"")
+
+        assert read_line_window(crlf, 1, 10) == (["a", "b"], 2)
+        assert read_line_window(empty, 1, 10) == ([], 0)
+
+    def test_index_is_rebuilt_after_modification(self, tmp_path: Path):
+        path = tmp_path / "growing.txt"
+        path.write_text("one\n", encoding="utf-8")
+        assert get_line_index(path).total_lines == 1
+
+        path.write_text("one\ntwo\nthree\n", encoding="utf-8")
+        assert get_line_index(path).total_lines == 3
+        assert read_line_window(path, 3, 1) == (["three"], 3)
@@ -0,0 +1,43 @@
+from src.utils.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    def test_counter_renders_prometheus_text(self):
+        registry = MetricsRegistry()
+        counter = registry.counter("requests_total", "Requests.", ("tool",))
+        counter.inc(tool="read_file")
+        counter.inc(2, tool="read_file")
+
+        text = registry.render_prometheus()
+
+        assert "# TYPE requests_total counter" in text
+        assert 'requests_total{tool="read_file"} 3' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = MetricsRegistry()
+        histogram = registry.histogram("latency_seconds", "Latency.", ("tool",), buckets=(1, 5))
+        for value in (0.5, 2, 10):
+            histogram.observe(value, tool="shell")
+
+        text = registry.render_prometheus()
+
+        assert 'latency_seconds_bucket{tool="shell",le="1"} 1' in text
+        assert 'latency_seconds_bucket{tool="shell",le="5"} 2' in text
+        assert 'latency_seconds_bucket{tool="shell",le="+Inf"} 3' in text
+        assert 'latency_seconds_count{tool="shell"} 3' in text
+        assert registry.to_json()[0]["series"][0]["max"] == 10
+
+    def test_series_are_bounded(self):
+        registry = MetricsRegistry(max_series=2)
+        counter = registry.counter("tokens_total", "Tokens.", ("task",))
+        for task in ("1", "2", "3"):
+            counter.inc(task=task)
+
+        series = registry.to_json()[0]["series"]
+        assert [item["labels"]["task"] for item in series] == ["2", "3"]
+
+    def test_label_values_are_escaped(self):
+        registry = MetricsRegistry()
+        registry.counter("calls_total", "Calls.", ("tool",)).inc(tool='say "hi"\n')
+
+        assert 'calls_total{tool="say \\"hi\\"\\n"} 1' in registry.render_prometheus()